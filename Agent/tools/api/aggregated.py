@@ -47,7 +47,7 @@ No data available."""
     
     try:
         # Make API call (asynchronous) - returns full JSON
-        data = await make_api_request("GET", endpoint)
+        data = await make_api_request("GET", endpoint, response_format="json")
         
         # Format response with clear structure
         import json
@@ -2,12 +2,29 @@
 FastAPI main application with strict Pydantic validation.
 """
 
-from fastapi import FastAPI, HTTPException, Path
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Path, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 
 from api.routers import aggregated_transactions, results
-from api.utils.data_loader import set_dataset_folder, get_dataset_folder
+from api.utils.data_loader import get_dataset_folder, preload_dataset
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Précharge le dataset actif en arrière-plan dès le démarrage.
+    
+    Les fichiers sont parsés en parallèle puis indexés ; `GET /ready` répond
+    503 jusqu'à la fin du build, pour que la première vraie requête ne paie
+    jamais le chargement (désactivable avec API_PRELOAD_DATASET=0).
+    """
+    preload_dataset()
+    yield
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -16,6 +33,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -48,34 +66,57 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """Readiness endpoint: 200 once the active dataset is loaded and indexed."""
+    from api.utils.data_loader import dataset_build_status, is_dataset_ready
+    
+    ready = is_dataset_ready()
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "loading",
+        "dataset_folder": get_dataset_folder(),
+        "build": dataset_build_status()
+    }
+
+
 @app.get("/stats")
-async def get_global_stats():
-    """Statistiques globales sur tous les datasets."""
-    from api.utils.data_loader import (
-        load_users,
-        load_transactions,
-        load_locations,
-        load_sms,
-        load_emails
-    )
+async def get_global_stats(
+    dataset: Optional[str] = Query(None, description="Dossier dataset (défaut: dataset actif)")
+):
+    """Statistiques globales d'un dataset."""
+    from api.utils.data_loader import UnknownDatasetError, load_dataset
     
     try:
+        # Un chargement à froid ne bloque pas la boucle d'événements
+        data = await run_in_threadpool(load_dataset, dataset)
         return {
-            "users": len(load_users()),
-            "transactions": len(load_transactions()),
-            "locations": len(load_locations()),
-            "sms_messages": len(load_sms()),
-            "emails": len(load_emails()),
-            "current_dataset": get_dataset_folder(),
+            "users": len(data.users),
+            "transactions": len(data.transactions),
+            "locations": len(data.locations),
+            "sms_messages": len(data.sms),
+            "emails": len(data.emails),
+            "current_dataset": dataset or get_dataset_folder(),
             "description": "API v2.0 - Endpoint unique /transactions/{id} pour données agrégées"
         }
+    except UnknownDatasetError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except (FileNotFoundError, ValueError) as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Error loading data from dataset '{get_dataset_folder()}': {str(e)}"
+            detail=f"Error loading data from dataset '{dataset or get_dataset_folder()}': {str(e)}"
         )
 
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Compteurs du cache des réponses de /transactions/{id} (hits, misses, taille)."""
+    from api.utils.response_cache import aggregated_responses
+    
+    return aggregated_responses.stats()
+
+
 @app.get("/dataset/current")
 async def get_current_dataset():
     """Récupère le dataset actuellement actif.
@@ -83,14 +124,20 @@ async def get_current_dataset():
     Returns:
         Nom du dataset actif et informations de diagnostic
     """
-    from api.utils.data_loader import PROJECT_ROOT, get_dataset_dir
+    from api.utils.data_loader import (
+        PROJECT_ROOT,
+        get_dataset_dir,
+        has_transactions_file,
+        loaded_datasets,
+        transactions_file,
+    )
     
     dataset_folder = get_dataset_folder()
     dataset_dir = get_dataset_dir()
     
     # Check if dataset directory exists
     exists = dataset_dir.exists()
-    required_file = dataset_dir / "transactions_dataset.json"
+    required_file = transactions_file(dataset_dir)
     required_file_exists = required_file.exists()
     
     return {
@@ -102,74 +149,108 @@ async def get_current_dataset():
         "required_file_exists": required_file_exists,
         "available_datasets": [
             d.name for d in (PROJECT_ROOT / "dataset").iterdir() 
-            if d.is_dir() and (d / "transactions_dataset.json").exists()
-        ] if (PROJECT_ROOT / "dataset").exists() else []
+            if d.is_dir() and has_transactions_file(d)
+        ] if (PROJECT_ROOT / "dataset").exists() else [],
+        "loaded_datasets": loaded_datasets()
+    }
+
+
+@app.get("/dataset/status")
+async def get_dataset_build_status():
+    """Statut du dernier changement de dataset (construction en arrière-plan).
+    
+    Returns:
+        Dataset actif et progression/temps par phase du dernier build
+    """
+    from api.utils.data_loader import dataset_build_status
+    
+    return {
+        "active_dataset": get_dataset_folder(),
+        "build": dataset_build_status()
     }
 
 
-@app.post("/dataset/{folder_name}")
+@app.post("/dataset/{folder_name}", status_code=202)
 async def switch_dataset(
+    response: Response,
     folder_name: str = Path(
         ...,
         description="Nom du dossier dataset à activer",
         example="public 2"
+    ),
+    wait: bool = Query(
+        False,
+        description="Attendre la fin de la construction avant de répondre"
     )
 ):
-    """Change le dataset actif et vide le cache.
+    """Change le dataset actif, construit en arrière-plan.
     
-    Cet endpoint permet de changer dynamiquement le dataset utilisé par l'API.
-    Tous les caches sont vidés automatiquement lors du changement.
+    Le nouveau dataset (données et index) est construit par un worker pendant
+    que le dataset actuel continue de servir les requêtes ; il n'est activé
+    qu'une fois prêt, en un seul échange. Les autres datasets restent chargés
+    et interrogeables via le paramètre `dataset`.
+    
+    Suivre la progression avec `GET /dataset/status`, ou passer `wait=true`
+    pour attendre l'activation (comportement synchrone).
     
     Args:
         folder_name: Nom du dossier dataset (ex: "public 2", "public 3")
+        wait: Attendre la fin du build
         
     Returns:
-        Confirmation du changement de dataset
+        Build lancé (202), ou confirmation du changement si wait=true (200)
         
     Raises:
-        HTTPException: 400 si le dataset n'existe pas ou est invalide
+        HTTPException: 400 si le dataset n'existe pas ou est invalide,
+            500 si le build échoue (wait=true)
     """
-    from api.utils.data_loader import PROJECT_ROOT
+    from api.utils.data_loader import (
+        PROJECT_ROOT,
+        load_dataset,
+        switch_dataset as start_dataset_switch,
+        wait_for_build,
+    )
     
+    old_folder = get_dataset_folder()
     try:
-        old_folder = get_dataset_folder()
-        set_dataset_folder(folder_name)
-        
-        # Verify that data can be loaded
-        from api.utils.data_loader import (
-            load_transactions,
-            load_users
-        )
-        
-        # Try to load a small amount of data to verify it works
-        transactions = load_transactions()
-        users = load_users()
-        
-        return {
-            "status": "success",
-            "message": f"Dataset changé vers '{folder_name}'",
-            "dataset_folder": folder_name,
-            "previous_dataset": old_folder,
-            "cache_cleared": True,
-            "verification": {
-                "transactions_loaded": len(transactions),
-                "users_loaded": len(users),
-                "dataset_path": str(PROJECT_ROOT / "dataset" / folder_name)
-            }
-        }
+        build = start_dataset_switch(folder_name)
     except ValueError as e:
         raise HTTPException(
             status_code=400,
             detail=str(e)
         )
-    except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Unexpected error switching dataset: {e}", exc_info=True)
+    
+    if not wait:
+        return {
+            "status": "building",
+            "message": f"Construction du dataset '{folder_name}' en arrière-plan",
+            "dataset_folder": folder_name,
+            "previous_dataset": old_folder,
+            "build": build.to_dict()
+        }
+    
+    await run_in_threadpool(wait_for_build, build)
+    if build.state != "done":
         raise HTTPException(
             status_code=500,
-            detail=f"Error switching dataset: {str(e)}"
+            detail=f"Error switching dataset: {build.error or build.state}"
         )
+    
+    data = await run_in_threadpool(load_dataset, folder_name)
+    response.status_code = 200
+    return {
+        "status": "success",
+        "message": f"Dataset changé vers '{folder_name}'",
+        "dataset_folder": folder_name,
+        "previous_dataset": old_folder,
+        "cache_cleared": True,
+        "build": build.to_dict(),
+        "verification": {
+            "transactions_loaded": len(data.transactions),
+            "users_loaded": len(data.users),
+            "dataset_path": str(PROJECT_ROOT / "dataset" / folder_name)
+        }
+    }
 
 
 if __name__ == "__main__":
@@ -7,7 +7,7 @@ from .transaction import Transaction
 from .location import Location
 from .sms import SMS
 from .email import Email
-from .aggregated import AggregatedTransaction
+from .aggregated import AggregatedTransaction, AggregatedTransactionBatch, AggregatedTransactionBatchRequest
 
 __all__ = [
     'User',
@@ -17,5 +17,7 @@ __all__ = [
     'SMS',
     'Email',
     'AggregatedTransaction',
+    'AggregatedTransactionBatch',
+    'AggregatedTransactionBatchRequest',
 ]
 
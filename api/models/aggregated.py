@@ -2,7 +2,7 @@
 Aggregated transaction model with all associated data.
 """
 
-from typing import Optional, List
+from typing import Annotated, Optional, List
 from pydantic import BaseModel, Field
 
 from api.models.transaction import Transaction
@@ -111,3 +111,30 @@ class AggregatedTransaction(BaseModel):
             }
         }
 
+
+# Nombre maximal d'IDs par requête batch
+MAX_BATCH_SIZE = 1000
+
+
+class AggregatedTransactionBatchRequest(BaseModel):
+    """IDs of the transactions to aggregate in one call."""
+    
+    transaction_ids: List[Annotated[str, Field(min_length=36, max_length=36)]] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description=f"Transaction UUIDs (at most {MAX_BATCH_SIZE})"
+    )
+
+
+class AggregatedTransactionBatch(BaseModel):
+    """Aggregated contexts of several transactions."""
+    
+    transactions: List[AggregatedTransaction] = Field(
+        default_factory=list,
+        description="Aggregated transactions, in request order"
+    )
+    not_found: List[str] = Field(
+        default_factory=list,
+        description="Requested IDs that do not exist in the dataset"
+    )
@@ -3,71 +3,37 @@ Router pour l'endpoint de transaction agrégée.
 """
 
 import logging
-from typing import Optional
-from datetime import datetime, timedelta
-from fastapi import APIRouter, HTTPException, Path
+import time
+from typing import Iterator, List, Optional
+from fastapi import APIRouter, HTTPException, Path, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 logger = logging.getLogger(__name__)
 
-from api.models.aggregated import AggregatedTransaction, UserWithTransactions
-from api.utils.data_loader import (
-    load_transactions,
-    load_users,
-    load_emails,
-    load_sms,
-    load_locations
+from api.models.aggregated import (
+    AggregatedTransaction,
+    AggregatedTransactionBatch,
+    AggregatedTransactionBatchRequest,
 )
+from api.utils.aggregator import (
+    EXPORT_FORMATS,
+    BatchIndex,
+    Projection,
+    aggregate_transaction,
+    iter_export,
+    projection_exclude,
+    resolve_projection,
+)
+from api.utils.email_headers import extract_user_id_from_line
+from api.utils.data_loader import UnknownDatasetError, get_dataset_folder, load_dataset
+from api.utils.response_cache import CachedResponse, aggregated_responses
+from api.utils.response_formatter import FastJSONResponse, TOONResponse, render_json, render_model_json
+from api.utils.toon_formatter import model_to_toon
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
 
-def _extract_user_id_from_line(line: str) -> Optional[str]:
-    """
-    Extrait l'ID utilisateur depuis une ligne From: ou To:.
-    
-    Les emails peuvent avoir le format:
-    - "Caterina Chindamo" <caterina.chindamo@example.com>
-    - caterina.chindamo@example.com
-    
-    Args:
-        line: Ligne contenant From: ou To:
-        
-    Returns:
-        L'ID utilisateur si trouvé (format: Prénom_Nom), None sinon
-    """
-    if 'From:' not in line and 'To:' not in line:
-        return None
-    
-    # Extraire le nom/ID de l'utilisateur
-    parts = line.split(':', 1)  # Split seulement sur le premier ':'
-    if len(parts) > 1:
-        user_part = parts[1].strip()
-        
-        # Si le nom est entre guillemets, l'extraire
-        # Format: "Caterina Chindamo" <email@example.com>
-        if '"' in user_part:
-            # Extraire le texte entre guillemets
-            import re
-            quoted_match = re.search(r'"([^"]+)"', user_part)
-            if quoted_match:
-                name = quoted_match.group(1)
-                # Convertir les espaces en underscores pour correspondre au format user_id
-                return name.replace(' ', '_')
-        
-        # Sinon, extraire la partie email avant le @
-        if '@' in user_part:
-            # Format: email@example.com ou <email@example.com>
-            email_part = user_part.split('@')[0].strip()
-            # Retirer les chevrons si présents
-            email_part = email_part.replace('<', '').replace('>', '').strip()
-            # Si c'est un email comme "caterina.chindamo", convertir en "caterina_chindamo"
-            return email_part.replace('.', '_')
-        
-        # Si pas d'email, retourner tel quel
-        return user_part.replace(' ', '_')
-    return None
-
-
 def parse_user_id_from_email_or_sms(content: str) -> Optional[str]:
     """
     Extrait l'ID utilisateur depuis le contenu d'un email ou SMS.
@@ -80,74 +46,246 @@ def parse_user_id_from_email_or_sms(content: str) -> Optional[str]:
     """
     # Si c'est une seule ligne, l'utiliser directement
     if '\n' not in content:
-        return _extract_user_id_from_line(content)
+        return extract_user_id_from_line(content)
     
     # Sinon, parcourir les lignes
     lines = content.split('\n')
     for line in lines:
-        result = _extract_user_id_from_line(line)
+        result = extract_user_id_from_line(line)
         if result:
             return result
     return None
 
 
-def find_locations_near_timestamp(
-    locations: list,
-    biotag: str,
-    timestamp: str,
-    time_window_hours: int = 24
-) -> list:
+def _render(
+    aggregated: AggregatedTransaction,
+    response_format: str,
+    projection: Optional[Projection] = None,
+) -> CachedResponse:
+    """Sérialise une réponse agrégée en une passe (JSON compact ou TOON)."""
+    exclude = projection_exclude(projection)
+    if response_format == "toon":
+        # Encodeur TOON compilé depuis le schéma (sans model_dump)
+        return CachedResponse(model_to_toon(aggregated, exclude).encode("utf-8"), TOONResponse.media_type)
+    return CachedResponse(render_model_json(aggregated, exclude), FastJSONResponse.media_type)
+
+
+def _response_format(format: str) -> str:
+    """Normalise le paramètre format ("toon", sinon "json")."""
+    return "toon" if format.lower() == "toon" else "json"
+
+
+def _projection(fields: Optional[str], exclude: Optional[str]) -> Optional[Projection]:
+    """Résout fields=/exclude= (400 si une section est inconnue)."""
+    try:
+        return resolve_projection(fields, exclude)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+_FIELDS_DESCRIPTION = (
+    "Sections à inclure, séparées par des virgules (ex: transaction,sender,sender_emails ; "
+    "sender.other_transactions pour les autres transactions). Les sections non demandées ne sont pas calculées."
+)
+_EXCLUDE_DESCRIPTION = "Sections à retirer, séparées par des virgules (ex: sender_emails,recipient_emails)"
+
+
+async def _load(dataset: Optional[str]):
+    """Charge un dataset hors de la boucle d'événements (erreurs HTTP 404/500).
+    
+    Un chargement à froid ne bloque pas les requêtes sur les autres datasets.
+    """
+    try:
+        return await run_in_threadpool(load_dataset, dataset)
+    except UnknownDatasetError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error loading data from dataset '{dataset or get_dataset_folder()}': {str(e)}"
+        )
+
+
+def _cache_key(data, transaction_id: str, response_format: str, projection: Optional[Projection]) -> tuple:
+    """Clé du cache des réponses : version du dataset, transaction, format et projection."""
+    return (data.fingerprint, transaction_id, response_format, projection)
+
+
+def _cached_response(
+    data,
+    index,
+    transaction_id: str,
+    response_format: str,
+    projection: Optional[Projection] = None,
+) -> Optional[CachedResponse]:
+    """Réponse rendue d'une transaction, depuis le cache ou construite (None si inconnue)."""
+    cached = aggregated_responses.get(_cache_key(data, transaction_id, response_format, projection))
+    if cached is None:
+        cached = _build_response(data, index, transaction_id, response_format, projection)
+    return cached
+
+
+def _build_response(
+    data,
+    index,
+    transaction_id: str,
+    response_format: str,
+    projection: Optional[Projection] = None,
+) -> Optional[CachedResponse]:
+    """Agrège, rend et met en cache la réponse d'une transaction (None si inconnue)."""
+    aggregated = aggregate_transaction(index, transaction_id, projection)
+    if aggregated is None:
+        return None
+    cached = _render(aggregated, response_format, projection)
+    cache_key = _cache_key(data, transaction_id, response_format, projection)
+    aggregated_responses.put(cache_key, cached.body, cached.media_type)
+    return cached
+
+
+def _render_batch(
+    data,
+    transaction_ids: List[str],
+    response_format: str,
+    projection: Optional[Projection] = None,
+) -> CachedResponse:
+    """Agrège et sérialise un batch de transactions (exécuté dans le threadpool)."""
+    index = BatchIndex(data.index)
+    
+    if response_format == "json":
+        # Corps JSON compact : les réponses unitaires (en cache) sont concaténées
+        bodies = []
+        not_found = []
+        for transaction_id in transaction_ids:
+            cached = _cached_response(data, index, transaction_id, "json", projection)
+            if cached is None:
+                not_found.append(transaction_id)
+            else:
+                bodies.append(cached.body)
+        body = (
+            b'{"transactions":[' + b','.join(bodies) + b'],"not_found":'
+            + render_json(not_found) + b'}'
+        )
+        return CachedResponse(body, FastJSONResponse.media_type)
+    
+    transactions = []
+    not_found = []
+    for transaction_id in transaction_ids:
+        aggregated = aggregate_transaction(index, transaction_id, projection)
+        if aggregated is None:
+            not_found.append(transaction_id)
+        else:
+            transactions.append(aggregated)
+    batch = AggregatedTransactionBatch(transactions=transactions, not_found=not_found)
+    exclude_sections = projection_exclude(projection)
+    exclude = {"transactions": {"__all__": exclude_sections}} if exclude_sections else None
+    return CachedResponse(model_to_toon(batch, exclude).encode("utf-8"), TOONResponse.media_type)
+
+
+@router.post("/batch", response_model=AggregatedTransactionBatch)
+async def get_aggregated_transactions_batch(
+    request: AggregatedTransactionBatchRequest,
+    dataset: Optional[str] = Query(
+        None,
+        description="Dossier dataset à interroger (défaut: dataset actif)"
+    ),
+    format: str = Query(
+        "json",
+        description="Format de la réponse: json ou toon"
+    ),
+    fields: Optional[str] = Query(None, description=_FIELDS_DESCRIPTION),
+    exclude: Optional[str] = Query(None, description=_EXCLUDE_DESCRIPTION)
+) -> Response:
     """
-    Trouve les locations proches d'un timestamp donné.
+    Récupère plusieurs transactions agrégées en un seul appel.
+    
+    Chaque élément est identique à la réponse de `GET /transactions/{id}`.
+    Les recherches par utilisateur sont partagées entre les transactions du
+    batch et les réponses déjà en cache sont réutilisées.
     
     Args:
-        locations: Liste de toutes les locations
-        biotag: Biotag de l'utilisateur
-        timestamp: Timestamp de référence (ISO 8601)
-        time_window_hours: Fenêtre temporelle en heures
+        request: IDs des transactions (au plus MAX_BATCH_SIZE)
+        dataset: Dossier dataset (défaut: dataset actif)
+        format: "json" (défaut) ou "toon"
+        fields: Sections à inclure dans chaque transaction (défaut: toutes)
+        exclude: Sections à retirer de chaque transaction
         
     Returns:
-        Liste des locations correspondantes
+        Transactions agrégées dans l'ordre de la requête, et IDs introuvables
+        
+    Raises:
+        HTTPException: 400 si une section est inconnue, 404 si le dataset n'existe pas
     """
-    if not timestamp or not timestamp.strip():
-        logger.warning(f"Empty timestamp provided for biotag {biotag}")
-        return []
-    
+    projection = _projection(fields, exclude)
+    data = await _load(dataset)
+    # Agrégation et rendu hors de la boucle d'événements
+    rendered = await run_in_threadpool(
+        _render_batch, data, request.transaction_ids, _response_format(format), projection
+    )
+    return Response(content=rendered.body, media_type=rendered.media_type)
+
+
+def _logged_export(chunks: Iterator[bytes], dataset_folder: str) -> Iterator[bytes]:
+    """Relaie un export en journalisant son débit (records/s) à la fin."""
+    start = time.perf_counter()
+    records = 0
     try:
-        # Normaliser le timestamp (gérer différents formats)
-        timestamp_normalized = timestamp.replace('Z', '+00:00')
-        # Si pas de timezone, ajouter +00:00
-        if '+' not in timestamp_normalized and '-' not in timestamp_normalized[-6:]:
-            # Format simple sans timezone, on assume UTC
-            if 'T' in timestamp_normalized:
-                timestamp_normalized = timestamp_normalized + '+00:00'
-        
-        ref_time = datetime.fromisoformat(timestamp_normalized)
-        time_delta = timedelta(hours=time_window_hours)
+        for chunk in chunks:
+            records += 1
+            yield chunk
+    finally:
+        elapsed = time.perf_counter() - start
+        rate = records / elapsed if elapsed > 0 else 0.0
+        logger.info(f"Exported {records} aggregated transactions of '{dataset_folder}' in {elapsed:.2f}s ({rate:.0f} records/s)")
+
+
+# Déclaré avant /{transaction_id} : "export" n'est pas un ID de transaction
+@router.get("/export")
+async def export_aggregated_transactions(
+    dataset: Optional[str] = Query(
+        None,
+        description="Dossier dataset à exporter (défaut: dataset actif)"
+    ),
+    format: str = Query(
+        "ndjson",
+        description="Format de l'export: ndjson (une transaction par ligne) ou toon (blocs séparés par une ligne vide)"
+    ),
+    fields: Optional[str] = Query(None, description=_FIELDS_DESCRIPTION),
+    exclude: Optional[str] = Query(None, description=_EXCLUDE_DESCRIPTION)
+) -> StreamingResponse:
+    """
+    Exporte toutes les transactions agrégées d'un dataset, en streaming.
+    
+    Les transactions sont agrégées et envoyées une par une (générateur) :
+    la mémoire reste constante quelle que soit la taille du dataset. Chaque
+    document est identique à la réponse de `GET /transactions/{id}`. Le
+    débit (records/s) est journalisé à la fin de l'export.
+    
+    Args:
+        dataset: Dossier dataset (défaut: dataset actif)
+        format: "ndjson" (défaut) ou "toon"
+        fields: Sections exportées (défaut: toutes)
+        exclude: Sections retirées
         
-        matching_locations = []
-        for loc in locations:
-            if loc.biotag == biotag:
-                try:
-                    # Normaliser le timestamp de la location aussi
-                    loc_timestamp = loc.datetime.replace('Z', '+00:00')
-                    if '+' not in loc_timestamp and '-' not in loc_timestamp[-6:]:
-                        if 'T' in loc_timestamp:
-                            loc_timestamp = loc_timestamp + '+00:00'
-                    
-                    loc_time = datetime.fromisoformat(loc_timestamp)
-                    time_diff = abs(loc_time - ref_time)
-                    if time_diff <= time_delta:
-                        matching_locations.append(loc)
-                except (ValueError, AttributeError) as e:
-                    logger.debug(f"Error parsing location timestamp {loc.datetime}: {e}")
-                    continue
+    Returns:
+        Flux NDJSON (application/x-ndjson) ou TOON (text/plain)
         
-        logger.debug(f"Found {len(matching_locations)} locations for biotag {biotag} near {timestamp}")
-        return matching_locations
-    except (ValueError, AttributeError) as e:
-        logger.error(f"Error parsing reference timestamp {timestamp}: {e}")
-        return []
+    Raises:
+        HTTPException: 400 si le format ou une section est inconnu, 404 si le dataset n'existe pas
+    """
+    export_format = format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown export format '{format}' (expected one of {', '.join(EXPORT_FORMATS)})"
+        )
+    projection = _projection(fields, exclude)
+    data = await _load(dataset)
+    chunks = _logged_export(
+        iter_export(data.index, data.transactions, export_format, projection),
+        dataset or get_dataset_folder(),
+    )
+    media_type = "application/x-ndjson" if export_format == "ndjson" else TOONResponse.media_type
+    return StreamingResponse(chunks, media_type=media_type)
 
 
 @router.get("/{transaction_id}", response_model=AggregatedTransaction)
@@ -157,8 +295,18 @@ async def get_aggregated_transaction(
         description="UUID de la transaction",
         min_length=36,
         max_length=36
-    )
-) -> AggregatedTransaction:
+    ),
+    dataset: Optional[str] = Query(
+        None,
+        description="Dossier dataset à interroger (défaut: dataset actif)"
+    ),
+    format: str = Query(
+        "json",
+        description="Format de la réponse: json ou toon"
+    ),
+    fields: Optional[str] = Query(None, description=_FIELDS_DESCRIPTION),
+    exclude: Optional[str] = Query(None, description=_EXCLUDE_DESCRIPTION)
+) -> Response:
     """
     Récupère une transaction avec toutes les données agrégées.
     
@@ -168,285 +316,40 @@ async def get_aggregated_transaction(
     - Les emails et SMS associés aux deux parties
     - Les données de localisation proches de la date de transaction
     
+    Avec `fields=`/`exclude=`, seules les sections demandées sont calculées
+    et renvoyées (ex: `fields=transaction,sender` pour un tableau de bord).
+    
+    Les réponses rendues sont mises en cache (LRU borné, par version du
+    dataset, transaction, format et projection) : une requête répétée
+    renvoie les octets déjà sérialisés.
+    
     Args:
         transaction_id: L'UUID de la transaction à récupérer
+        dataset: Dossier dataset (plusieurs datasets peuvent être servis en parallèle)
+        format: "json" (défaut) ou "toon"
+        fields: Sections à inclure (défaut: toutes)
+        exclude: Sections à retirer
         
     Returns:
         Transaction avec toutes les données agrégées
         
     Raises:
-        HTTPException: 404 si la transaction n'existe pas
+        HTTPException: 400 si une section est inconnue,
+            404 si la transaction ou le dataset n'existe pas
     """
-    # Charger toutes les données
-    try:
-        transactions = load_transactions()
-        users = load_users()
-        emails = load_emails()
-        sms_list = load_sms()
-        locations = load_locations()
-    except (FileNotFoundError, ValueError) as e:
-        from api.utils.data_loader import get_dataset_folder
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error loading data from dataset '{get_dataset_folder()}': {str(e)}"
+    projection = _projection(fields, exclude)
+    # Charger les données et les index (construits une seule fois par dataset)
+    data = await _load(dataset)
+    response_format = _response_format(format)
+    cached = aggregated_responses.get(_cache_key(data, transaction_id, response_format, projection))
+    if cached is None:
+        # Agrégation (lectures d'emails sur disque comprises) et rendu hors de la boucle d'événements
+        cached = await run_in_threadpool(
+            _build_response, data, data.index, transaction_id, response_format, projection
         )
-    
-    # Trouver la transaction
-    transaction = next(
-        (t for t in transactions if t.transaction_id == transaction_id),
-        None
-    )
-    
-    if not transaction:
+    if cached is None:
         raise HTTPException(
             status_code=404,
             detail=f"Transaction {transaction_id} non trouvée"
         )
-    
-    # Créer des dictionnaires pour recherche rapide
-    users_by_iban = {user.iban: user for user in users}
-    # Créer un mapping biotag -> User (plus direct et fiable)
-    users_by_biotag = {user.biotag: user for user in users if user.biotag}
-    
-    logger.debug(f"Created users_by_iban mapping with {len(users_by_iban)} entries")
-    logger.debug(f"Created users_by_biotag mapping with {len(users_by_biotag)} entries")
-    
-    # Trouver l'expéditeur
-    # D'abord par biotag (sender_id correspond au biotag dans les transactions)
-    sender = None
-    if transaction.sender_id and transaction.sender_id.strip():
-        sender = users_by_biotag.get(transaction.sender_id)
-        if sender:
-            logger.debug(f"Found sender by biotag (sender_id): {transaction.sender_id}")
-    
-    # Si pas trouvé par biotag, essayer par IBAN (fallback)
-    if not sender and transaction.sender_iban and transaction.sender_iban.strip():
-        sender = users_by_iban.get(transaction.sender_iban)
-        if sender:
-            logger.debug(f"Found sender by IBAN: {transaction.sender_iban}")
-    
-    if not sender and transaction.sender_id:
-        logger.warning(f"Could not find sender for sender_id/biotag: {transaction.sender_id}")
-    
-    # Même logique pour le recipient
-    recipient = None
-    if transaction.recipient_id and transaction.recipient_id.strip():
-        recipient = users_by_biotag.get(transaction.recipient_id)
-        if recipient:
-            logger.debug(f"Found recipient by biotag (recipient_id): {transaction.recipient_id}")
-    
-    # Si pas trouvé par biotag, essayer par IBAN (fallback)
-    if not recipient and transaction.recipient_iban and transaction.recipient_iban.strip():
-        recipient = users_by_iban.get(transaction.recipient_iban)
-        if recipient:
-            logger.debug(f"Found recipient by IBAN: {transaction.recipient_iban}")
-    
-    if not recipient and transaction.recipient_id:
-        logger.debug(f"Could not find recipient for recipient_id/biotag: {transaction.recipient_id}")
-    
-    # Créer des ID utilisateur pour filtrer emails et SMS
-    # Format: Prénom_Nom (utilisé dans les fichiers SMS/emails)
-    def get_user_id(user: Optional[object]) -> Optional[str]:
-        if user:
-            return f"{user.first_name}_{user.last_name}"
-        return None
-    
-    # Pour le sender: utiliser le format Prénom_Nom si on a trouvé le user
-    sender_user_id = None
-    if sender:
-        sender_user_id = get_user_id(sender)
-    
-    # Pour le recipient: même logique
-    recipient_user_id = None
-    if recipient:
-        recipient_user_id = get_user_id(recipient)
-    
-    logger.debug(f"Sender user_id for filtering: {sender_user_id}, sender found: {sender is not None}")
-    logger.debug(f"Recipient user_id for filtering: {recipient_user_id}, recipient found: {recipient is not None}")
-    
-    # Filtrer les emails et SMS de l'expéditeur
-    sender_emails = []
-    sender_sms = []
-    if sender_user_id:
-        # Pour les emails, chercher dans les champs From et To
-        # car un email peut être envoyé par l'utilisateur (From) ou reçu (To)
-        for email in emails:
-            email_content = email.mail
-            # Extraire les IDs depuis From et To
-            from_id = None
-            to_id = None
-            
-            lines = email_content.split('\n')
-            for line in lines:
-                if 'From:' in line:
-                    from_id = _extract_user_id_from_line(line)
-                elif 'To:' in line:
-                    to_id = _extract_user_id_from_line(line)
-            
-            # Vérifier si l'utilisateur est dans From ou To
-            if (from_id and sender_user_id.lower() in from_id.lower()) or \
-               (to_id and sender_user_id.lower() in to_id.lower()):
-                sender_emails.append(email)
-        
-        for sms in sms_list:
-            if sender_user_id.lower() in sms.id_user.lower():
-                sender_sms.append(sms)
-        
-        logger.debug(f"Found {len(sender_emails)} emails and {len(sender_sms)} SMS for sender")
-    else:
-        logger.warning(f"No sender_user_id found, cannot filter SMS/emails. sender_id: {transaction.sender_id}")
-    
-    # Filtrer les emails et SMS du destinataire
-    recipient_emails = []
-    recipient_sms = []
-    if recipient_user_id:
-        # Pour les emails, chercher dans les champs From et To
-        for email in emails:
-            email_content = email.mail
-            # Extraire les IDs depuis From et To
-            from_id = None
-            to_id = None
-            
-            lines = email_content.split('\n')
-            for line in lines:
-                if 'From:' in line:
-                    from_id = _extract_user_id_from_line(line)
-                elif 'To:' in line:
-                    to_id = _extract_user_id_from_line(line)
-            
-            # Vérifier si l'utilisateur est dans From ou To
-            if (from_id and recipient_user_id.lower() in from_id.lower()) or \
-               (to_id and recipient_user_id.lower() in to_id.lower()):
-                recipient_emails.append(email)
-        
-        for sms in sms_list:
-            if recipient_user_id.lower() in sms.id_user.lower():
-                recipient_sms.append(sms)
-        
-        logger.debug(f"Found {len(recipient_emails)} emails and {len(recipient_sms)} SMS for recipient")
-    
-    # Trouver les locations proches de la transaction
-    sender_locations = []
-    recipient_locations = []
-    
-    # Utiliser le sender_id (biotag) de la transaction pour trouver les locations
-    if transaction.sender_id and transaction.sender_id.strip():
-        sender_locations = find_locations_near_timestamp(
-            locations,
-            transaction.sender_id,
-            transaction.timestamp,
-            time_window_hours=24
-        )
-        logger.debug(f"Found {len(sender_locations)} locations for sender_id: {transaction.sender_id}")
-    
-    if transaction.recipient_id and transaction.recipient_id.strip():
-        recipient_locations = find_locations_near_timestamp(
-            locations,
-            transaction.recipient_id,
-            transaction.timestamp,
-            time_window_hours=24
-        )
-        logger.debug(f"Found {len(recipient_locations)} locations for recipient_id: {transaction.recipient_id}")
-    
-    # Récupérer les autres transactions pour le sender (dans une fenêtre de ±3 heures)
-    sender_other_transactions = []
-    if sender and sender.iban and transaction.timestamp:
-        try:
-            # Normaliser le timestamp de la transaction actuelle
-            transaction_timestamp = transaction.timestamp.replace('Z', '+00:00')
-            if '+' not in transaction_timestamp and '-' not in transaction_timestamp[-6:]:
-                if 'T' in transaction_timestamp:
-                    transaction_timestamp = transaction_timestamp + '+00:00'
-            
-            ref_time = datetime.fromisoformat(transaction_timestamp)
-            time_window = timedelta(hours=3)
-            
-            for tx in transactions:
-                if (tx.transaction_id != transaction_id
-                    and (tx.sender_iban == sender.iban or tx.recipient_iban == sender.iban)
-                    and tx.timestamp):
-                    try:
-                        # Normaliser le timestamp de la transaction à comparer
-                        tx_timestamp = tx.timestamp.replace('Z', '+00:00')
-                        if '+' not in tx_timestamp and '-' not in tx_timestamp[-6:]:
-                            if 'T' in tx_timestamp:
-                                tx_timestamp = tx_timestamp + '+00:00'
-                        
-                        tx_time = datetime.fromisoformat(tx_timestamp)
-                        time_diff = abs(tx_time - ref_time)
-                        
-                        if time_diff <= time_window:
-                            sender_other_transactions.append(tx)
-                    except (ValueError, AttributeError) as e:
-                        logger.debug(f"Error parsing transaction timestamp {tx.timestamp}: {e}")
-                        continue
-        except (ValueError, AttributeError) as e:
-            logger.error(f"Error parsing reference transaction timestamp {transaction.timestamp}: {e}")
-        
-        logger.debug(f"Found {len(sender_other_transactions)} other transactions for sender IBAN: {sender.iban} within ±3 hours")
-    
-    # Récupérer les autres transactions pour le recipient (dans une fenêtre de ±3 heures)
-    recipient_other_transactions = []
-    if recipient and recipient.iban and transaction.timestamp:
-        try:
-            # Normaliser le timestamp de la transaction actuelle
-            transaction_timestamp = transaction.timestamp.replace('Z', '+00:00')
-            if '+' not in transaction_timestamp and '-' not in transaction_timestamp[-6:]:
-                if 'T' in transaction_timestamp:
-                    transaction_timestamp = transaction_timestamp + '+00:00'
-            
-            ref_time = datetime.fromisoformat(transaction_timestamp)
-            time_window = timedelta(hours=3)
-            
-            for tx in transactions:
-                if (tx.transaction_id != transaction_id
-                    and (tx.sender_iban == recipient.iban or tx.recipient_iban == recipient.iban)
-                    and tx.timestamp):
-                    try:
-                        # Normaliser le timestamp de la transaction à comparer
-                        tx_timestamp = tx.timestamp.replace('Z', '+00:00')
-                        if '+' not in tx_timestamp and '-' not in tx_timestamp[-6:]:
-                            if 'T' in tx_timestamp:
-                                tx_timestamp = tx_timestamp + '+00:00'
-                        
-                        tx_time = datetime.fromisoformat(tx_timestamp)
-                        time_diff = abs(tx_time - ref_time)
-                        
-                        if time_diff <= time_window:
-                            recipient_other_transactions.append(tx)
-                    except (ValueError, AttributeError) as e:
-                        logger.debug(f"Error parsing transaction timestamp {tx.timestamp}: {e}")
-                        continue
-        except (ValueError, AttributeError) as e:
-            logger.error(f"Error parsing reference transaction timestamp {transaction.timestamp}: {e}")
-        
-        logger.debug(f"Found {len(recipient_other_transactions)} other transactions for recipient IBAN: {recipient.iban} within ±3 hours")
-    
-    # Créer les objets UserWithTransactions
-    sender_with_transactions = None
-    if sender:
-        sender_with_transactions = UserWithTransactions(
-            **sender.model_dump(),
-            other_transactions=sender_other_transactions
-        )
-    
-    recipient_with_transactions = None
-    if recipient:
-        recipient_with_transactions = UserWithTransactions(
-            **recipient.model_dump(),
-            other_transactions=recipient_other_transactions
-        )
-    
-    # Construire la réponse agrégée
-    return AggregatedTransaction(
-        transaction=transaction,
-        sender=sender_with_transactions,
-        recipient=recipient_with_transactions,
-        sender_emails=sender_emails,
-        recipient_emails=recipient_emails,
-        sender_sms=sender_sms,
-        recipient_sms=recipient_sms,
-        sender_locations=sender_locations,
-        recipient_locations=recipient_locations
-    )
-
+    return Response(content=cached.body, media_type=cached.media_type)
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
+from typing import Optional
 import json
 
 router = APIRouter(prefix="/api", tags=["results"])
@@ -38,11 +40,19 @@ async def get_result_file(filename: str):
 
 
 @router.get("/transactions")
-async def get_all_transactions():
-    from api.utils.data_loader import load_transactions
+async def get_all_transactions(
+    dataset: Optional[str] = Query(None),
+    format: str = Query("json", description="Format de la réponse: json ou toon (table)")
+):
+    from api.models import Transaction
+    from api.utils.data_loader import UnknownDatasetError, load_transactions
+    from api.utils.response_formatter import format_streaming_response
     
     try:
-        transactions = load_transactions()
-        return [t.model_dump() for t in transactions]
+        transactions = await run_in_threadpool(load_transactions, dataset)
+    except UnknownDatasetError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading transactions: {str(e)}")
+    # Envoyé par blocs de lignes : le corps complet n'est jamais construit en mémoire
+    return format_streaming_response(transactions, Transaction, format)
@@ -0,0 +1,394 @@
+"""
+Construction des transactions agrégées à partir des index d'un dataset.
+
+Partagé par les endpoints (unitaire, batch, export) et les scripts hors
+ligne : une transaction agrégée regroupe la transaction, l'expéditeur et le
+destinataire (avec leurs autres transactions à ±3 h), leurs emails, SMS et
+locations proches.
+"""
+
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, Optional
+
+from api.models.aggregated import MAX_BATCH_SIZE, AggregatedTransaction, UserWithTransactions
+from api.utils.dataset_index import DatasetIndex, parse_timestamp, user_id_for
+from api.utils.record_store import TransactionRecord
+from api.utils.response_formatter import render_model_json
+from api.utils.toon_formatter import model_to_toon
+
+logger = logging.getLogger(__name__)
+
+
+def find_locations_near_timestamp(
+    index: DatasetIndex,
+    biotag: str,
+    timestamp: str,
+    time_window_hours: int = 24
+) -> list:
+    """
+    Trouve les locations proches d'un timestamp donné.
+    
+    Utilise la série temporelle du biotag (tableaux NumPy triés) :
+    la fenêtre est une requête searchsorted, sans parcourir les locations.
+    
+    Args:
+        index: Index du dataset actif
+        biotag: Biotag de l'utilisateur
+        timestamp: Timestamp de référence (ISO 8601)
+        time_window_hours: Fenêtre temporelle en heures
+        
+    Returns:
+        Liste des locations correspondantes
+    """
+    if not timestamp or not timestamp.strip():
+        logger.warning(f"Empty timestamp provided for biotag {biotag}")
+        return []
+    
+    if parse_timestamp(timestamp) is None:
+        logger.error(f"Error parsing reference timestamp {timestamp}")
+        return []
+    
+    matching_locations = index.locations_near(biotag, timestamp, time_window_hours)
+    logger.debug(f"Found {len(matching_locations)} locations for biotag {biotag} near {timestamp}")
+    return matching_locations
+
+
+def _to_models(records: list) -> list:
+    """Convertit des records compacts en modèles Pydantic pour la réponse."""
+    return [record.to_model() for record in records]
+
+
+class BatchIndex:
+    """Index partagé par les transactions d'un batch.
+    
+    Les recherches par utilisateur (profil, emails, SMS, locations) sont
+    mémoïsées : les transactions d'un même utilisateur ne les refont pas.
+    """
+    
+    def __init__(self, index: DatasetIndex):
+        self._index = index
+        self._memo: dict = {}
+    
+    def _memoized(self, name: str, *args):
+        key = (name, *args)
+        if key not in self._memo:
+            self._memo[key] = getattr(self._index, name)(*args)
+        return self._memo[key]
+    
+    def find_user(self, biotag, iban):
+        return self._memoized("find_user", biotag, iban)
+    
+    def emails_for_user(self, user_id):
+        return self._memoized("emails_for_user", user_id)
+    
+    def sms_for_user(self, user_id):
+        return self._memoized("sms_for_user", user_id)
+    
+    def locations_near(self, biotag, timestamp, time_window_hours=24):
+        return self._memoized("locations_near", biotag, timestamp, time_window_hours)
+    
+    def __getattr__(self, name):
+        return getattr(self._index, name)
+
+
+# Sections projetables : champs de AggregatedTransaction, plus les autres
+# transactions de l'expéditeur et du destinataire (les plus coûteuses)
+Projection = FrozenSet[str]
+_NESTED_SECTIONS = {
+    "sender": ("sender.other_transactions",),
+    "recipient": ("recipient.other_transactions",),
+}
+PROJECTABLE_SECTIONS = tuple(AggregatedTransaction.model_fields) + tuple(
+    path for paths in _NESTED_SECTIONS.values() for path in paths
+)
+
+
+def _parse_sections(value: str) -> set:
+    """Découpe une liste "a,b.c" en sections, en incluant les sous-sections."""
+    sections = set()
+    for name in (part.strip() for part in value.split(',')):
+        if not name:
+            continue
+        if name not in PROJECTABLE_SECTIONS:
+            raise ValueError(
+                f"Unknown section '{name}' (expected one of {', '.join(PROJECTABLE_SECTIONS)})"
+            )
+        sections.add(name)
+        sections.update(_NESTED_SECTIONS.get(name, ()))
+    return sections
+
+
+def resolve_projection(fields: Optional[str] = None, exclude: Optional[str] = None) -> Optional[Projection]:
+    """
+    Résout les paramètres fields=/exclude= en sections à construire.
+    
+    Exemples : ``fields=transaction,sender`` ; ``exclude=sender_emails,
+    recipient_emails`` ; ``exclude=sender.other_transactions``. Demander une
+    sous-section (``sender.other_transactions``) inclut sa section parente.
+    
+    Args:
+        fields: Sections à inclure, séparées par des virgules (défaut: toutes)
+        exclude: Sections à retirer, séparées par des virgules
+    
+    Returns:
+        Sections retenues, ou None pour la réponse complète
+    
+    Raises:
+        ValueError: Si une section est inconnue
+    """
+    if not fields and not exclude:
+        return None
+    selected = _parse_sections(fields) if fields else set(PROJECTABLE_SECTIONS)
+    for parent, paths in _NESTED_SECTIONS.items():
+        if selected.intersection(paths):
+            selected.add(parent)
+    if exclude:
+        selected -= _parse_sections(exclude)
+    return frozenset(selected)
+
+
+def projection_exclude(projection: Optional[Projection]) -> Optional[Dict[str, Any]]:
+    """Argument ``exclude`` de model_dump retirant les sections non demandées."""
+    if projection is None:
+        return None
+    excluded: Dict[str, Any] = {
+        name: True for name in AggregatedTransaction.model_fields if name not in projection
+    }
+    for parent, paths in _NESTED_SECTIONS.items():
+        if parent in projection:
+            nested = {path.split('.', 1)[1] for path in paths if path not in projection}
+            if nested:
+                excluded[parent] = nested
+    return excluded
+
+
+def aggregate_transaction(
+    index: DatasetIndex,
+    transaction_id: str,
+    projection: Optional[Projection] = None,
+) -> Optional[AggregatedTransaction]:
+    """Construit la réponse agrégée d'une transaction à partir des index.
+    
+    Args:
+        index: Index du dataset
+        transaction_id: UUID de la transaction
+        projection: Sections à construire (resolve_projection ; None: toutes).
+            Les autres sections ne sont pas calculées et gardent leur valeur
+            par défaut ; projection_exclude les retire de la réponse.
+    
+    Returns:
+        La transaction agrégée, ou None si la transaction n'existe pas
+    """
+    def wanted(path: str) -> bool:
+        return projection is None or path in projection
+    
+    # Trouver la transaction (index par clé primaire)
+    transaction = index.get_transaction(transaction_id)
+    
+    if not transaction:
+        return None
+    
+    # Trouver l'expéditeur et le destinataire
+    # D'abord par biotag (sender_id/recipient_id), puis par IBAN en fallback
+    # (uniquement si une section qui en dépend est demandée)
+    sender = None
+    if wanted("sender") or wanted("sender_emails") or wanted("sender_sms"):
+        sender = index.find_user(transaction.sender_id, transaction.sender_iban)
+        if not sender and transaction.sender_id:
+            logger.warning(f"Could not find sender for sender_id/biotag: {transaction.sender_id}")
+    
+    recipient = None
+    if wanted("recipient") or wanted("recipient_emails") or wanted("recipient_sms"):
+        recipient = index.find_user(transaction.recipient_id, transaction.recipient_iban)
+        if not recipient and transaction.recipient_id:
+            logger.debug(f"Could not find recipient for recipient_id/biotag: {transaction.recipient_id}")
+    
+    # Créer des ID utilisateur pour filtrer emails et SMS
+    # Format: Prénom_Nom (utilisé dans les fichiers SMS/emails)
+    sender_user_id = user_id_for(sender) if sender else None
+    recipient_user_id = user_id_for(recipient) if recipient else None
+    
+    logger.debug(f"Sender user_id for filtering: {sender_user_id}, sender found: {sender is not None}")
+    logger.debug(f"Recipient user_id for filtering: {recipient_user_id}, recipient found: {recipient is not None}")
+    
+    # Filtrer les emails et SMS de l'expéditeur (index inversés par user_id)
+    sender_emails = []
+    sender_sms = []
+    if sender_user_id:
+        # Pour les emails, l'index inversé couvre les champs From et To
+        # car un email peut être envoyé par l'utilisateur (From) ou reçu (To)
+        if wanted("sender_emails"):
+            sender_emails = index.emails_for_user(sender_user_id)
+        
+        if wanted("sender_sms"):
+            sender_sms = index.sms_for_user(sender_user_id)
+        
+        logger.debug(f"Found {len(sender_emails)} emails and {len(sender_sms)} SMS for sender")
+    elif wanted("sender_emails") or wanted("sender_sms"):
+        logger.warning(f"No sender_user_id found, cannot filter SMS/emails. sender_id: {transaction.sender_id}")
+    
+    # Filtrer les emails et SMS du destinataire
+    recipient_emails = []
+    recipient_sms = []
+    if recipient_user_id:
+        # Pour les emails, l'index inversé couvre les champs From et To
+        # car un email peut être envoyé par l'utilisateur (From) ou reçu (To)
+        if wanted("recipient_emails"):
+            recipient_emails = index.emails_for_user(recipient_user_id)
+        
+        if wanted("recipient_sms"):
+            recipient_sms = index.sms_for_user(recipient_user_id)
+        
+        logger.debug(f"Found {len(recipient_emails)} emails and {len(recipient_sms)} SMS for recipient")
+    
+    # Trouver les locations proches de la transaction
+    sender_locations = []
+    recipient_locations = []
+    
+    # Utiliser le sender_id (biotag) de la transaction pour trouver les locations
+    if wanted("sender_locations") and transaction.sender_id and transaction.sender_id.strip():
+        sender_locations = find_locations_near_timestamp(
+            index,
+            transaction.sender_id,
+            transaction.timestamp,
+            time_window_hours=24
+        )
+        logger.debug(f"Found {len(sender_locations)} locations for sender_id: {transaction.sender_id}")
+    
+    if wanted("recipient_locations") and transaction.recipient_id and transaction.recipient_id.strip():
+        recipient_locations = find_locations_near_timestamp(
+            index,
+            transaction.recipient_id,
+            transaction.timestamp,
+            time_window_hours=24
+        )
+        logger.debug(f"Found {len(recipient_locations)} locations for recipient_id: {transaction.recipient_id}")
+    
+    # Récupérer les autres transactions (fenêtre de ±3 heures)
+    # via les timelines triées par IBAN : deux bisections + une tranche
+    sender_other_transactions = []
+    if wanted("sender.other_transactions") and sender and sender.iban and transaction.timestamp:
+        sender_other_transactions = index.transactions_near(
+            sender.iban,
+            transaction,
+            time_window_hours=3
+        )
+        logger.debug(f"Found {len(sender_other_transactions)} other transactions for sender IBAN: {sender.iban} within ±3 hours")
+    
+    recipient_other_transactions = []
+    if wanted("recipient.other_transactions") and recipient and recipient.iban and transaction.timestamp:
+        recipient_other_transactions = index.transactions_near(
+            recipient.iban,
+            transaction,
+            time_window_hours=3
+        )
+        logger.debug(f"Found {len(recipient_other_transactions)} other transactions for recipient IBAN: {recipient.iban} within ±3 hours")
+    
+    # Créer les objets UserWithTransactions
+    # (les modèles Pydantic ne sont créés qu'ici, à la frontière de la réponse)
+    sender_with_transactions = None
+    if sender and wanted("sender"):
+        sender_with_transactions = UserWithTransactions(
+            **sender.to_dict(),
+            other_transactions=_to_models(sender_other_transactions)
+        )
+    
+    recipient_with_transactions = None
+    if recipient and wanted("recipient"):
+        recipient_with_transactions = UserWithTransactions(
+            **recipient.to_dict(),
+            other_transactions=_to_models(recipient_other_transactions)
+        )
+    
+    # Construire la réponse agrégée
+    return AggregatedTransaction(
+        transaction=transaction.to_model(),
+        sender=sender_with_transactions,
+        recipient=recipient_with_transactions,
+        sender_emails=_to_models(sender_emails),
+        recipient_emails=_to_models(recipient_emails),
+        sender_sms=_to_models(sender_sms),
+        recipient_sms=_to_models(recipient_sms),
+        sender_locations=_to_models(sender_locations),
+        recipient_locations=_to_models(recipient_locations)
+    )
+
+
+EXPORT_FORMATS = ("ndjson", "toon")
+
+
+def iter_aggregated(
+    index: DatasetIndex,
+    transactions: Iterable[TransactionRecord],
+    chunk_size: int = MAX_BATCH_SIZE,
+    projection: Optional[Projection] = None,
+) -> Iterator[AggregatedTransaction]:
+    """
+    Génère les transactions agrégées d'un dataset, une par transaction_id.
+    
+    Les transactions sont traitées par paquets partageant un BatchIndex :
+    les recherches par utilisateur sont mémoïsées au sein d'un paquet, et la
+    mémoire reste bornée quelle que soit la taille du dataset.
+    
+    Args:
+        index: Index du dataset
+        transactions: Transactions dans l'ordre du dataset
+        chunk_size: Transactions par paquet mémoïsé
+        projection: Sections à construire (défaut: toutes)
+    
+    Returns:
+        Itérateur des transactions agrégées, dans l'ordre du dataset
+    """
+    seen = set()
+    batch_index = BatchIndex(index)
+    in_batch = 0
+    for transaction in transactions:
+        transaction_id = transaction.transaction_id
+        # Une seule sortie par ID (première occurrence, comme GET /transactions/{id})
+        if transaction_id in seen:
+            continue
+        seen.add(transaction_id)
+        if in_batch == chunk_size:
+            batch_index = BatchIndex(index)
+            in_batch = 0
+        in_batch += 1
+        aggregated = aggregate_transaction(batch_index, transaction_id, projection)
+        if aggregated is not None:
+            yield aggregated
+
+
+def iter_export(
+    index: DatasetIndex,
+    transactions: Iterable[TransactionRecord],
+    export_format: str = "ndjson",
+    projection: Optional[Projection] = None,
+) -> Iterator[bytes]:
+    """
+    Sérialise les transactions agrégées d'un dataset au fil de l'eau.
+    
+    - ``ndjson`` : un document JSON compact par ligne (mêmes documents que
+      GET /transactions/{id})
+    - ``toon`` : un bloc TOON par transaction, blocs séparés par une ligne
+      vide (les chaînes multi-lignes sont toujours entre guillemets, un bloc
+      ne contient donc jamais de ligne vide)
+    
+    Args:
+        index: Index du dataset
+        transactions: Transactions dans l'ordre du dataset
+        export_format: "ndjson" ou "toon"
+        projection: Sections exportées (resolve_projection ; défaut: toutes)
+    
+    Returns:
+        Itérateur de morceaux encodés en UTF-8, un par transaction
+    
+    Raises:
+        ValueError: Si le format est inconnu
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}' (expected one of {', '.join(EXPORT_FORMATS)})")
+    exclude = projection_exclude(projection)
+    for aggregated in iter_aggregated(index, transactions, projection=projection):
+        if export_format == "toon":
+            yield (model_to_toon(aggregated, exclude) + "\n\n").encode("utf-8")
+        else:
+            yield render_model_json(aggregated, exclude) + b"\n"
@@ -0,0 +1,110 @@
+"""
+Direct ingestion of transactions_dataset.csv.
+
+Transactions are delivered as CSV. Instead of converting the file to JSON
+(scripts/convert_csv_to_json.py) and parsing that JSON again, the loader
+reads the CSV itself with typed per-column converters resolved once from
+the header. The conversion rules are the ones of ``convert_value``, so
+rows are identical to the converted JSON.
+"""
+
+import csv
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Colonnes obligatoires du CSV des transactions
+TRANSACTION_CSV_FIELDS = frozenset({
+    'transaction_id', 'sender_id', 'recipient_id',
+    'transaction_type', 'amount', 'location',
+    'payment_method', 'sender_iban', 'recipient_iban',
+    'balance_after', 'description', 'timestamp'
+})
+
+_FLOAT_FIELDS = frozenset({"amount", "balance_after"})
+
+
+def convert_value(value: str, field_name: str) -> Any:
+    """Convertit une valeur CSV en type Python approprié.
+
+    Args:
+        value: La valeur brute du CSV
+        field_name: Le nom du champ pour déterminer le type
+
+    Returns:
+        La valeur convertie au bon type
+    """
+    if not value or value.strip() == "":
+        # Pour les champs optionnels, retourner une chaîne vide
+        if field_name in ["recipient_id", "payment_method", "sender_iban",
+                          "recipient_iban", "description", "location"]:
+            return ""
+        # Pour balance_after, retourner 0.0 si vide
+        if field_name == "balance_after":
+            return 0.0
+        return ""
+
+    # Conversion des types numériques
+    if field_name in ["amount", "balance_after"]:
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+
+    # Les autres champs restent des chaînes
+    return value.strip()
+
+
+def _to_float(value: str, field_name: str) -> Any:
+    """Convertit une valeur numérique (float direct, règles de convert_value sinon)."""
+    try:
+        return float(value)
+    except ValueError:
+        # Valeur vide ou invalide: "" (amount) ou 0.0 comme convert_value
+        return convert_value(value, field_name)
+
+
+def iter_transactions_csv(csv_path: Path) -> Iterator[Dict[str, Any]]:
+    """Itère sur les transactions d'un CSV, converties comme par convert_value.
+
+    Le type de chaque colonne est résolu une fois depuis l'en-tête : les
+    champs texte sont nettoyés en bloc (str.strip), seules les colonnes
+    numériques passent par une conversion dédiée.
+
+    Args:
+        csv_path: Chemin vers transactions_dataset.csv
+
+    Returns:
+        Itérateur de dicts (une transaction par ligne, dans l'ordre du fichier)
+
+    Raises:
+        ValueError: Si des colonnes obligatoires manquent
+    """
+    with open(csv_path, 'r', encoding='utf-8', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        fieldnames = next(reader, None) or []
+        missing = TRANSACTION_CSV_FIELDS - set(fieldnames)
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans le CSV {csv_path}: {', '.join(sorted(missing))}")
+
+        width = len(fieldnames)
+        float_columns = [(position, name) for position, name in enumerate(fieldnames) if name in _FLOAT_FIELDS]
+
+        for row in reader:
+            if len(row) != width:
+                if not row:
+                    continue
+                if len(row) > width:
+                    # Comme le script de conversion : ligne ignorée
+                    logger.warning(f"Skipping malformed CSV row {reader.line_num} in {csv_path}")
+                    continue
+                # Champs manquants en fin de ligne : valeurs vides
+                row = row + [""] * (width - len(row))
+
+            # Champs texte: équivalent de convert_value (vide -> "")
+            values = [value.strip() for value in row]
+            for position, name in float_columns:
+                values[position] = _to_float(row[position], name)
+            yield dict(zip(fieldnames, values))
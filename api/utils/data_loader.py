@@ -2,12 +2,41 @@
 Data loader utilities for loading JSON datasets.
 """
 
-import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
-from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
-from api.models import User, Transaction, Location, SMS, Email
+from api.models import User
+from api.utils.dataset_builder import DatasetBuild, DatasetBuilder
+from api.utils.dataset_index import DatasetIndex
+from api.utils.dataset_registry import DatasetRegistry
+from api.utils.csv_loader import iter_transactions_csv
+from api.utils.json_stream import iter_json_array
+from api.utils.mail_store import MailStore, load_mailbox, scan_mailbox
+from api.utils.response_cache import aggregated_responses
+from api.utils.single_flight import SingleFlight
+from api.utils.record_store import (
+    UserRecord,
+    TransactionRecord,
+    LocationRecord,
+    SMSRecord,
+    EmailRecord,
+)
+from api.utils.dataset_snapshot import (
+    DatasetSnapshot,
+    compute_fingerprint,
+    file_digests,
+    load_snapshot,
+    save_snapshot,
+)
+from api.utils.sqlite_store import SQLiteDataset, import_dataset, store_path
+from api.utils.validation_ledger import ValidationLedger, build_records, load_records
+
+logger = logging.getLogger(__name__)
 
 # ============================================================================
 # CONFIGURATION - Modify this path to switch datasets
@@ -18,6 +47,27 @@ _DATASET_FOLDER = "public 1"  # Change to "public 1", "public 2", etc.
 # Get the project root (2 levels up from this file)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 
+# Budget mémoire des datasets chargés simultanément (les plus froids sont évincés)
+DATASET_MEMORY_BUDGET_MB = int(os.getenv('API_DATASET_MEMORY_BUDGET_MB', '4096'))
+
+# Préchargement du dataset actif au démarrage (lifespan FastAPI)
+PRELOAD_DATASET = os.getenv('API_PRELOAD_DATASET', '1') == '1'
+
+# Parsing parallèle des fichiers lors des builds: "process", "thread" ou "none"
+# (séquentiel par défaut sur une machine mono-cœur, où le pool ne ferait
+# qu'ajouter le coût de transfert des records entre processus)
+_CPU_COUNT = os.cpu_count() or 1
+PARALLEL_LOAD = os.getenv('API_PARALLEL_LOAD', 'process' if _CPU_COUNT > 1 else 'none')
+LOAD_WORKERS = int(os.getenv('API_LOAD_WORKERS', str(min(4, _CPU_COUNT))))
+
+# Stockage des datasets: "memory" (records + index en mémoire) ou "sqlite"
+# (import unique dans .cache/store-<empreinte>.sqlite, requêtes indexées)
+STORAGE_BACKEND = os.getenv('API_STORAGE_BACKEND', 'memory')
+
+
+class UnknownDatasetError(ValueError):
+    """Le dossier dataset demandé n'existe pas ou est invalide."""
+
 
 def get_dataset_folder() -> str:
     """Récupère le nom du dossier dataset actuellement actif.
@@ -28,100 +78,173 @@ def get_dataset_folder() -> str:
     return _DATASET_FOLDER
 
 
-def get_dataset_dir() -> Path:
-    """Récupère le chemin complet du dossier dataset actuellement actif.
+def get_dataset_dir(folder_name: Optional[str] = None) -> Path:
+    """Récupère le chemin complet d'un dossier dataset.
+    
+    Args:
+        folder_name: Nom du dossier dataset (défaut: dataset actif)
     
     Returns:
         Chemin Path vers le dossier dataset
     """
-    return PROJECT_ROOT / "dataset" / _DATASET_FOLDER
+    return PROJECT_ROOT / "dataset" / (folder_name or _DATASET_FOLDER)
 
 
-def set_dataset_folder(folder_name: str) -> None:
-    """Change le dataset actif et vide le cache.
+def resolve_dataset_folder(folder_name: Optional[str] = None) -> str:
+    """Valide un nom de dossier dataset (défaut: dataset actif).
     
     Args:
         folder_name: Nom du dossier dataset (ex: "public 2", "public 3")
         
+    Returns:
+        Nom du dossier dataset validé
+        
     Raises:
-        ValueError: Si le dataset n'existe pas ou est invalide
+        UnknownDatasetError: Si le dataset n'existe pas ou est invalide
     """
-    global _DATASET_FOLDER
+    if folder_name is None:
+        return _DATASET_FOLDER
     
-    # Validate that the dataset folder exists
-    dataset_path = PROJECT_ROOT / "dataset" / folder_name
-    if not dataset_path.exists():
-        raise ValueError(
+    # Validate that the dataset folder exists (a plain folder name inside dataset/)
+    datasets_root = PROJECT_ROOT / "dataset"
+    dataset_path = datasets_root / folder_name
+    if Path(folder_name).name != folder_name or folder_name == '..' or not dataset_path.is_dir():
+        raise UnknownDatasetError(
             f"Dataset folder '{folder_name}' does not exist. "
-            f"Available datasets: {[d.name for d in (PROJECT_ROOT / 'dataset').iterdir() if d.is_dir()]}"
+            f"Available datasets: {[d.name for d in datasets_root.iterdir() if d.is_dir()]}"
         )
     
-    # Check that required file exists
-    required_file = dataset_path / "transactions_dataset.json"
-    if not required_file.exists():
-        raise ValueError(
-            f"Dataset folder '{folder_name}' is missing required file 'transactions_dataset.json'"
+    # Check that required file exists (CSV or JSON)
+    if not has_transactions_file(dataset_path):
+        raise UnknownDatasetError(
+            f"Dataset folder '{folder_name}' is missing required file "
+            f"'transactions_dataset.csv' or 'transactions_dataset.json'"
         )
+    return folder_name
+
+
+def set_dataset_folder(folder_name: str) -> None:
+    """Change le dataset actif (par défaut des requêtes) et recharge ses données.
+    
+    Les autres datasets chargés ne sont pas affectés : les requêtes en cours
+    ou qui ciblent explicitement un autre dataset continuent sans attendre.
+    
+    Args:
+        folder_name: Nom du dossier dataset (ex: "public 2", "public 3")
+        
+    Raises:
+        ValueError: Si le dataset n'existe pas ou est invalide
+    """
+    global _DATASET_FOLDER
+    
+    folder_name = resolve_dataset_folder(folder_name)
     
     # Update the dataset folder
     _DATASET_FOLDER = folder_name
     
-    # Clear all caches
-    clear_cache()
+    # Reload this dataset from disk on next use
+    _registry.evict(folder_name)
+    aggregated_responses.clear()
 
 
-def _build_iban_to_biotag_mapping() -> dict:
+def _build_iban_to_biotag_mapping(transactions: List[TransactionRecord]) -> dict:
     """Construit un mapping IBAN -> biotag depuis les transactions.
     
+    Args:
+        transactions: Transactions déjà chargées du dataset
+        
     Returns:
         Dictionnaire {iban: biotag} pour enrichir les utilisateurs
     """
-    try:
-        # Charger directement depuis le fichier JSON pour éviter les dépendances circulaires
-        transactions_path = get_dataset_dir() / "transactions_dataset.json"
-        if not transactions_path.exists():
-            return {}
-        
-        with open(transactions_path, 'r', encoding='utf-8') as f:
-            transactions_data = json.load(f)
-        
-        iban_to_biotag = {}
+    iban_to_biotag = {}
+    
+    # Parcourir les transactions pour extraire les correspondances IBAN -> biotag
+    for tx in transactions:
+        # Utiliser sender_id comme biotag si disponible
+        sender_id = tx.sender_id.strip() if tx.sender_id else ''
+        sender_iban = tx.sender_iban.strip() if tx.sender_iban else ''
+        if sender_id and sender_iban:
+            iban_to_biotag[sender_iban] = sender_id
         
-        # Parcourir les transactions pour extraire les correspondances IBAN -> biotag
-        for tx in transactions_data:
-            # Utiliser sender_id comme biotag si disponible
-            sender_id = tx.get('sender_id', '').strip() if tx.get('sender_id') else ''
-            sender_iban = tx.get('sender_iban', '').strip() if tx.get('sender_iban') else ''
-            if sender_id and sender_iban:
-                iban_to_biotag[sender_iban] = sender_id
-            
-            # Utiliser recipient_id comme biotag si disponible
-            recipient_id = tx.get('recipient_id', '').strip() if tx.get('recipient_id') else ''
-            recipient_iban = tx.get('recipient_iban', '').strip() if tx.get('recipient_iban') else ''
-            if recipient_id and recipient_iban:
-                iban_to_biotag[recipient_iban] = recipient_id
+        # Utiliser recipient_id comme biotag si disponible
+        recipient_id = tx.recipient_id.strip() if tx.recipient_id else ''
+        recipient_iban = tx.recipient_iban.strip() if tx.recipient_iban else ''
+        if recipient_id and recipient_iban:
+            iban_to_biotag[recipient_iban] = recipient_id
+    
+    return iban_to_biotag
+
+
+def _find_latest_file(dataset_dir: Path, prefix: str) -> Optional[Path]:
+    """Trouve le fichier {prefix}_*.json le plus récent, sinon {prefix}.json.
+    
+    Args:
+        dataset_dir: Dossier du dataset
+        prefix: Préfixe du fichier (ex: "generated_sms")
         
-        return iban_to_biotag
-    except Exception:
-        # Si les transactions ne sont pas encore chargées, retourner un dict vide
-        return {}
+    Returns:
+        Chemin du fichier à charger, ou None s'il n'existe pas
+    """
+    # Try to find timestamped files first
+    timestamped_files = list(dataset_dir.glob(f"{prefix}_*.json"))
+    
+    if timestamped_files:
+        # Use the most recent timestamped file
+        return max(timestamped_files, key=lambda p: p.stat().st_mtime)
+    
+    # Fallback to the file without timestamp
+    latest_file = dataset_dir / f"{prefix}.json"
+    return latest_file if latest_file.exists() else None
 
 
-@lru_cache(maxsize=1)
-def load_users() -> List[User]:
-    """Load users from JSON file with caching.
+def transactions_file(dataset_dir: Path) -> Path:
+    """Fichier des transactions d'un dataset.
+    
+    Le CSV brut est lu directement quand il est présent (sans passer par la
+    conversion en JSON) ; sinon transactions_dataset.json.
+    """
+    csv_path = dataset_dir / "transactions_dataset.csv"
+    return csv_path if csv_path.exists() else dataset_dir / "transactions_dataset.json"
+
+
+def has_transactions_file(dataset_dir: Path) -> bool:
+    """Indique si un dossier contient un fichier de transactions (CSV ou JSON)."""
+    return transactions_file(dataset_dir).exists()
+
+
+def _iter_rows(file_path: Path):
+    """Itère sur les lignes brutes d'un fichier source (CSV des transactions ou JSON)."""
+    if file_path.suffix == ".csv":
+        return iter_transactions_csv(file_path)
+    return iter_json_array(file_path)
+
+
+def _dataset_source_files(dataset_dir: Path) -> List[Path]:
+    """Liste les fichiers sources lus par les loaders pour ce dataset."""
+    files = [
+        dataset_dir / "users_descriptions.json",
+        dataset_dir / "users.json",
+        transactions_file(dataset_dir),
+        dataset_dir / "locations.json",
+    ]
+    for prefix in ("generated_sms", "generated_mails"):
+        latest_file = _find_latest_file(dataset_dir, prefix)
+        if latest_file:
+            files.append(latest_file)
+    return files
+
+
+def _read_users(dataset_dir: Path, transactions: List[TransactionRecord]) -> List[UserRecord]:
+    """Load users from JSON file.
     
     Tries to load from users_descriptions.json first (which contains biotags),
     falls back to users.json if not available. Enrichit automatiquement les
     utilisateurs avec leurs biotags depuis les transactions si manquants.
     """
-    dataset_dir = get_dataset_dir()
-    
     # Try to load from users_descriptions.json first (contains biotags)
     descriptions_path = dataset_dir / "users_descriptions.json"
     if descriptions_path.exists():
-        with open(descriptions_path, 'r', encoding='utf-8') as f:
-            descriptions_data = json.load(f)
+        descriptions_data = iter_json_array(descriptions_path)
         
         users = []
         for item in descriptions_data:
@@ -142,17 +265,15 @@ def load_users() -> List[User]:
                 "biotag": biotag,
                 "description": description
             }
-            users.append(User(**user_dict))
+            users.append(UserRecord.from_model(User(**user_dict)))
         
         return users
     
     # Fallback to users.json if users_descriptions.json doesn't exist
-    file_path = dataset_dir / "users.json"
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = iter_json_array(dataset_dir / "users.json")
     
     # Enrichir les utilisateurs avec leurs biotags depuis les transactions
-    iban_to_biotag = _build_iban_to_biotag_mapping()
+    iban_to_biotag = _build_iban_to_biotag_mapping(transactions)
     
     enriched_users = []
     for item in data:
@@ -162,86 +283,480 @@ def load_users() -> List[User]:
             if iban in iban_to_biotag:
                 item['biotag'] = iban_to_biotag[iban]
         
-        enriched_users.append(User(**item))
+        enriched_users.append(UserRecord.from_model(User(**item)))
     
     return enriched_users
 
 
-@lru_cache(maxsize=1)
-def load_transactions() -> List[Transaction]:
-    """Load transactions from JSON file with caching."""
-    file_path = get_dataset_dir() / "transactions_dataset.json"
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return [Transaction(**item) for item in data]
+# Chargements en cours partagés entre appelants concurrents
+# (par dataset, et par fichier: chemin + empreinte du contenu)
+_dataset_loads = SingleFlight()
+_file_loads = SingleFlight()
 
 
-@lru_cache(maxsize=1)
-def load_locations() -> List[Location]:
-    """Load locations from JSON file with caching."""
-    file_path = get_dataset_dir() / "locations.json"
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return [Location(**item) for item in data]
+def _read_records(
+    file_path: Optional[Path],
+    record_cls: type,
+    digests: Dict[str, str],
+    ledger: ValidationLedger,
+) -> list:
+    """Lit un fichier JSON en records, validés une seule fois par version du fichier.
+    
+    Les lectures concurrentes d'un même fichier (même contenu) partagent un
+    seul parsing.
+    
+    Args:
+        file_path: Fichier à lire (None si absent du dataset)
+        record_cls: Classe de record (TransactionRecord, LocationRecord...)
+        digests: Empreintes des fichiers sources (file_digests)
+        ledger: Registre de validation du dataset
+    """
+    if file_path is None:
+        return []
+    digest = digests.get(file_path.name)
+    return _file_loads.do(
+        (str(file_path), digest),
+        lambda: load_records(_iter_rows(file_path), record_cls, ledger, file_path.name, digest),
+    )
+
+
+def _read_transactions(dataset_dir: Path, digests: Dict[str, str], ledger: ValidationLedger) -> List[TransactionRecord]:
+    """Load transactions from the CSV (preferred) or JSON file."""
+    return _read_records(transactions_file(dataset_dir), TransactionRecord, digests, ledger)
 
 
-@lru_cache(maxsize=1)
-def load_sms() -> List[SMS]:
-    """Load SMS messages from JSON file with caching.
+def _read_locations(dataset_dir: Path, digests: Dict[str, str], ledger: ValidationLedger) -> List[LocationRecord]:
+    """Load locations from JSON file."""
+    return _read_records(dataset_dir / "locations.json", LocationRecord, digests, ledger)
+
+
+def _read_sms(dataset_dir: Path, digests: Dict[str, str], ledger: ValidationLedger) -> List[SMSRecord]:
+    """Load SMS messages from JSON file.
     
     Tries to find files matching generated_sms_*.json pattern first,
     falls back to generated_sms.json if no timestamped files exist.
     """
-    dataset_dir = get_dataset_dir()
+    latest_file = _find_latest_file(dataset_dir, "generated_sms")
+    return _read_records(latest_file, SMSRecord, digests, ledger)
+
+
+def _read_emails(dataset_dir: Path, digests: Dict[str, str], ledger: ValidationLedger) -> Sequence[EmailRecord]:
+    """Load emails from JSON file.
     
-    # Try to find timestamped files first
-    sms_files = list(dataset_dir.glob("generated_sms_*.json"))
+    Tries to find files matching generated_mails_*.json pattern first,
+    falls back to generated_mails.json if no timestamped files exist.
+    Only the headers and the position of each email in the file are kept
+    in memory; bodies are read on demand (MailStore).
+    """
+    latest_file = _find_latest_file(dataset_dir, "generated_mails")
+    if latest_file is None:
+        return []
+    digest = digests.get(latest_file.name)
+    return _file_loads.do(
+        (str(latest_file), digest),
+        load_mailbox, latest_file, ledger, digest,
+    )
+
+
+def _parse_records(
+    file_path: Path,
+    record_cls: type,
+    modified: Optional[set],
+) -> Tuple[Sequence, Optional[List[int]]]:
+    """Parse un fichier en records (exécuté dans un worker du pool).
     
-    if sms_files:
-        # Use the most recent timestamped file
-        latest_file = max(sms_files, key=lambda p: p.stat().st_mtime)
+    Les emails ne sont qu'indexés (MailStore) : seuls leurs en-têtes et
+    positions repassent au processus principal.
+    """
+    if record_cls is EmailRecord:
+        return scan_mailbox(file_path, modified)
+    return build_records(_iter_rows(file_path), record_cls, modified)
+
+
+def _read_files_parallel(
+    dataset_dir: Path,
+    digests: Dict[str, str],
+    ledger: ValidationLedger,
+    build: DatasetBuild,
+    executor: Executor,
+) -> Dict[str, list]:
+    """Parse en parallèle les fichiers transactions, locations, SMS et emails.
+    
+    Chaque fichier est parsé par un worker ; le registre de validation n'est
+    lu et mis à jour que par le processus principal.
+    
+    Returns:
+        Records par phase ("transactions", "locations", "sms", "emails")
+    """
+    files = {
+        "transactions": (transactions_file(dataset_dir), TransactionRecord),
+        "locations": (dataset_dir / "locations.json", LocationRecord),
+        "sms": (_find_latest_file(dataset_dir, "generated_sms"), SMSRecord),
+        "emails": (_find_latest_file(dataset_dir, "generated_mails"), EmailRecord),
+    }
+    
+    start = time.perf_counter()
+    futures = {}
+    for name, (file_path, record_cls) in files.items():
+        if file_path is None:
+            continue
+        digest = digests.get(file_path.name)
+        modified = ledger.modified_rows(file_path.name, digest, record_cls) if digest else None
+        future = executor.submit(_parse_records, file_path, record_cls, modified)
+        futures[future] = (name, file_path, record_cls, digest)
+    
+    results: Dict[str, list] = {name: [] for name in files}
+    for future in as_completed(futures):
+        name, file_path, record_cls, digest = futures[future]
+        records, modified_rows = future.result()
+        if isinstance(records, MailStore):
+            # Le chemin ne traverse pas le pickle : on le rattache au dossier
+            records.bind(file_path.parent)
+        if modified_rows is not None and digest:
+            ledger.record(file_path.name, digest, record_cls, modified_rows)
+        results[name] = records
+        build.record(name, time.perf_counter() - start)
+    return results
+
+
+def _make_executor(parallel: str) -> Executor:
+    """Crée le pool de workers pour le parsing parallèle."""
+    if parallel == "process":
+        # Pas de fork depuis un processus multi-thread (uvicorn, thread du builder) :
+        # les verrous hérités des autres threads pourraient bloquer les workers
+        return ProcessPoolExecutor(
+            max_workers=LOAD_WORKERS,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    if parallel == "thread":
+        return ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="dataset-parse")
+    raise ValueError(f"Unknown parallel load mode '{parallel}' (expected 'process', 'thread' or 'none')")
+
+
+def _build_snapshot(
+    dataset_dir: Path,
+    fingerprint: str,
+    digests: Dict[str, str],
+    build: DatasetBuild,
+    parallel: Optional[str] = None,
+) -> DatasetSnapshot:
+    """Parse tous les fichiers du dataset et construit ses index.
+    
+    Les fichiers sont lus en streaming (élément par élément) : chaque objet
+    JSON est validé par son modèle Pydantic puis stocké en record compact
+    avant de lire le suivant, ce qui garde le pic mémoire proche de la
+    taille finale des données chargées.
+    
+    Les fichiers déjà validés dans une version identique (registre de
+    validation) sont reconstruits sans repasser par Pydantic.
+    
+    Avec `parallel` ("process" ou "thread"), les quatre gros fichiers sont
+    parsés simultanément par un pool de workers ; les utilisateurs (qui
+    dépendent des transactions) et les index sont construits ensuite.
+    """
+    ledger = ValidationLedger(dataset_dir)
+    if parallel and parallel != "none":
+        with _make_executor(parallel) as executor:
+            records = _read_files_parallel(dataset_dir, digests, ledger, build, executor)
+        transactions = records["transactions"]
+        locations = records["locations"]
+        sms = records["sms"]
+        emails = records["emails"]
+        with build.phase("users"):
+            users = _read_users(dataset_dir, transactions)
     else:
-        # Fallback to generated_sms.json (without timestamp)
-        latest_file = dataset_dir / "generated_sms.json"
-        if not latest_file.exists():
-            return []
+        with build.phase("transactions"):
+            transactions = _read_transactions(dataset_dir, digests, ledger)
+        with build.phase("users"):
+            users = _read_users(dataset_dir, transactions)
+        with build.phase("locations"):
+            locations = _read_locations(dataset_dir, digests, ledger)
+        with build.phase("sms"):
+            sms = _read_sms(dataset_dir, digests, ledger)
+        with build.phase("emails"):
+            emails = _read_emails(dataset_dir, digests, ledger)
+    with build.phase("index"):
+        index = DatasetIndex(
+            users=users,
+            transactions=transactions,
+            locations=locations,
+            emails=emails,
+            sms=sms,
+        )
+    return DatasetSnapshot(
+        fingerprint=fingerprint,
+        users=users,
+        transactions=transactions,
+        locations=locations,
+        sms=sms,
+        emails=emails,
+        index=index,
+    )
+
+
+def _iter_validated(file_path: Optional[Path], record_cls: type) -> Iterator:
+    """Itère sur les records validés d'un fichier, sans les garder en mémoire."""
+    if file_path is None:
+        return
+    for item in _iter_rows(file_path):
+        yield record_cls.from_model(record_cls._model(**item))
+
+
+def _load_dataset_sqlite(folder_name: str, build: DatasetBuild) -> SQLiteDataset:
+    """Ouvre le store SQLite d'un dataset, en l'important s'il n'existe pas.
+    
+    Le store est propre à une version des fichiers sources (empreinte) :
+    modifier un fichier déclenche un nouvel import au chargement suivant.
+    Les fichiers sont importés en streaming, sans jamais charger le dataset
+    entier en mémoire.
+    """
+    dataset_dir = get_dataset_dir(resolve_dataset_folder(folder_name))
+    with build.phase("fingerprint"):
+        digests = file_digests(dataset_dir, _dataset_source_files(dataset_dir))
+        fingerprint = compute_fingerprint(digests)
     
-    with open(latest_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return [SMS(**item) for item in data]
+    path = store_path(dataset_dir, fingerprint)
+    if not path.exists():
+        with build.phase("import"):
+            import_dataset(
+                path,
+                transactions=_iter_validated(transactions_file(dataset_dir), TransactionRecord),
+                users=lambda transactions: _read_users(dataset_dir, transactions),
+                locations=_iter_validated(dataset_dir / "locations.json", LocationRecord),
+                sms=_iter_validated(_find_latest_file(dataset_dir, "generated_sms"), SMSRecord),
+                emails=_iter_validated(_find_latest_file(dataset_dir, "generated_mails"), EmailRecord),
+            )
+        logger.info(f"Imported dataset '{folder_name}' into {path}")
+    return SQLiteDataset(path, fingerprint)
 
 
-@lru_cache(maxsize=1)
-def load_emails() -> List[Email]:
-    """Load emails from JSON file with caching.
+# Phases d'un chargement complet (pour la progression des builds)
+if STORAGE_BACKEND == "sqlite":
+    _BUILD_PHASES = ["fingerprint", "import"]
+else:
+    _BUILD_PHASES = ["fingerprint", "snapshot", "transactions", "users", "locations", "sms", "emails", "index", "save"]
+
+
+def _load_dataset_folder(
+    folder_name: str,
+    build: Optional[DatasetBuild] = None,
+    parallel: Optional[str] = None,
+) -> DatasetSnapshot:
+    """Charge un dossier dataset (enregistrements + index).
     
-    Tries to find files matching generated_mails_*.json pattern first,
-    falls back to generated_mails.json if no timestamped files exist.
+    Utilise le snapshot binaire du dataset (API_SNAPSHOT_DIR) quand les fichiers
+    sources n'ont pas changé ; sinon parse les fichiers et écrit un nouveau
+    snapshot pour les démarrages suivants. Avec API_STORAGE_BACKEND=sqlite,
+    le dataset est servi depuis son store SQLite (voir sqlite_store).
+    
+    Args:
+        folder_name: Nom du dossier dataset
+        build: Suivi de progression et des temps par phase (optionnel)
+        parallel: Mode de parsing parallèle ("process", "thread" ; défaut: séquentiel)
+    
+    Raises:
+        ValueError: Si le dataset n'existe pas ou est invalide
     """
-    dataset_dir = get_dataset_dir()
+    build = build or DatasetBuild(folder_name)
+    if STORAGE_BACKEND == "sqlite":
+        return _load_dataset_sqlite(folder_name, build)
     
-    # Try to find timestamped files first
-    email_files = list(dataset_dir.glob("generated_mails_*.json"))
+    dataset_dir = get_dataset_dir(resolve_dataset_folder(folder_name))
+    with build.phase("fingerprint"):
+        digests = file_digests(dataset_dir, _dataset_source_files(dataset_dir))
+        fingerprint = compute_fingerprint(digests)
     
-    if email_files:
-        # Use the most recent timestamped file
-        latest_file = max(email_files, key=lambda p: p.stat().st_mtime)
-    else:
-        # Fallback to generated_mails.json (without timestamp)
-        latest_file = dataset_dir / "generated_mails.json"
-        if not latest_file.exists():
-            return []
+    with build.phase("snapshot"):
+        snapshot = load_snapshot(dataset_dir, fingerprint)
+    if snapshot is not None:
+        logger.info(f"Loaded dataset '{folder_name}' from snapshot {fingerprint}")
+        return snapshot
     
-    with open(latest_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return [Email(**item) for item in data]
+    snapshot = _build_snapshot(dataset_dir, fingerprint, digests, build, parallel)
+    with build.phase("save"):
+        save_snapshot(dataset_dir, snapshot)
+    return snapshot
 
 
-def clear_cache():
-    """Clear all caches."""
-    load_users.cache_clear()
-    load_transactions.cache_clear()
-    load_locations.cache_clear()
-    load_sms.cache_clear()
-    load_emails.cache_clear()
+def _load_dataset_shared(
+    folder_name: str,
+    build: Optional[DatasetBuild] = None,
+    parallel: Optional[str] = None,
+) -> DatasetSnapshot:
+    """Charge un dataset, un seul chargement à la fois par dossier.
+    
+    Les requêtes à froid et le build d'un changement de dataset qui ciblent
+    le même dossier attendent le chargement en cours au lieu d'en lancer un
+    autre.
+    """
+    return _dataset_loads.do(folder_name, _load_dataset_folder, folder_name, build, parallel)
+
+
+def _build_dataset_parallel(folder_name: str, build: DatasetBuild) -> DatasetSnapshot:
+    """Build d'arrière-plan (préchargement, changement de dataset) avec parsing parallèle."""
+    return _load_dataset_shared(folder_name, build, PARALLEL_LOAD)
 
+
+def _estimate_dataset_size(folder_name: str) -> int:
+    """Estime l'empreinte mémoire d'un dataset chargé (taille des fichiers sources).
+    
+    Les records compacts occupent un ordre de grandeur comparable au JSON
+    source : c'est une approximation suffisante pour le budget LRU. Un
+    dataset SQLite reste sur disque et ne compte pas dans le budget, pas
+    plus que la boîte mail : ses corps restent sur disque (MailStore) et
+    seuls ses en-têtes et positions, négligeables, sont en mémoire.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        return 0
+    dataset_dir = get_dataset_dir(folder_name)
+    mailbox = _find_latest_file(dataset_dir, "generated_mails")
+    return sum(
+        path.stat().st_size
+        for path in _dataset_source_files(dataset_dir)
+        if path != mailbox and path.exists()
+    )
+
+
+_registry = DatasetRegistry(
+    loader=_load_dataset_shared,
+    sizeof=_estimate_dataset_size,
+    memory_budget=DATASET_MEMORY_BUDGET_MB * 1024 * 1024,
+)
+
+
+def _install_dataset(folder_name: str, snapshot: DatasetSnapshot) -> None:
+    """Installe un dataset construit en arrière-plan et l'active (échange atomique)."""
+    global _DATASET_FOLDER
+    _registry.put(folder_name, snapshot)
+    _DATASET_FOLDER = folder_name
+    aggregated_responses.clear()
+
+
+_builder = DatasetBuilder(
+    build=_build_dataset_parallel,
+    on_done=_install_dataset,
+    phases=_BUILD_PHASES,
+)
+
+
+def switch_dataset(folder_name: str) -> DatasetBuild:
+    """Reconstruit un dataset en arrière-plan puis l'active.
+    
+    Le dataset actif continue de servir les requêtes pendant la construction ;
+    le nouveau n'est activé qu'une fois entièrement chargé et indexé.
+    
+    Args:
+        folder_name: Nom du dossier dataset (ex: "public 2", "public 3")
+        
+    Returns:
+        DatasetBuild pour suivre la progression
+        
+    Raises:
+        ValueError: Si le dataset n'existe pas ou est invalide
+    """
+    return _builder.start(resolve_dataset_folder(folder_name))
+
+
+def preload_dataset() -> Optional[DatasetBuild]:
+    """Lance le préchargement du dataset actif en arrière-plan (démarrage).
+    
+    Returns:
+        DatasetBuild pour suivre la progression, ou None si désactivé
+        (API_PRELOAD_DATASET=0)
+    """
+    if not PRELOAD_DATASET:
+        return None
+    return _builder.start(_DATASET_FOLDER)
+
+
+def is_dataset_ready(dataset: Optional[str] = None) -> bool:
+    """Indique si un dataset (défaut: actif) est chargé et indexé en mémoire."""
+    return _registry.is_loaded(dataset or _DATASET_FOLDER)
+
+
+def wait_for_build(build: DatasetBuild, timeout: Optional[float] = None) -> bool:
+    """Attend la fin d'un build (False si le délai expire)."""
+    return _builder.wait(build, timeout)
+
+
+def dataset_build_status() -> Optional[dict]:
+    """Statut du dernier build demandé (None si aucun)."""
+    return _builder.status()
+
+
+def load_dataset(dataset: Optional[str] = None) -> DatasetSnapshot:
+    """Charge un dataset (enregistrements + index), avec cache par dataset.
+    
+    Args:
+        dataset: Nom du dossier dataset (défaut: dataset actif)
+    
+    Returns:
+        DatasetSnapshot du dataset demandé
+        
+    Raises:
+        ValueError: Si le dataset n'existe pas ou est invalide
+    """
+    # Le nom n'est validé qu'au chargement, pas à chaque requête
+    folder_name = dataset or _DATASET_FOLDER
+    data = _registry.get(folder_name)
+    if not _mailbox_is_current(data):
+        # Les corps d'emails sont lus sur disque : une boîte modifiée ne
+        # correspond plus aux positions indexées, le dataset est reconstruit
+        logger.info(f"Mailbox of dataset '{folder_name}' changed on disk, reloading it")
+        _registry.evict(folder_name, data)
+        data = _registry.get(folder_name)
+    return data
+
+
+def _mailbox_is_current(data) -> bool:
+    """Vérifie que la boîte mail indexée d'un dataset n'a pas changé sur disque."""
+    emails = getattr(data, "emails", None)
+    return not isinstance(emails, MailStore) or emails.is_current()
+
+
+def loaded_datasets() -> List[dict]:
+    """Liste les datasets actuellement en mémoire (du plus froid au plus récent)."""
+    return _registry.loaded()
+
+
+def load_users(dataset: Optional[str] = None) -> List[UserRecord]:
+    """Load users of a dataset (default: the active one)."""
+    return load_dataset(dataset).users
+
+
+def load_transactions(dataset: Optional[str] = None) -> List[TransactionRecord]:
+    """Load transactions of a dataset (default: the active one)."""
+    return load_dataset(dataset).transactions
+
+
+def load_locations(dataset: Optional[str] = None) -> List[LocationRecord]:
+    """Load locations of a dataset (default: the active one)."""
+    return load_dataset(dataset).locations
+
+
+def load_sms(dataset: Optional[str] = None) -> List[SMSRecord]:
+    """Load SMS messages of a dataset (default: the active one)."""
+    return load_dataset(dataset).sms
+
+
+def load_emails(dataset: Optional[str] = None) -> Sequence[EmailRecord]:
+    """Load emails of a dataset (default: the active one)."""
+    return load_dataset(dataset).emails
+
+
+def load_dataset_index(dataset: Optional[str] = None) -> DatasetIndex:
+    """Récupère les index d'un dataset (construits une seule fois par dataset).
+    
+    Args:
+        dataset: Nom du dossier dataset (défaut: dataset actif)
+    
+    Returns:
+        DatasetIndex sur les utilisateurs, transactions, locations, emails et SMS
+    """
+    return load_dataset(dataset).index
+
+
+def clear_cache():
+    """Clear all caches (every loaded dataset and the rendered responses)."""
+    _registry.clear()
+    aggregated_responses.clear()
@@ -0,0 +1,156 @@
+"""
+Background dataset builds.
+
+Loading a dataset (at startup or on a switch) parses files and builds
+indexes, which can take a while on large folders. Builds run in a worker thread while the current dataset
+keeps serving; the finished dataset is then handed over in one step
+(``on_done``), so requests see either the old or the new dataset, never a
+partially loaded one.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetBuild:
+    """Progress and per-phase timings of one dataset load."""
+
+    def __init__(self, folder_name: str, phases: Optional[List[str]] = None):
+        """
+        Args:
+            folder_name: Dataset folder being loaded
+            phases: Expected phases, used to report progress
+        """
+        self.folder_name = folder_name
+        self.expected_phases = list(phases or [])
+        self.state = "pending"
+        self.current_phase: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time one phase of the load."""
+        self.current_phase = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 4)
+            self.current_phase = None
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record the duration of a phase timed elsewhere (e.g. in a worker)."""
+        self.timings[name] = round(seconds, 4)
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the expected phases completed (1.0 once done)."""
+        if self.state == "done":
+            return 1.0
+        if not self.expected_phases:
+            return 0.0
+        completed = sum(1 for name in self.expected_phases if name in self.timings)
+        return round(completed / len(self.expected_phases), 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Describe the build for the status endpoint."""
+        end = self.finished_at or time.time()
+        return {
+            "dataset_folder": self.folder_name,
+            "state": self.state,
+            "progress": self.progress,
+            "current_phase": self.current_phase,
+            "phase_timings": dict(self.timings),
+            "elapsed_seconds": round(end - self.started_at, 4) if self.started_at else None,
+            "error": self.error,
+        }
+
+
+class DatasetBuilder:
+    """Runs dataset builds in worker threads and swaps in the latest one."""
+
+    def __init__(
+        self,
+        build: Callable[[str, DatasetBuild], Any],
+        on_done: Callable[[str, Any], None],
+        phases: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            build: Loads a dataset folder, reporting into the DatasetBuild
+            on_done: Installs a built dataset (called for the latest request only)
+            phases: Expected phases of a build, for progress reporting
+        """
+        self._build = build
+        self._on_done = on_done
+        self._phases = phases
+        self._lock = threading.Lock()
+        self._latest: Optional[DatasetBuild] = None
+        self._done = threading.Condition(self._lock)
+
+    def start(self, folder_name: str) -> DatasetBuild:
+        """
+        Start building a dataset in the background.
+
+        A build already running for the same folder is reused. If several
+        folders are requested in a row, only the last one is installed.
+        """
+        with self._lock:
+            latest = self._latest
+            if latest is not None and latest.folder_name == folder_name and latest.state in ("pending", "running"):
+                return latest
+            build = DatasetBuild(folder_name, self._phases)
+            self._latest = build
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(build,),
+            name=f"dataset-build-{folder_name}",
+            daemon=True,
+        )
+        thread.start()
+        return build
+
+    def _run(self, build: DatasetBuild) -> None:
+        build.state = "running"
+        build.started_at = time.time()
+        try:
+            dataset = self._build(build.folder_name, build)
+        except Exception as e:
+            logger.error(f"Dataset build for '{build.folder_name}' failed: {e}", exc_info=True)
+            with self._lock:
+                build.error = str(e)
+                build.state = "failed"
+                build.finished_at = time.time()
+                self._done.notify_all()
+            return
+
+        with self._lock:
+            superseded = build is not self._latest
+            if not superseded:
+                self._on_done(build.folder_name, dataset)
+            build.state = "superseded" if superseded else "done"
+            build.finished_at = time.time()
+            self._done.notify_all()
+        logger.info(f"Dataset build for '{build.folder_name}' {build.state} in {build.to_dict()['elapsed_seconds']}s")
+
+    def wait(self, build: DatasetBuild, timeout: Optional[float] = None) -> bool:
+        """Block until a build finishes; return False on timeout."""
+        with self._done:
+            return self._done.wait_for(
+                lambda: build.state in ("done", "failed", "superseded"),
+                timeout=timeout,
+            )
+
+    def status(self) -> Optional[Dict[str, Any]]:
+        """Describe the latest requested build, if any."""
+        with self._lock:
+            return self._latest.to_dict() if self._latest else None
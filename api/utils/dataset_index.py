@@ -0,0 +1,349 @@
+"""
+In-memory indexes over a loaded dataset.
+
+The indexes are built once per dataset, next to the cached loaders in
+``api.utils.data_loader``, so that the aggregated endpoint can answer its
+lookups without scanning the whole dataset on every request.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from api.utils.record_store import (
+    UserRecord,
+    TransactionRecord,
+    LocationRecord,
+    SMSRecord,
+    EmailRecord,
+)
+from api.utils.email_headers import EmailHeaders, parse_email_headers
+from api.utils.mail_store import MailStore
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_MICROSECONDS_PER_HOUR = 3600 * 1_000_000
+# Needles are bucketed by their first characters to prune substring checks
+_NEEDLE_PREFIX_LENGTH = 3
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[int]:
+    """
+    Parse an ISO 8601 timestamp into epoch microseconds.
+
+    Applies the normalization used throughout the API: ``Z`` is read as
+    UTC and timestamps without a timezone are assumed to be UTC.
+
+    Args:
+        value: ISO 8601 timestamp (may be empty)
+
+    Returns:
+        Microseconds since the Unix epoch, or None if missing or invalid
+    """
+    if not value or not value.strip():
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - _EPOCH) // _MICROSECOND
+
+
+class _Timeline:
+    """Transactions of one IBAN sorted by time, for bisect window queries."""
+
+    __slots__ = ("epochs", "positions", "transactions")
+
+    def __init__(self) -> None:
+        self.epochs: List[int] = []
+        self.positions: List[int] = []
+        self.transactions: List[TransactionRecord] = []
+
+
+class _LocationSeries:
+    """
+    Locations of one biotag as sorted NumPy time series.
+
+    ``epochs`` is sorted by time; ``positions`` maps each entry back to
+    its rank in ``locations`` (dataset order).
+    """
+
+    __slots__ = ("epochs", "positions", "locations")
+
+    def __init__(self, locations: List[LocationRecord]) -> None:
+        parsed = [
+            (epoch, position)
+            for position, epoch in enumerate(parse_timestamp(loc.datetime) for loc in locations)
+            if epoch is not None
+        ]
+        epochs = np.fromiter((entry[0] for entry in parsed), dtype=np.int64, count=len(parsed))
+        positions = np.fromiter((entry[1] for entry in parsed), dtype=np.int64, count=len(parsed))
+        order = np.argsort(epochs, kind="stable")
+
+        self.epochs: np.ndarray = epochs[order]
+        self.positions: np.ndarray = positions[order]
+        self.locations = locations
+
+
+def user_id_for(user: UserRecord) -> str:
+    """Return the Prénom_Nom identifier used by the SMS and email files."""
+    return f"{user.first_name}_{user.last_name}"
+
+
+class _SubstringIndex:
+    """
+    Inverted index from normalized id to record positions.
+
+    Matching keeps the historical substring semantics (``needle in key``,
+    case-insensitive). Expansions for the known needles (user ids) are
+    precomputed, so lookups cost O(matches) instead of a scan.
+    """
+
+    __slots__ = ("_postings", "_expansions")
+
+    def __init__(self, postings: Dict[str, List[int]], needles: Iterable[str]) -> None:
+        self._postings = postings
+        self._expansions: Dict[str, List[int]] = {}
+
+        by_prefix: Dict[str, List[str]] = {}
+        short_needles: List[str] = []
+        matched: Dict[str, set] = {}
+        for needle in needles:
+            needle = needle.lower()
+            if not needle or needle in matched:
+                continue
+            matched[needle] = set()
+            if len(needle) < _NEEDLE_PREFIX_LENGTH:
+                short_needles.append(needle)
+            else:
+                by_prefix.setdefault(needle[:_NEEDLE_PREFIX_LENGTH], []).append(needle)
+
+        for key, positions in postings.items():
+            hits = {needle for needle in short_needles if needle in key}
+            for start in range(len(key) - _NEEDLE_PREFIX_LENGTH + 1):
+                for needle in by_prefix.get(key[start:start + _NEEDLE_PREFIX_LENGTH], ()):
+                    if key.startswith(needle, start):
+                        hits.add(needle)
+            for needle in hits:
+                matched[needle].update(positions)
+
+        for needle, positions in matched.items():
+            self._expansions[needle] = sorted(positions)
+
+    def lookup(self, needle: str) -> List[int]:
+        """Return the sorted positions of records whose key contains needle."""
+        needle = needle.lower()
+        expansion = self._expansions.get(needle)
+        if expansion is not None:
+            return expansion
+        # Unknown id: scan the distinct keys only, never the records
+        positions = set()
+        for key, key_positions in self._postings.items():
+            if needle in key:
+                positions.update(key_positions)
+        return sorted(positions)
+
+
+class DatasetIndex:
+    """
+    Primary-key and secondary indexes for one dataset.
+
+    Attributes:
+        transactions_by_id: transaction_id -> TransactionRecord
+        users_by_iban: IBAN -> UserRecord
+        users_by_biotag: biotag -> UserRecord
+        transaction_epochs: transaction_id -> parsed timestamp (epoch microseconds)
+        emails: emails in dataset order
+        email_headers: parsed headers, aligned with ``emails``
+        sms: SMS in dataset order
+    """
+
+    def __init__(
+        self,
+        users: List[UserRecord],
+        transactions: List[TransactionRecord],
+        locations: List[LocationRecord],
+        emails: Sequence[EmailRecord] = (),
+        sms: Sequence[SMSRecord] = (),
+    ):
+        self.users_by_iban: Dict[str, UserRecord] = {user.iban: user for user in users}
+        self.users_by_biotag: Dict[str, UserRecord] = {
+            user.biotag: user for user in users if user.biotag
+        }
+
+        self.transactions_by_id: Dict[str, TransactionRecord] = {}
+        self.transaction_epochs: Dict[str, Optional[int]] = {}
+        timed: Dict[str, list] = {}
+        for position, tx in enumerate(transactions):
+            epoch = parse_timestamp(tx.timestamp)
+            # Keep the first occurrence, as the former linear scan did
+            if tx.transaction_id not in self.transactions_by_id:
+                self.transactions_by_id[tx.transaction_id] = tx
+                self.transaction_epochs[tx.transaction_id] = epoch
+            ibans = [tx.sender_iban]
+            if tx.recipient_iban != tx.sender_iban:
+                ibans.append(tx.recipient_iban)
+            for iban in ibans:
+                if iban and epoch is not None:
+                    timed.setdefault(iban, []).append((epoch, position, tx))
+
+        # Per-IBAN timelines sorted by time: window queries are two bisects
+        self._timelines: Dict[str, _Timeline] = {}
+        for iban, entries in timed.items():
+            entries.sort(key=lambda entry: (entry[0], entry[1]))
+            timeline = _Timeline()
+            timeline.epochs = [entry[0] for entry in entries]
+            timeline.positions = [entry[1] for entry in entries]
+            timeline.transactions = [entry[2] for entry in entries]
+            self._timelines[iban] = timeline
+
+        locations_by_biotag: Dict[str, List[LocationRecord]] = {}
+        for loc in locations:
+            locations_by_biotag.setdefault(loc.biotag, []).append(loc)
+        self._location_series: Dict[str, _LocationSeries] = {
+            biotag: _LocationSeries(biotag_locations)
+            for biotag, biotag_locations in locations_by_biotag.items()
+        }
+
+        # Emails: headers parsed once, inverted index on From/To user ids.
+        # A MailStore is kept as is: its bodies stay on disk.
+        if isinstance(emails, MailStore):
+            self.emails: Sequence[EmailRecord] = emails
+            self.email_headers: List[EmailHeaders] = emails.headers
+        else:
+            self.emails = list(emails)
+            self.email_headers = [parse_email_headers(email.mail) for email in self.emails]
+        email_postings: Dict[str, List[int]] = {}
+        for position, headers in enumerate(self.email_headers):
+            for user_key in {headers.from_id, headers.to_id}:
+                if user_key:
+                    email_postings.setdefault(user_key.lower(), []).append(position)
+        user_ids = [user_id_for(user) for user in users]
+        self._emails_by_user = _SubstringIndex(email_postings, user_ids)
+
+        # SMS: inverted index on normalized id_user
+        self.sms: List[SMSRecord] = list(sms)
+        sms_postings: Dict[str, List[int]] = {}
+        for position, message in enumerate(self.sms):
+            user_key = message.id_user.lower()
+            sms_postings.setdefault(user_key, []).append(position)
+        self._sms_by_user = _SubstringIndex(sms_postings, user_ids)
+
+    def get_transaction(self, transaction_id: str) -> Optional[TransactionRecord]:
+        """Return the transaction with this ID, or None."""
+        return self.transactions_by_id.get(transaction_id)
+
+    def find_user(self, biotag: Optional[str], iban: Optional[str]) -> Optional[UserRecord]:
+        """
+        Find a user by biotag first, then by IBAN as a fallback.
+
+        Args:
+            biotag: Biotag from the transaction (sender_id / recipient_id)
+            iban: IBAN from the transaction
+
+        Returns:
+            The matching user, or None
+        """
+        user = None
+        if biotag and biotag.strip():
+            user = self.users_by_biotag.get(biotag)
+        if not user and iban and iban.strip():
+            user = self.users_by_iban.get(iban)
+        return user
+
+    def transactions_near(
+        self,
+        iban: str,
+        transaction: TransactionRecord,
+        time_window_hours: float = 3,
+    ) -> List[TransactionRecord]:
+        """
+        Return the other transactions of an IBAN within a time window.
+
+        Uses the per-IBAN timeline: two bisects plus a slice, then the
+        matches are put back in dataset order.
+
+        Args:
+            iban: IBAN as sender or recipient
+            transaction: Reference transaction (excluded from the result)
+            time_window_hours: Half-width of the window, in hours
+
+        Returns:
+            Transactions within ±time_window_hours of the reference one
+        """
+        timeline = self._timelines.get(iban)
+        if timeline is None:
+            return []
+        ref_epoch = self.transaction_epochs.get(transaction.transaction_id)
+        if ref_epoch is None:
+            ref_epoch = parse_timestamp(transaction.timestamp)
+        if ref_epoch is None:
+            return []
+
+        window = int(time_window_hours * _MICROSECONDS_PER_HOUR)
+        lo = bisect_left(timeline.epochs, ref_epoch - window)
+        hi = bisect_right(timeline.epochs, ref_epoch + window)
+        matches = sorted(zip(timeline.positions[lo:hi], timeline.transactions[lo:hi]),
+                         key=lambda entry: entry[0])
+        return [
+            tx for _, tx in matches
+            if tx.transaction_id != transaction.transaction_id
+        ]
+
+    def locations_near(
+        self,
+        biotag: str,
+        timestamp: Optional[str],
+        time_window_hours: float = 24,
+    ) -> List[LocationRecord]:
+        """
+        Return the locations of a biotag within a time window.
+
+        The window is a ``searchsorted`` range query on the biotag's sorted
+        epoch array; matches are returned in dataset order.
+
+        Args:
+            biotag: Biotag of the user
+            timestamp: Reference timestamp (ISO 8601)
+            time_window_hours: Half-width of the window, in hours
+
+        Returns:
+            Locations within ±time_window_hours of the timestamp
+        """
+        series = self._location_series.get(biotag)
+        ref_epoch = parse_timestamp(timestamp)
+        if series is None or ref_epoch is None:
+            return []
+
+        window = int(time_window_hours * _MICROSECONDS_PER_HOUR)
+        lo = np.searchsorted(series.epochs, ref_epoch - window, side="left")
+        hi = np.searchsorted(series.epochs, ref_epoch + window, side="right")
+        return [series.locations[i] for i in np.sort(series.positions[lo:hi])]
+
+    def emails_for_user(self, user_id: str) -> List[EmailRecord]:
+        """
+        Return the emails whose From or To contains this user id.
+
+        Args:
+            user_id: User identifier (format: Prénom_Nom)
+
+        Returns:
+            Matching emails, in dataset order
+        """
+        return [self.emails[position] for position in self._emails_by_user.lookup(user_id)]
+
+    def sms_for_user(self, user_id: str) -> List[SMSRecord]:
+        """
+        Return the SMS whose id_user contains this user id.
+
+        Args:
+            user_id: User identifier (format: Prénom_Nom)
+
+        Returns:
+            Matching SMS, in dataset order
+        """
+        return [self.sms[position] for position in self._sms_by_user.lookup(user_id)]
@@ -0,0 +1,114 @@
+"""
+Registry of the datasets loaded by the API.
+
+Several dataset folders can be served at the same time: each one keeps its
+own records and indexes, and requests select a dataset by name. Loaded
+datasets are kept in least-recently-used order under a memory budget;
+when the budget is exceeded, the coldest datasets are dropped (they are
+reloaded from their snapshot on the next request).
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List
+
+from api.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetRegistry:
+    """Thread-safe LRU of loaded datasets with a memory budget."""
+
+    def __init__(
+        self,
+        loader: Callable[[str], Any],
+        sizeof: Callable[[str], int],
+        memory_budget: int,
+    ):
+        """
+        Args:
+            loader: Loads a dataset folder (e.g. into a DatasetSnapshot)
+            sizeof: Estimated memory footprint of a loaded dataset, in bytes
+            memory_budget: Total footprint above which cold datasets are evicted
+        """
+        self._loader = loader
+        self._sizeof = sizeof
+        self.memory_budget = memory_budget
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._loads = SingleFlight()
+
+    def get(self, folder_name: str) -> Any:
+        """
+        Return a loaded dataset, loading it on first use.
+
+        Concurrent requests for the same dataset wait for a single load;
+        requests for other datasets are not blocked by it.
+        """
+        with self._lock:
+            if folder_name in self._entries:
+                self._entries.move_to_end(folder_name)
+                return self._entries[folder_name]
+        return self._loads.do(folder_name, self._load_entry, folder_name)
+
+    def _load_entry(self, folder_name: str) -> Any:
+        """Load a dataset and insert it (runs once per concurrent miss)."""
+        with self._lock:
+            if folder_name in self._entries:
+                self._entries.move_to_end(folder_name)
+                return self._entries[folder_name]
+        dataset = self._loader(folder_name)
+        self.put(folder_name, dataset)
+        return dataset
+
+    def is_loaded(self, folder_name: str) -> bool:
+        """Tell whether a dataset is in memory (without loading it)."""
+        with self._lock:
+            return folder_name in self._entries
+
+    def put(self, folder_name: str, dataset: Any) -> None:
+        """Install (or replace) a loaded dataset in one step."""
+        size = self._sizeof(folder_name)
+        with self._lock:
+            self._entries[folder_name] = dataset
+            self._entries.move_to_end(folder_name)
+            self._sizes[folder_name] = size
+            self._evict_over_budget(keep=folder_name)
+
+    def _evict_over_budget(self, keep: str) -> None:
+        """Drop least recently used datasets until the budget is met (lock held)."""
+        while sum(self._sizes.values()) > self.memory_budget and len(self._entries) > 1:
+            folder_name = next(name for name in self._entries if name != keep)
+            del self._entries[folder_name]
+            del self._sizes[folder_name]
+            logger.info(f"Evicted dataset '{folder_name}' from memory (budget {self.memory_budget} bytes)")
+
+    def evict(self, folder_name: str, dataset: Any = None) -> None:
+        """
+        Drop a dataset so that its next use reloads it.
+
+        With `dataset`, only drop the entry if it is still that object (a
+        concurrent caller may already have reloaded it).
+        """
+        with self._lock:
+            if dataset is not None and self._entries.get(folder_name) is not dataset:
+                return
+            self._entries.pop(folder_name, None)
+            self._sizes.pop(folder_name, None)
+
+    def clear(self) -> None:
+        """Drop every loaded dataset."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+
+    def loaded(self) -> List[Dict[str, Any]]:
+        """Describe the loaded datasets, most recently used last."""
+        with self._lock:
+            return [
+                {"dataset_folder": name, "estimated_bytes": self._sizes[name]}
+                for name in self._entries
+            ]
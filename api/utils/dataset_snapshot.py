@@ -0,0 +1,208 @@
+"""
+Binary snapshot cache of parsed datasets.
+
+A snapshot holds the parsed records of a dataset folder plus its prebuilt
+DatasetIndex. It is keyed by a content hash of the source files, so it is
+reused only while the files are unchanged. Warm restarts then skip JSON
+parsing, Pydantic validation and index building entirely.
+
+Snapshots are pickles: loading one runs whatever it contains, so the
+snapshot directory is trusted input. It lives outside the dataset folders
+(which are user-writable and volume-mounted), in ``API_SNAPSHOT_DIR``
+(default ``~/.cache/reply-challenge/snapshots``), and must only be
+writable by the service.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from api.utils.dataset_index import DatasetIndex
+from api.utils.mail_store import MailboxChangedError, MailStore
+from api.utils.record_store import (
+    UserRecord,
+    TransactionRecord,
+    LocationRecord,
+    SMSRecord,
+    EmailRecord,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the pickled layout (records or DatasetIndex) changes
+SNAPSHOT_FORMAT_VERSION = 8
+CACHE_DIR_NAME = ".cache"
+# Trusted directory of the pickled snapshots (one subfolder per dataset)
+SNAPSHOT_DIR = Path(os.getenv(
+    'API_SNAPSHOT_DIR',
+    str(Path.home() / ".cache" / "reply-challenge" / "snapshots"),
+))
+_SNAPSHOT_PREFIX = "snapshot-"
+_FINGERPRINTS_FILE = "fingerprints.json"
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+class DatasetSnapshot:
+    """Parsed records and indexes of one dataset folder."""
+
+    def __init__(
+        self,
+        fingerprint: str,
+        users: List[UserRecord],
+        transactions: List[TransactionRecord],
+        locations: List[LocationRecord],
+        sms: List[SMSRecord],
+        emails: List[EmailRecord],
+        index: DatasetIndex,
+    ):
+        self.fingerprint = fingerprint
+        self.users = users
+        self.transactions = transactions
+        self.locations = locations
+        self.sms = sms
+        self.emails = emails
+        self.index = index
+
+
+def _hash_file(path: Path) -> str:
+    """Return the BLAKE2b digest of a file's content."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_digests(dataset_dir: Path, source_files: Iterable[Path]) -> Dict[str, str]:
+    """
+    Return the content digest of each existing source file.
+
+    Digests are memoized in ``.cache/fingerprints.json`` by (size, mtime):
+    unchanged files are not re-read on warm restarts.
+
+    Args:
+        dataset_dir: Dataset folder
+        source_files: Files the loaders read (missing files are skipped)
+
+    Returns:
+        Mapping of file name to digest
+    """
+    cache_dir = dataset_dir / CACHE_DIR_NAME
+    memo_path = cache_dir / _FINGERPRINTS_FILE
+    try:
+        with open(memo_path, 'r', encoding='utf-8') as f:
+            memo: Dict[str, dict] = json.load(f)
+    except (OSError, ValueError):
+        memo = {}
+
+    digests = {}
+    updated = False
+    for path in sorted(source_files):
+        if not path.exists():
+            continue
+        stat = path.stat()
+        entry = memo.get(path.name)
+        if not entry or entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": _hash_file(path)}
+            memo[path.name] = entry
+            updated = True
+        digests[path.name] = entry["digest"]
+
+    if updated:
+        try:
+            cache_dir.mkdir(exist_ok=True)
+            atomic_write(memo_path, json.dumps(memo, indent=2).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Could not store file fingerprints in {cache_dir}: {e}")
+    return digests
+
+
+def compute_fingerprint(digests: Dict[str, str]) -> str:
+    """
+    Compute the content hash identifying a dataset version.
+
+    Args:
+        digests: Per-file digests from file_digests
+
+    Returns:
+        Hex digest covering the snapshot format and every source file
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"format:{SNAPSHOT_FORMAT_VERSION}".encode())
+    for name in sorted(digests):
+        digest.update(f"{name}:{digests[name]}".encode())
+    return digest.hexdigest()
+
+
+def snapshot_path(dataset_dir: Path, fingerprint: str) -> Path:
+    """Return the snapshot file path for a dataset version (under SNAPSHOT_DIR)."""
+    return SNAPSHOT_DIR / dataset_dir.name / f"{_SNAPSHOT_PREFIX}{fingerprint}.pkl"
+
+
+def load_snapshot(dataset_dir: Path, fingerprint: str) -> Optional[DatasetSnapshot]:
+    """
+    Load the snapshot matching a dataset version, if there is one.
+
+    Args:
+        dataset_dir: Dataset folder
+        fingerprint: Content hash from compute_fingerprint
+
+    Returns:
+        The snapshot, or None if missing or unreadable
+    """
+    path = snapshot_path(dataset_dir, fingerprint)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable dataset snapshot {path}: {e}")
+        return None
+    if not isinstance(snapshot, DatasetSnapshot) or snapshot.fingerprint != fingerprint:
+        logger.warning(f"Ignoring mismatched dataset snapshot {path}")
+        return None
+    # Mailbox paths are stored relative: bind them to the folder in use
+    stores = {id(emails): emails for emails in (snapshot.emails, snapshot.index.emails)
+              if isinstance(emails, MailStore)}
+    try:
+        for store in stores.values():
+            store.bind(dataset_dir)
+    except (OSError, MailboxChangedError) as e:
+        logger.warning(f"Ignoring dataset snapshot {path}: {e}")
+        return None
+    return snapshot
+
+
+def save_snapshot(dataset_dir: Path, snapshot: DatasetSnapshot) -> None:
+    """
+    Store a snapshot in SNAPSHOT_DIR and drop stale ones of the dataset.
+
+    Failures (e.g. read-only snapshot directory) are logged, never raised:
+    the snapshot is only an optimization.
+
+    Args:
+        dataset_dir: Dataset folder
+        snapshot: Snapshot to store
+    """
+    path = snapshot_path(dataset_dir, snapshot.fingerprint)
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        atomic_write(path, pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+        for stale in path.parent.glob(f"{_SNAPSHOT_PREFIX}*.pkl"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not store dataset snapshot in {path.parent}: {e}")
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write a file through a temporary file and an atomic rename."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,102 @@
+"""
+Email header parsing utilities.
+
+Emails are parsed once at load time into structured headers so that the
+aggregated endpoint never re-scans raw email content per request.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+_QUOTED_NAME = re.compile(r'"([^"]+)"')
+
+
+class EmailHeaders(NamedTuple):
+    """Structured headers of one email."""
+
+    from_id: Optional[str]
+    to_id: Optional[str]
+    subject: Optional[str]
+    date: Optional[str]
+
+
+def extract_user_id_from_line(line: str) -> Optional[str]:
+    """
+    Extrait l'ID utilisateur depuis une ligne From: ou To:.
+
+    Les emails peuvent avoir le format:
+    - "Caterina Chindamo" <caterina.chindamo@example.com>
+    - caterina.chindamo@example.com
+
+    Args:
+        line: Ligne contenant From: ou To:
+
+    Returns:
+        L'ID utilisateur si trouvé (format: Prénom_Nom), None sinon
+    """
+    if 'From:' not in line and 'To:' not in line:
+        return None
+
+    # Extraire le nom/ID de l'utilisateur
+    parts = line.split(':', 1)  # Split seulement sur le premier ':'
+    if len(parts) > 1:
+        user_part = parts[1].strip()
+
+        # Si le nom est entre guillemets, l'extraire
+        # Format: "Caterina Chindamo" <email@example.com>
+        if '"' in user_part:
+            quoted_match = _QUOTED_NAME.search(user_part)
+            if quoted_match:
+                name = quoted_match.group(1)
+                # Convertir les espaces en underscores pour correspondre au format user_id
+                return name.replace(' ', '_')
+
+        # Sinon, extraire la partie email avant le @
+        if '@' in user_part:
+            # Format: email@example.com ou <email@example.com>
+            email_part = user_part.split('@')[0].strip()
+            # Retirer les chevrons si présents
+            email_part = email_part.replace('<', '').replace('>', '').strip()
+            # Si c'est un email comme "caterina.chindamo", convertir en "caterina_chindamo"
+            return email_part.replace('.', '_')
+
+        # Si pas d'email, retourner tel quel
+        return user_part.replace(' ', '_')
+    return None
+
+
+def parse_email_headers(mail: str) -> EmailHeaders:
+    """
+    Parse an RFC 822 email into structured headers.
+
+    ``from_id``/``to_id`` follow the matching rules the aggregated endpoint
+    has always used: every line is scanned and the last ``From:`` / ``To:``
+    line wins. ``subject`` and ``date`` come from the header block only.
+
+    Args:
+        mail: Full email content
+
+    Returns:
+        EmailHeaders for this email
+    """
+    from_id = None
+    to_id = None
+    subject = None
+    date = None
+    in_header_block = True
+
+    for line in mail.split('\n'):
+        if 'From:' in line:
+            from_id = extract_user_id_from_line(line)
+        elif 'To:' in line:
+            to_id = extract_user_id_from_line(line)
+
+        if in_header_block:
+            if not line.strip():
+                in_header_block = False
+            elif line.startswith('Subject:'):
+                subject = line[len('Subject:'):].strip()
+            elif line.startswith('Date:'):
+                date = line[len('Date:'):].strip()
+
+    return EmailHeaders(from_id=from_id, to_id=to_id, subject=subject, date=date)
@@ -0,0 +1,143 @@
+"""
+Incremental reader for large top-level JSON arrays.
+
+Dataset files are JSON arrays of objects that can be several GB. Instead of
+``json.load`` on the whole file (which holds the raw text, every raw dict
+and the final models at the same time), the array is decoded one element
+at a time from a bounded buffer, so callers can turn each element into a
+model or compact record before the next one is read.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator, Tuple
+
+# Characters read per refill; buffers grow only to fit one large element
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_SCALAR_DELIMITERS = frozenset(' \t\n\r,]')
+_decoder = json.JSONDecoder()
+
+
+def _iter_elements(
+    file_path: Path,
+    chunk_size: int,
+    byte_offsets: bool = False,
+) -> Iterator[Tuple[int, int, Any]]:
+    """
+    Yield (start, end, value) for each element of a top-level JSON array.
+
+    Offsets are in characters of the decoded stream. With ``byte_offsets``
+    the file is read as latin-1 (one character per byte), so offsets are
+    byte offsets into the file; elements holding non-ASCII bytes are then
+    decoded again from their UTF-8 bytes.
+
+    Raises:
+        ValueError: If the file is not a well-formed JSON array
+    """
+    with open(file_path, 'r', encoding='latin-1' if byte_offsets else 'utf-8') as f:
+        buffer = f.read(chunk_size)
+        base = 0  # offset of buffer[0] in the stream
+        pos = 0
+        eof = not buffer
+        expect_value = True
+        first = True
+
+        def refill(keep_from: int, min_size: int) -> None:
+            nonlocal buffer, base, pos, eof
+            chunk = f.read(max(chunk_size, min_size))
+            if not chunk:
+                eof = True
+                return
+            buffer = buffer[keep_from:] + chunk
+            base += keep_from
+            pos -= keep_from
+
+        # Opening bracket
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                break
+            refill(pos, 0)
+        if pos >= len(buffer) or buffer[pos] != '[':
+            raise ValueError(f"{file_path} is not a JSON array")
+        pos += 1
+
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError(f"Unterminated JSON array in {file_path}")
+                refill(pos, 0)
+                continue
+
+            char = buffer[pos]
+            if char == ']' and (first or not expect_value):
+                return
+            if char == ',' and not expect_value:
+                pos += 1
+                expect_value = True
+                continue
+            if not expect_value:
+                raise ValueError(f"Expected ',' or ']' at offset {base + pos} in {file_path}")
+
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Element cut by the buffer end: grow geometrically and retry
+                refill(pos, len(buffer) - pos)
+                continue
+            if (not eof and not isinstance(value, (dict, list, str))
+                    and (end >= len(buffer) or buffer[end] not in _SCALAR_DELIMITERS)):
+                # A number may continue past the buffer end (e.g. "2." of "2.5")
+                refill(pos, len(buffer) - pos)
+                continue
+
+            if byte_offsets and not buffer[pos:end].isascii():
+                value = json.loads(buffer[pos:end].encode('latin-1'))
+            yield base + pos, base + end, value
+            pos = end
+            expect_value = False
+            first = False
+
+
+def iter_json_array(file_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Iterate over the elements of a top-level JSON array, one at a time.
+
+    Args:
+        file_path: Path to a UTF-8 JSON file containing an array
+        chunk_size: Characters read per refill
+
+    Returns:
+        Iterator over the decoded elements
+
+    Raises:
+        ValueError: If the file is not a well-formed JSON array
+    """
+    for _, _, value in _iter_elements(file_path, chunk_size):
+        yield value
+
+
+def iter_json_array_spans(file_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, int, Any]]:
+    """
+    Iterate over the elements of a top-level JSON array with their byte spans.
+
+    ``data[start:end]`` of the raw file bytes is the JSON text of the
+    element, so it can be decoded again later without keeping it in memory.
+
+    Args:
+        file_path: Path to a UTF-8 JSON file containing an array
+        chunk_size: Bytes read per refill
+
+    Returns:
+        Iterator over (start, end, element)
+
+    Raises:
+        ValueError: If the file is not a well-formed JSON array
+    """
+    return _iter_elements(file_path, chunk_size, byte_offsets=True)
@@ -0,0 +1,198 @@
+"""
+Email bodies kept on disk, read on demand.
+
+Emails make up most of a dataset's bytes, yet an aggregated response only
+returns a few of them. A MailStore keeps, per email, its parsed headers
+(needed by the user index) and the byte span of its JSON element in the
+mailbox file. Bodies are read through a memory map when a record is
+requested, so resident memory does not grow with the size of the mails.
+"""
+
+import json
+import mmap
+import os
+import threading
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Set, Tuple
+
+from api.utils.email_headers import EmailHeaders, parse_email_headers
+from api.utils.json_stream import iter_json_array_spans
+from api.utils.record_store import EmailRecord
+
+if TYPE_CHECKING:
+    from api.utils.validation_ledger import ValidationLedger
+
+
+class MailboxChangedError(ValueError):
+    """Raised when a mailbox file was modified in place after it was indexed."""
+
+
+class MailStore(Sequence):
+    """
+    Read-only sequence of EmailRecord backed by a memory-mapped mailbox file.
+
+    The store maps the file it indexed once and never maps another one: a
+    mailbox replaced on disk keeps being served from the indexed inode until
+    the owner notices (``is_current``) and rebuilds the dataset.
+
+    Attributes:
+        path: Mailbox file (JSON array of emails)
+        headers: Parsed headers, aligned with the emails
+    """
+
+    def __init__(self, path: Path, starts: array, ends: array, headers: List[EmailHeaders]):
+        """
+        Args:
+            path: Mailbox file the spans point into
+            starts: Byte offset of each email's JSON element
+            ends: End offset (exclusive) of each element
+            headers: Parsed headers of each email
+        """
+        self.path = path
+        self.headers = headers
+        self._starts = starts
+        self._ends = ends
+        self._size = path.stat().st_size
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self) -> None:
+        """Map the mailbox file at `path` (the version that was indexed)."""
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._map_key: Optional[Tuple[int, int, int]] = None
+        f = open(self.path, 'rb')
+        try:
+            stat = os.fstat(f.fileno())
+            if stat.st_size != self._size:
+                raise MailboxChangedError(f"Mailbox {self.path} changed since it was indexed")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            f.close()
+            raise
+        self._file = f
+        self._map_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def bind(self, dataset_dir: Path) -> None:
+        """Point the store at its mailbox file in `dataset_dir` and map it (after unpickling)."""
+        with self._lock:
+            self.path = dataset_dir / self.path.name
+            self._open()
+
+    def is_current(self) -> bool:
+        """Tell whether `path` is still the mapped file, unmodified (one stat call)."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._map_key
+
+    def _data(self) -> mmap.mmap:
+        """
+        Return the map of the indexed file.
+
+        The open file is checked on every read: once modified in place, its
+        bytes no longer match the spans, and reading past a truncation would
+        crash the process.
+        """
+        if self._map is None:
+            raise MailboxChangedError(f"Mailbox {self.path} is not bound to its dataset folder")
+        stat = os.fstat(self._file.fileno())
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) != self._map_key:
+            raise MailboxChangedError(f"Mailbox {self.path} changed since it was indexed")
+        return self._map
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        item = json.loads(self._data()[self._starts[position]:self._ends[position]])
+        return EmailRecord.from_model(EmailRecord._model(**item))
+
+    def __iter__(self) -> Iterator[EmailRecord]:
+        for position in range(len(self)):
+            yield self[position]
+
+    def __getstate__(self) -> dict:
+        # Only the file name is kept: the owner binds the store to its
+        # dataset folder after unpickling, which maps the file again
+        return {
+            "name": self.path.name,
+            "headers": self.headers,
+            "starts": self._starts,
+            "ends": self._ends,
+            "size": self._size,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.path = Path(state["name"])
+        self.headers = state["headers"]
+        self._starts = state["starts"]
+        self._ends = state["ends"]
+        self._size = state["size"]
+        self._file = None
+        self._map = None
+        self._map_key = None
+        self._lock = threading.Lock()
+
+
+def scan_mailbox(path: Path, modified: Optional[Set[int]]) -> Tuple[MailStore, Optional[List[int]]]:
+    """
+    Index a mailbox file: spans and headers only, bodies are not kept.
+
+    Rows are validated as by ``build_records`` (trusted when the file
+    version was already validated). Does not touch the ledger, so it can
+    run in a worker process.
+
+    Args:
+        path: Mailbox file (JSON array of emails)
+        modified: Result of ``ValidationLedger.modified_rows`` (None: validate all)
+
+    Returns:
+        (store, rows modified by validation or None if trusted)
+
+    Raises:
+        pydantic.ValidationError: If a row is invalid
+    """
+    model_cls = EmailRecord._model
+    defaults = EmailRecord.defaults()
+    starts = array('q')
+    ends = array('q')
+    headers = []
+    modified_rows = None if modified is not None else []
+
+    for position, (start, end, item) in enumerate(iter_json_array_spans(path)):
+        if modified is not None and position not in modified:
+            mail = {**defaults, **item}["mail"]
+        else:
+            record = EmailRecord.from_model(model_cls(**item))
+            if modified_rows is not None and not record.matches_raw(item, defaults):
+                modified_rows.append(position)
+            mail = record.mail
+        starts.append(start)
+        ends.append(end)
+        headers.append(parse_email_headers(mail))
+
+    return MailStore(path, starts, ends, headers), modified_rows
+
+
+def load_mailbox(path: Path, ledger: "ValidationLedger", digest: Optional[str]) -> MailStore:
+    """
+    Index a mailbox file, validating its rows only once per file version.
+
+    Args:
+        path: Mailbox file (JSON array of emails)
+        ledger: Validation ledger of the dataset folder
+        digest: Content digest of the file (None disables the ledger)
+
+    Returns:
+        MailStore over the file
+    """
+    modified = ledger.modified_rows(path.name, digest, EmailRecord) if digest else None
+    store, modified_rows = scan_mailbox(path, modified)
+    if modified_rows is not None and digest:
+        ledger.record(path.name, digest, EmailRecord, modified_rows)
+    return store
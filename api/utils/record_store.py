@@ -0,0 +1,170 @@
+"""
+Compact internal storage for dataset rows.
+
+Rows are validated once through their Pydantic model at ingestion, then kept
+for the life of the process as slotted records with interned strings for
+the highly repeated values (IBANs, biotags, cities, payment methods...).
+Pydantic models are only created again at the response boundary, through
+``to_model()``.
+"""
+
+import sys
+from typing import Any, ClassVar, Dict, FrozenSet, Tuple, Type
+
+from pydantic import BaseModel
+
+from api.models import User, UserResidence, Transaction, Location, SMS, Email
+
+
+def _intern(value: Any) -> Any:
+    """Intern a string value so that repeated values share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class _Record:
+    """
+    Base class for slotted records mirroring a flat Pydantic model.
+
+    Subclasses set ``__slots__`` to the model field names and list the
+    fields worth interning in ``_interned``.
+    """
+
+    __slots__ = ()
+    _model: ClassVar[Type[BaseModel]]
+    _interned: ClassVar[FrozenSet[str]] = frozenset()
+
+    def __init__(self, **values: Any) -> None:
+        for name in self.__slots__:
+            value = values.get(name)
+            setattr(self, name, _intern(value) if name in self._interned else value)
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "_Record":
+        """Build a record from a validated model."""
+        return cls(**{name: getattr(model, name) for name in cls.__slots__})
+
+    @classmethod
+    def defaults(cls) -> Dict[str, Any]:
+        """Return the model defaults for the optional fields."""
+        return {
+            name: field.get_default(call_default_factory=True)
+            for name, field in cls._model.model_fields.items()
+            if not field.is_required()
+        }
+
+    @classmethod
+    def from_trusted(cls, item: Dict[str, Any], defaults: Dict[str, Any]) -> "_Record":
+        """
+        Build a record from a raw row known to validate unchanged.
+
+        Skips Pydantic entirely: only valid for rows of a file version whose
+        validation pass was recorded (see ``api.utils.validation_ledger``).
+
+        Args:
+            item: Raw row as decoded from JSON
+            defaults: Result of ``defaults()``, computed once per file
+        """
+        return cls(**{**defaults, **item})
+
+    def matches_raw(self, item: Dict[str, Any], defaults: Dict[str, Any]) -> bool:
+        """
+        Tell whether validation kept a raw row unchanged (same values and types).
+
+        Rows for which this is False (coerced numbers, cleared timestamps...)
+        must always go through full validation.
+        """
+        for name in self.__slots__:
+            raw = item[name] if name in item else defaults.get(name)
+            value = getattr(self, name)
+            if type(raw) is not type(value) or raw != value:
+                return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the row as a plain dict (same shape as ``model_dump()``)."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_model(self) -> BaseModel:
+        """Create the Pydantic model for a response (no re-validation)."""
+        return self._model.model_construct(**self.to_dict())
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, _intern(value) if name in self._interned else value)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class TransactionRecord(_Record):
+    """Compact storage for a Transaction row."""
+
+    __slots__ = tuple(Transaction.model_fields)
+    _model = Transaction
+    _interned = frozenset({
+        "sender_id", "recipient_id", "transaction_type", "location",
+        "payment_method", "sender_iban", "recipient_iban", "description",
+        "is_fake_recipient",
+    })
+
+
+class LocationRecord(_Record):
+    """Compact storage for a Location row."""
+
+    __slots__ = tuple(Location.model_fields)
+    _model = Location
+    _interned = frozenset({"biotag"})
+
+
+class SMSRecord(_Record):
+    """Compact storage for an SMS row."""
+
+    __slots__ = tuple(SMS.model_fields)
+    _model = SMS
+    _interned = frozenset({"id_user"})
+
+
+class EmailRecord(_Record):
+    """Compact storage for an Email row."""
+
+    __slots__ = tuple(Email.model_fields)
+    _model = Email
+
+
+class UserResidenceRecord(_Record):
+    """Compact storage for a user's residence."""
+
+    __slots__ = tuple(UserResidence.model_fields)
+    _model = UserResidence
+    _interned = frozenset({"city"})
+
+
+class UserRecord(_Record):
+    """Compact storage for a User row (residence kept as a nested record)."""
+
+    __slots__ = tuple(User.model_fields)
+    _model = User
+    _interned = frozenset({"iban", "biotag", "job"})
+
+    @classmethod
+    def from_model(cls, model: User) -> "UserRecord":
+        """Build a record from a validated model."""
+        values = {name: getattr(model, name) for name in cls.__slots__}
+        values["residence"] = UserResidenceRecord.from_model(model.residence)
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the row as a plain dict (same shape as ``model_dump()``)."""
+        values = super().to_dict()
+        values["residence"] = self.residence.to_dict()
+        return values
+
+    def to_model(self) -> User:
+        """Create the Pydantic model for a response (no re-validation)."""
+        values = super().to_dict()
+        values["residence"] = self.residence.to_model()
+        return User.model_construct(**values)
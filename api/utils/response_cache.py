@@ -0,0 +1,92 @@
+"""
+Cache of rendered API responses.
+
+The agent asks for the same transactions again and again (retries, reruns).
+Building an aggregated response walks several indexes, creates the response
+models and serializes them; the result only depends on the dataset version
+and the request. Rendered bodies are kept in a bounded LRU keyed on those,
+so a repeated request returns stored bytes directly.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, NamedTuple, Optional
+
+# Taille maximale du cache des réponses rendues (0 désactive le cache)
+RESPONSE_CACHE_MB = float(os.getenv('API_RESPONSE_CACHE_MB', '64'))
+
+
+class CachedResponse(NamedTuple):
+    """A rendered response body and its media type."""
+
+    body: bytes
+    media_type: str
+
+
+class ResponseCache:
+    """Thread-safe LRU of rendered responses, bounded by total body size."""
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Total size of the stored bodies above which the least
+                recently used ones are dropped (0 disables the cache)
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Return the stored response for a key, or None (counted as a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes, media_type: str) -> None:
+        """Store a rendered response, evicting the coldest ones over budget."""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = CachedResponse(body, media_type)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every stored response (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Réponses de /transactions/{id}, vidées à chaque changement de dataset
+aggregated_responses = ResponseCache(max_bytes=int(RESPONSE_CACHE_MB * 1024 * 1024))
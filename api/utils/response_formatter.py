@@ -2,13 +2,81 @@
 Response formatter for API endpoints.
 
 Supports both JSON and TOON formats based on Accept header or query parameter.
+
+JSON bodies are written in a single pass (``render_json``): with orjson
+when it is installed, otherwise with pydantic-core's encoder. Both produce
+the same compact UTF-8 JSON as Starlette's JSONResponse.
+
+Large collections are streamed (``format_streaming_response``): JSON array
+elements or TOON table rows are sent chunk by chunk instead of building
+the whole body in memory.
 """
 
-from typing import Any, Optional
+from itertools import islice
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence, Type
 from fastapi import Response
-from fastapi.responses import JSONResponse, PlainTextResponse
-from api.utils.toon_formatter import format_response_as_toon
-import json
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+import pydantic_core
+from api.utils.toon_formatter import format_response_as_toon, iter_toon_table
+
+try:
+    import orjson
+except ImportError:  # optional: faster encoder
+    orjson = None
+
+# Rows serialized per chunk of a streamed response
+STREAM_CHUNK_ROWS = 1000
+
+
+def _to_jsonable(obj: Any) -> Any:
+    """Fallback for objects the encoders do not handle natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return obj.__dict__
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Serialize dicts, lists and Pydantic models to compact JSON bytes.
+    
+    One pass, no intermediate string: models are dumped by Pydantic and
+    other objects are serialized through their ``__dict__``.
+    
+    Args:
+        content: Response content
+        
+    Returns:
+        UTF-8 JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_to_jsonable)
+    return pydantic_core.to_json(content, fallback=_to_jsonable)
+
+
+def render_model_json(model: BaseModel, exclude: Any = None) -> bytes:
+    """
+    Serialize a Pydantic model to compact JSON bytes, without model_dump.
+    
+    Same bytes as ``render_json(model.model_dump(mode="json", exclude=exclude))``,
+    written directly by the model's pydantic-core serializer.
+    
+    Args:
+        model: Model instance
+        exclude: Fields to leave out (``model_dump`` syntax)
+        
+    Returns:
+        UTF-8 JSON bytes
+    """
+    return pydantic_core.to_json(model, exclude=exclude)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered in one pass by render_json."""
+    
+    def render(self, content: Any) -> bytes:
+        """Render content as compact JSON."""
+        return render_json(content)
 
 
 class TOONResponse(PlainTextResponse):
@@ -25,6 +93,65 @@ class TOONResponse(PlainTextResponse):
         return toon_str.encode("utf-8")
 
 
+def iter_json_array(items: Iterable[Any], chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Stream a collection as a JSON array, ``chunk_rows`` elements at a time.
+    
+    The concatenated chunks are the same bytes as ``render_json(list(items))``.
+    
+    Args:
+        items: Elements accepted by render_json (dicts, models, ...)
+        chunk_rows: Elements per chunk
+        
+    Yields:
+        UTF-8 JSON chunks
+    """
+    iterator = iter(items)
+    chunk = list(islice(iterator, chunk_rows))
+    if not chunk:
+        yield b"[]"
+        return
+    opening = b"["
+    while chunk:
+        # render_json(chunk) is "[a,b,...]": keep the elements only
+        yield opening + render_json(chunk)[1:-1]
+        opening = b","
+        chunk = list(islice(iterator, chunk_rows))
+    yield b"]"
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """JSON array response streamed chunk by chunk."""
+    
+    media_type = JSONResponse.media_type
+    
+    def __init__(
+        self,
+        items: Iterable[Any],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        chunk_rows: int = STREAM_CHUNK_ROWS,
+    ):
+        super().__init__(iter_json_array(items, chunk_rows), status_code=status_code, headers=headers)
+
+
+class StreamingTOONResponse(StreamingResponse):
+    """TOON table response streamed chunk by chunk."""
+    
+    media_type = TOONResponse.media_type
+    
+    def __init__(
+        self,
+        items: Sequence[Any],
+        model_cls: Type[BaseModel],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        chunk_rows: int = STREAM_CHUNK_ROWS,
+    ):
+        chunks = (chunk.encode("utf-8") for chunk in iter_toon_table(items, model_cls, chunk_rows))
+        super().__init__(chunks, status_code=status_code, headers=headers)
+
+
 def format_response(
     data: Any,
     response_format: str = "json",
@@ -47,13 +174,34 @@ def format_response(
             status_code=status_code
         )
     else:
-        # Default to JSON
-        return JSONResponse(
-            content=data if not hasattr(data, '__dict__') else json.loads(
-                json.dumps(data, default=lambda o: o.__dict__)
-            ),
+        # Default to JSON (models and objects serialized directly to bytes)
+        return FastJSONResponse(
+            content=data,
             status_code=status_code
         )
 
 
-
+def format_streaming_response(
+    items: Sequence[Any],
+    model_cls: Type[BaseModel],
+    response_format: str = "json",
+    status_code: int = 200
+) -> StreamingResponse:
+    """
+    Stream a large collection in requested format.
+    
+    Args:
+        items: Model instances, or records with the model fields as
+            attributes and a ``to_dict()`` method
+        model_cls: Model describing the items (TOON table columns)
+        response_format: Either "json" or "toon"
+        status_code: HTTP status code
+        
+    Returns:
+        StreamingResponse sending JSON array elements or TOON table rows
+        as they are serialized
+    """
+    if response_format.lower() == "toon":
+        return StreamingTOONResponse(items, model_cls, status_code=status_code)
+    rows = (item if isinstance(item, BaseModel) else item.to_dict() for item in items)
+    return StreamingJSONResponse(rows, status_code=status_code)
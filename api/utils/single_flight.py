@@ -0,0 +1,78 @@
+"""
+Single-flight execution of expensive loads.
+
+When many requests hit a cold server at once, each of them would parse the
+same dataset files. A SingleFlight lets the first caller for a key run the
+load while concurrent callers for the same key wait and share its result
+(or its exception). Nothing is cached once the call completes: caching
+stays the job of the caller (registry, snapshot...).
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    """One in-progress load and the callers waiting on it."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing the same key."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` once for all concurrent callers of ``key``.
+
+        Args:
+            key: Identity of the load (e.g. dataset folder, file path + digest)
+            fn: Load to run if no call for this key is in progress
+
+        Returns:
+            The result of the single execution
+
+        Raises:
+            Exception: Whatever the execution raised, for every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many loads ran and how many callers shared one."""
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._calls)}
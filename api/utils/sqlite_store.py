@@ -0,0 +1,403 @@
+"""
+SQLite storage backend for datasets larger than RAM.
+
+With ``API_STORAGE_BACKEND=sqlite``, a dataset folder is imported once into
+``<dataset>/.cache/store-<fingerprint>.sqlite`` instead of being kept in
+process memory. Records are streamed into tables indexed on transaction_id,
+IBAN + timestamp, biotag + timestamp and user id postings, and
+``SQLiteIndex`` answers the same queries as ``DatasetIndex`` (same results,
+same order) with indexed lookups. Only the rows of a response are ever
+materialized as records.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+from api.utils.dataset_index import parse_timestamp, user_id_for, _MICROSECONDS_PER_HOUR
+from api.utils.email_headers import parse_email_headers
+from api.utils.record_store import (
+    UserRecord,
+    UserResidenceRecord,
+    TransactionRecord,
+    LocationRecord,
+    SMSRecord,
+    EmailRecord,
+)
+
+logger = logging.getLogger(__name__)
+
+_STORE_PREFIX = "store-"
+_INSERT_BATCH = 10_000
+
+_TRANSACTION_COLUMNS = TransactionRecord.__slots__
+_LOCATION_COLUMNS = LocationRecord.__slots__
+_SMS_COLUMNS = SMSRecord.__slots__
+_EMAIL_COLUMNS = EmailRecord.__slots__
+_USER_COLUMNS = UserRecord.__slots__
+
+_SCHEMA = f"""
+CREATE TABLE transactions (pos INTEGER PRIMARY KEY, epoch, {", ".join(_TRANSACTION_COLUMNS)});
+CREATE TABLE transaction_ibans (iban, epoch, pos);
+CREATE TABLE users (pos INTEGER PRIMARY KEY, {", ".join(_USER_COLUMNS)});
+CREATE TABLE locations (pos INTEGER PRIMARY KEY, epoch, {", ".join(_LOCATION_COLUMNS)});
+CREATE TABLE sms (pos INTEGER PRIMARY KEY, {", ".join(_SMS_COLUMNS)});
+CREATE TABLE emails (pos INTEGER PRIMARY KEY, {", ".join(_EMAIL_COLUMNS)});
+CREATE TABLE sms_keys (key, pos);
+CREATE TABLE email_keys (key, pos);
+CREATE TABLE sms_key_names (key PRIMARY KEY);
+CREATE TABLE email_key_names (key PRIMARY KEY);
+CREATE TABLE sms_expansions (needle, pos);
+CREATE TABLE email_expansions (needle, pos);
+CREATE TABLE needles (needle PRIMARY KEY);
+"""
+
+# Created after the bulk import (faster than maintaining them row by row)
+_INDEXES = """
+CREATE INDEX transactions_by_id ON transactions (transaction_id, pos);
+CREATE INDEX transaction_ibans_by_time ON transaction_ibans (iban, epoch);
+CREATE INDEX users_by_iban ON users (iban, pos);
+CREATE INDEX users_by_biotag ON users (biotag, pos);
+CREATE INDEX locations_by_time ON locations (biotag, epoch);
+CREATE INDEX sms_keys_by_key ON sms_keys (key);
+CREATE INDEX email_keys_by_key ON email_keys (key);
+CREATE INDEX sms_expansions_by_needle ON sms_expansions (needle, pos);
+CREATE INDEX email_expansions_by_needle ON email_expansions (needle, pos);
+"""
+
+
+def store_path(dataset_dir: Path, fingerprint: str) -> Path:
+    """Return the SQLite store path for a dataset version."""
+    return dataset_dir / ".cache" / f"{_STORE_PREFIX}{fingerprint}.sqlite"
+
+
+class _Batch:
+    """Buffered executemany for one INSERT statement."""
+
+    def __init__(self, connection: sqlite3.Connection, table: str, width: int):
+        self._connection = connection
+        self._sql = f"INSERT INTO {table} VALUES ({', '.join('?' * width)})"
+        self._rows: List[tuple] = []
+
+    def add(self, row: tuple) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= _INSERT_BATCH:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._rows:
+            self._connection.executemany(self._sql, self._rows)
+            self._rows.clear()
+
+
+def _row_builder(record_cls: type) -> Callable[[Sequence], object]:
+    """Return a function building a record from a row of its table columns."""
+    columns = record_cls.__slots__
+    return lambda row: record_cls(**dict(zip(columns, row)))
+
+
+_transaction_from_row = _row_builder(TransactionRecord)
+_location_from_row = _row_builder(LocationRecord)
+_sms_from_row = _row_builder(SMSRecord)
+_email_from_row = _row_builder(EmailRecord)
+
+
+def _user_row(position: int, user: UserRecord) -> tuple:
+    values = [getattr(user, name) for name in _USER_COLUMNS]
+    values[_USER_COLUMNS.index("residence")] = json.dumps(user.residence.to_dict())
+    return (position, *values)
+
+
+def _user_from_row(row: Sequence) -> UserRecord:
+    values = dict(zip(_USER_COLUMNS, row))
+    values["residence"] = UserResidenceRecord(**json.loads(values["residence"]))
+    return UserRecord(**values)
+
+
+class _TableView(Sequence):
+    """Read-only sequence over a table, in dataset order (rows loaded on demand)."""
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        table: str,
+        columns: Sequence[str],
+        build: Callable[[Sequence], object],
+    ):
+        self._connect = connect
+        self._table = table
+        self._columns = ", ".join(columns)
+        self._build = build
+
+    def __len__(self) -> int:
+        return self._connect().execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        row = self._connect().execute(
+            f"SELECT {self._columns} FROM {self._table} WHERE pos = ?", (position,)
+        ).fetchone()
+        if row is None:
+            raise IndexError(position)
+        return self._build(row)
+
+    def __iter__(self) -> Iterator:
+        cursor = self._connect().execute(f"SELECT {self._columns} FROM {self._table} ORDER BY pos")
+        for row in cursor:
+            yield self._build(row)
+
+
+def import_dataset(
+    path: Path,
+    transactions: Iterable[TransactionRecord],
+    users: Callable[[Sequence[TransactionRecord]], List[UserRecord]],
+    locations: Iterable[LocationRecord],
+    sms: Iterable[SMSRecord],
+    emails: Iterable[EmailRecord],
+) -> None:
+    """
+    Import a dataset into a new SQLite store, streaming its records.
+
+    The store is written to a temporary file and renamed at the end, so a
+    store file is always complete.
+
+    Args:
+        path: Destination (see store_path)
+        transactions: Transaction records, in dataset order
+        users: Builds the users, given the imported transactions
+        locations: Location records, in dataset order
+        sms: SMS records, in dataset order
+        emails: Email records, in dataset order
+    """
+    path.parent.mkdir(exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;")
+        connection.executescript(_SCHEMA)
+
+        rows = _Batch(connection, "transactions", len(_TRANSACTION_COLUMNS) + 2)
+        iban_rows = _Batch(connection, "transaction_ibans", 3)
+        for position, tx in enumerate(transactions):
+            epoch = parse_timestamp(tx.timestamp)
+            rows.add((position, epoch, *(getattr(tx, name) for name in _TRANSACTION_COLUMNS)))
+            if epoch is None:
+                continue
+            ibans = [tx.sender_iban]
+            if tx.recipient_iban != tx.sender_iban:
+                ibans.append(tx.recipient_iban)
+            for iban in ibans:
+                if iban:
+                    iban_rows.add((iban, epoch, position))
+        rows.flush()
+        iban_rows.flush()
+
+        user_records = users(_TableView(lambda: connection, "transactions", _TRANSACTION_COLUMNS, _transaction_from_row))
+        rows = _Batch(connection, "users", len(_USER_COLUMNS) + 1)
+        for position, user in enumerate(user_records):
+            rows.add(_user_row(position, user))
+        rows.flush()
+
+        rows = _Batch(connection, "locations", len(_LOCATION_COLUMNS) + 2)
+        for position, loc in enumerate(locations):
+            rows.add((position, parse_timestamp(loc.datetime), *(getattr(loc, name) for name in _LOCATION_COLUMNS)))
+        rows.flush()
+
+        rows = _Batch(connection, "sms", len(_SMS_COLUMNS) + 1)
+        keys = _Batch(connection, "sms_keys", 2)
+        for position, message in enumerate(sms):
+            rows.add((position, *(getattr(message, name) for name in _SMS_COLUMNS)))
+            keys.add((message.id_user.lower(), position))
+        rows.flush()
+        keys.flush()
+
+        rows = _Batch(connection, "emails", len(_EMAIL_COLUMNS) + 1)
+        keys = _Batch(connection, "email_keys", 2)
+        for position, email in enumerate(emails):
+            rows.add((position, *(getattr(email, name) for name in _EMAIL_COLUMNS)))
+            headers = parse_email_headers(email.mail)
+            for user_key in {headers.from_id, headers.to_id}:
+                if user_key:
+                    keys.add((user_key.lower(), position))
+        rows.flush()
+        keys.flush()
+
+        connection.executescript(_INDEXES)
+        for kind in ("sms", "email"):
+            connection.execute(f"INSERT INTO {kind}_key_names SELECT DISTINCT key FROM {kind}_keys")
+
+        # Precomputed substring expansions for the known user ids
+        for user in user_records:
+            needle = user_id_for(user).lower()
+            if not needle or connection.execute("SELECT 1 FROM needles WHERE needle = ?", (needle,)).fetchone():
+                continue
+            connection.execute("INSERT INTO needles VALUES (?)", (needle,))
+            for kind in ("sms", "email"):
+                connection.execute(
+                    f"INSERT INTO {kind}_expansions SELECT DISTINCT ?, k.pos FROM {kind}_key_names n "
+                    f"JOIN {kind}_keys k ON k.key = n.key WHERE instr(n.key, ?) > 0",
+                    (needle, needle),
+                )
+
+        connection.execute("ANALYZE")
+        connection.commit()
+    except BaseException:
+        connection.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    connection.close()
+    os.replace(tmp_path, path)
+
+    for stale in path.parent.glob(f"{_STORE_PREFIX}*.sqlite"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+class SQLiteIndex:
+    """
+    Same query interface as DatasetIndex, answered from a SQLite store.
+
+    Each thread uses its own read-only connection.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            self._local.connection = connection
+        return connection
+
+    def get_transaction(self, transaction_id: str) -> Optional[TransactionRecord]:
+        """Return the transaction with this ID (first occurrence), or None."""
+        row = self._connection().execute(
+            f"SELECT {', '.join(_TRANSACTION_COLUMNS)} FROM transactions "
+            "WHERE transaction_id = ? ORDER BY pos LIMIT 1",
+            (transaction_id,),
+        ).fetchone()
+        return _transaction_from_row(row) if row else None
+
+    def _find_user_by(self, column: str, value: str) -> Optional[UserRecord]:
+        # Last occurrence wins, as in DatasetIndex's dicts
+        row = self._connection().execute(
+            f"SELECT {', '.join(_USER_COLUMNS)} FROM users WHERE {column} = ? ORDER BY pos DESC LIMIT 1",
+            (value,),
+        ).fetchone()
+        return _user_from_row(row) if row else None
+
+    def find_user(self, biotag: Optional[str], iban: Optional[str]) -> Optional[UserRecord]:
+        """Find a user by biotag first, then by IBAN as a fallback."""
+        user = None
+        if biotag and biotag.strip():
+            user = self._find_user_by("biotag", biotag)
+        if not user and iban and iban.strip():
+            user = self._find_user_by("iban", iban)
+        return user
+
+    def transactions_near(
+        self,
+        iban: str,
+        transaction: TransactionRecord,
+        time_window_hours: float = 3,
+    ) -> List[TransactionRecord]:
+        """Return the other transactions of an IBAN within a time window, in dataset order."""
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT epoch FROM transactions WHERE transaction_id = ? ORDER BY pos LIMIT 1",
+            (transaction.transaction_id,),
+        ).fetchone()
+        ref_epoch = row[0] if row else None
+        if ref_epoch is None:
+            ref_epoch = parse_timestamp(transaction.timestamp)
+        if ref_epoch is None:
+            return []
+
+        window = int(time_window_hours * _MICROSECONDS_PER_HOUR)
+        columns = ", ".join(f"t.{name}" for name in _TRANSACTION_COLUMNS)
+        rows = connection.execute(
+            f"SELECT {columns} FROM transaction_ibans i JOIN transactions t ON t.pos = i.pos "
+            "WHERE i.iban = ? AND i.epoch BETWEEN ? AND ? ORDER BY i.pos",
+            (iban, ref_epoch - window, ref_epoch + window),
+        )
+        return [
+            _transaction_from_row(row)
+            for row in rows
+            if row[0] != transaction.transaction_id
+        ]
+
+    def locations_near(
+        self,
+        biotag: str,
+        timestamp: Optional[str],
+        time_window_hours: float = 24,
+    ) -> List[LocationRecord]:
+        """Return the locations of a biotag within a time window, in dataset order."""
+        ref_epoch = parse_timestamp(timestamp)
+        if ref_epoch is None:
+            return []
+        window = int(time_window_hours * _MICROSECONDS_PER_HOUR)
+        rows = self._connection().execute(
+            f"SELECT {', '.join(_LOCATION_COLUMNS)} FROM locations "
+            "WHERE biotag = ? AND epoch BETWEEN ? AND ? ORDER BY pos",
+            (biotag, ref_epoch - window, ref_epoch + window),
+        )
+        return [_location_from_row(row) for row in rows]
+
+    def _lookup(self, kind: str, table: str, columns: Sequence[str], needle: str) -> List[tuple]:
+        """Rows whose user key contains needle (substring, case-insensitive), in dataset order."""
+        connection = self._connection()
+        needle = needle.lower()
+        selected = ", ".join(f"r.{name}" for name in columns)
+        if connection.execute("SELECT 1 FROM needles WHERE needle = ?", (needle,)).fetchone():
+            return connection.execute(
+                f"SELECT {selected} FROM {kind}_expansions x JOIN {table} r ON r.pos = x.pos "
+                "WHERE x.needle = ? ORDER BY x.pos",
+                (needle,),
+            ).fetchall()
+        # Unknown id: scan the distinct keys only, never the records
+        return connection.execute(
+            f"SELECT {selected} FROM {table} r WHERE r.pos IN ("
+            f"SELECT k.pos FROM {kind}_key_names n JOIN {kind}_keys k ON k.key = n.key "
+            "WHERE instr(n.key, ?) > 0) ORDER BY r.pos",
+            (needle,),
+        ).fetchall()
+
+    def emails_for_user(self, user_id: str) -> List[EmailRecord]:
+        """Return the emails whose From or To contains this user id, in dataset order."""
+        return [_email_from_row(row) for row in self._lookup("email", "emails", _EMAIL_COLUMNS, user_id)]
+
+    def sms_for_user(self, user_id: str) -> List[SMSRecord]:
+        """Return the SMS whose id_user contains this user id, in dataset order."""
+        return [_sms_from_row(row) for row in self._lookup("sms", "sms", _SMS_COLUMNS, user_id)]
+
+
+class SQLiteDataset:
+    """
+    A dataset served from its SQLite store.
+
+    Mirrors DatasetSnapshot: ``users``, ``transactions``, ``locations``,
+    ``sms`` and ``emails`` are sequences read from the store on demand, and
+    ``index`` answers the aggregated endpoint's queries.
+    """
+
+    def __init__(self, path: Path, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.index = SQLiteIndex(path)
+        connect = self.index._connection
+        self.users = _TableView(connect, "users", _USER_COLUMNS, _user_from_row)
+        self.transactions = _TableView(connect, "transactions", _TRANSACTION_COLUMNS, _transaction_from_row)
+        self.locations = _TableView(connect, "locations", _LOCATION_COLUMNS, _location_from_row)
+        self.sms = _TableView(connect, "sms", _SMS_COLUMNS, _sms_from_row)
+        self.emails = _TableView(connect, "emails", _EMAIL_COLUMNS, _email_from_row)
@@ -2,10 +2,35 @@
 TOON formatter utility for API responses.
 
 Converts JSON/Python data structures to TOON format for token-efficient LLM communication.
+
+The encoder makes a single pass over the data: every output line is appended
+once to a buffer, with the indentation inherited from its parents passed
+down as a prefix (no nested string is split and re-indented afterwards).
+
+The output of JSON-compatible data reads back exactly with
+``api.utils.toon_parser.parse_toon``: strings that would read as another
+value are quoted, keys are quoted when needed, object items of non-tabular
+arrays start with a ``-`` line and nested values of table cells are JSON.
 """
 
-from typing import Any, Dict, List
+from operator import attrgetter
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union, get_args, get_origin
 import json
+from json.encoder import encode_basestring_ascii
+import re
+
+from pydantic import BaseModel
+
+# Characters that force a string to be quoted (quoted like json.dumps)
+_SPECIAL_CHARS = re.compile(r'[,\n:\[\]{}]')
+# Unquoted numbers: str() of an int or a float
+NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?(?:e[+-]?\d+)?|-?inf|nan')
+# Strings that would read back as another value: literals, numbers, the
+# array item marker, or a leading quote
+_AMBIGUOUS = re.compile(rf'(?:true|false|null|-|{NUMBER_PATTERN.pattern})\Z|"')
+# Marker line opening an object item of a non-tabular array
+ITEM_MARKER = "-"
 
 
 def to_toon(data: Any, indent: int = 0) -> str:
@@ -29,6 +54,54 @@ def to_toon(data: Any, indent: int = 0) -> str:
         >>> to_toon([{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}])
         '[2] {id, name}\\n1, Alice\\n2, Bob'
     """
+    if not _is_multiline(data):
+        return _format_inline(data, indent)
+    lines: List[str] = []
+    _write_block(lines, data, indent, "")
+    return '\n'.join(lines)
+
+
+def needs_quoting(s: str) -> bool:
+    """Check if a string needs to be quoted in TOON."""
+    if not s:  # Empty string
+        return True
+    
+    # Check for special characters, or text read back as another value
+    return _SPECIAL_CHARS.search(s) is not None or _AMBIGUOUS.match(s) is not None
+
+
+def format_key(key: Any) -> str:
+    """Format an object key (quoted when it contains special characters or starts with a space or quote)."""
+    key = str(key)
+    if not key or _SPECIAL_CHARS.search(key) or key[0] in ' "':
+        return encode_basestring_ascii(key)
+    return key
+
+
+def _is_multiline(data: Any) -> bool:
+    """
+    Tell whether the TOON form of a value spans several lines.
+    
+    Non-empty arrays always do (header line + items). Objects do when they
+    have several keys, or a single key whose value does.
+    """
+    while isinstance(data, dict):
+        if len(data) != 1:
+            return len(data) > 1
+        data = next(iter(data.values()))
+    return isinstance(data, list) and len(data) > 0
+
+
+def _is_tabular(arr: List[Any]) -> bool:
+    """Check if an array contains objects that all have the same keys."""
+    if not all(isinstance(item, dict) for item in arr):
+        return False
+    first_keys = arr[0].keys()
+    return all(item.keys() == first_keys for item in arr)
+
+
+def _format_inline(data: Any, indent: int) -> str:
+    """Format a single-line value (scalar, empty container or one-key object chain)."""
     if data is None:
         return "null"
     
@@ -41,27 +114,113 @@ def to_toon(data: Any, indent: int = 0) -> str:
     if isinstance(data, str):
         # Quote strings that contain special characters or are empty
         if needs_quoting(data):
-            return json.dumps(data)
+            return encode_basestring_ascii(data)
         return data
     
     if isinstance(data, list):
-        return format_array(data, indent)
+        # Only empty arrays fit on one line
+        return "[]"
     
     if isinstance(data, dict):
-        return format_object(data, indent)
+        if not data:
+            return "{}"
+        (key, value), = data.items()
+        key = format_key(key)
+        ind = "  " * indent
+        value_str = _format_inline(value, indent + 1)
+        if '\n' in value_str:  # only through keys containing newlines
+            return f"{ind}{key}:\n" + _indent_lines(value_str, ind + "  ")
+        return f"{ind}{key}: {value_str}"
     
     # Fallback to JSON for unsupported types
     return json.dumps(data)
 
 
-def needs_quoting(s: str) -> bool:
-    """Check if a string needs to be quoted in TOON."""
-    if not s:  # Empty string
-        return True
+def _indent_lines(text: str, prefix: str) -> str:
+    """Prefix every line of a text."""
+    return prefix + text.replace('\n', '\n' + prefix)
+
+
+def _emit(lines: List[str], prefix: str, text: str) -> None:
+    """Append a line, indenting the continuation lines of embedded newlines too."""
+    if prefix and '\n' in text:
+        lines.append(_indent_lines(text, prefix))
+    else:
+        lines.append(prefix + text)
+
+
+def _write_block(lines: List[str], data: Any, indent: int, prefix: str) -> None:
+    """
+    Append the lines of a multi-line value to the buffer.
     
-    # Check for special characters that require quoting
-    special_chars = [',', '\n', ':', '[', ']', '{', '}']
-    return any(char in s for char in special_chars)
+    Args:
+        lines: Output buffer
+        data: Non-empty array or object
+        indent: Indentation level of the value
+        prefix: Indentation inherited from the enclosing values
+    """
+    if isinstance(data, dict):
+        for key, value in data.items():
+            _write_entry(lines, key, value, indent, prefix)
+    elif _is_tabular(data):
+        _write_table(lines, data, indent, prefix)
+    else:
+        # Standard array format
+        lines.append(f"{prefix}[{len(data)}]")
+        item_prefix = prefix + "  " * (indent + 1)
+        for item in data:
+            if isinstance(item, dict) and item:
+                # Object items have no own header: mark where each one starts
+                lines.append(item_prefix + ITEM_MARKER)
+                _write_block(lines, item, indent + 1, item_prefix)
+            elif _is_multiline(item):
+                _write_block(lines, item, indent + 1, item_prefix)
+            else:
+                _emit(lines, item_prefix, _format_inline(item, indent + 1))
+
+
+def _write_entry(lines: List[str], key: Any, value: Any, indent: int, prefix: str) -> None:
+    """Append one ``key: value`` entry of an object at the given indentation level."""
+    key = format_key(key)
+    ind = "  " * indent
+    if _is_multiline(value):
+        _emit(lines, prefix, f"{ind}{key}:")
+        _write_block(lines, value, indent + 1, prefix + ind + "  ")
+        return
+    value_str = _format_inline(value, indent + 1)
+    if '\n' in value_str:
+        _emit(lines, prefix, f"{ind}{key}:")
+        _emit(lines, prefix + ind + "  ", value_str)
+    else:
+        _emit(lines, prefix, f"{ind}{key}: {value_str}")
+
+
+def _write_table(lines: List[str], arr: List[Dict[str, Any]], indent: int, prefix: str) -> None:
+    """Append a uniform array of objects as a TOON table."""
+    keys = list(arr[0].keys())
+    
+    # Header: [N] {field1, field2, ...}
+    _emit(lines, prefix, f"[{len(arr)}] " + "{" + ", ".join([format_key(key) for key in keys]) + "}")
+    
+    # Rows: value1, value2, ...
+    ind = "  " * (indent + 1) if indent > 0 else ""
+    for item in arr:
+        _emit(lines, prefix, ind + ", ".join([_format_cell(item[key]) for key in keys]))
+
+
+def _format_cell(value: Any) -> str:
+    """Format a table cell (nested objects/arrays on the same line)."""
+    if isinstance(value, str):
+        return encode_basestring_ascii(value) if needs_quoting(value) else value
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, dict):
+        return format_inline_object(value)
+    if isinstance(value, list):
+        return format_inline_array(value)
+    return str(value)
 
 
 def format_array(arr: List[Any], indent: int) -> str:
@@ -71,28 +230,7 @@ def format_array(arr: List[Any], indent: int) -> str:
     If array contains uniform objects, use tabular format.
     Otherwise, use standard array format.
     """
-    if not arr:
-        return "[]"
-    
-    # Check if array contains uniform objects (tabular format)
-    if all(isinstance(item, dict) for item in arr):
-        # Check if all objects have the same keys
-        if len(arr) > 0:
-            first_keys = set(arr[0].keys())
-            if all(set(item.keys()) == first_keys for item in arr):
-                return format_tabular_array(arr, indent)
-    
-    # Standard array format
-    lines = [f"[{len(arr)}]"]
-    ind = "  " * (indent + 1)
-    
-    for item in arr:
-        item_str = to_toon(item, indent + 1)
-        # Add indentation to each line of the item
-        item_lines = item_str.split('\n')
-        lines.extend([ind + line for line in item_lines])
-    
-    return '\n'.join(lines)
+    return to_toon(arr, indent)
 
 
 def format_tabular_array(arr: List[Dict[str, Any]], indent: int) -> str:
@@ -108,37 +246,8 @@ def format_tabular_array(arr: List[Dict[str, Any]], indent: int) -> str:
     if not arr:
         return "[]"
     
-    keys = list(arr[0].keys())
-    lines = []
-    
-    # Header: [N] {field1, field2, ...}
-    header = f"[{len(arr)}] " + "{" + ", ".join(keys) + "}"
-    lines.append(header)
-    
-    # Rows: value1, value2, ...
-    ind = "  " * (indent + 1) if indent > 0 else ""
-    
-    for item in arr:
-        values = []
-        for key in keys:
-            value = item[key]
-            # Format nested objects/arrays on same line when possible
-            if isinstance(value, dict):
-                value_str = format_inline_object(value)
-            elif isinstance(value, list):
-                value_str = format_inline_array(value)
-            elif isinstance(value, str):
-                value_str = json.dumps(value) if needs_quoting(value) else value
-            elif value is None:
-                value_str = "null"
-            elif isinstance(value, bool):
-                value_str = "true" if value else "false"
-            else:
-                value_str = str(value)
-            values.append(value_str)
-        
-        lines.append(ind + ", ".join(values))
-    
+    lines: List[str] = []
+    _write_table(lines, arr, indent, "")
     return '\n'.join(lines)
 
 
@@ -150,14 +259,17 @@ def format_inline_object(obj: Dict[str, Any]) -> str:
     pairs = []
     for key, value in obj.items():
         if isinstance(value, str):
-            val_str = json.dumps(value) if needs_quoting(value) else value
+            val_str = encode_basestring_ascii(value) if needs_quoting(value) else value
         elif value is None:
             val_str = "null"
         elif isinstance(value, bool):
             val_str = "true" if value else "false"
+        elif isinstance(value, (dict, list)):
+            # Nested structures - use JSON, as in inline arrays
+            val_str = json.dumps(value)
         else:
             val_str = str(value)
-        pairs.append(f"{key}: {val_str}")
+        pairs.append(f"{format_key(key)}: {val_str}")
     
     return "{" + ", ".join(pairs) + "}"
 
@@ -170,7 +282,7 @@ def format_inline_array(arr: List[Any]) -> str:
     items = []
     for item in arr:
         if isinstance(item, str):
-            item_str = json.dumps(item) if needs_quoting(item) else item
+            item_str = encode_basestring_ascii(item) if needs_quoting(item) else item
         elif item is None:
             item_str = "null"
         elif isinstance(item, bool):
@@ -199,22 +311,248 @@ def format_object(obj: Dict[str, Any], indent: int) -> str:
     if not obj:
         return "{}"
     
-    lines = []
-    ind = "  " * indent
+    lines: List[str] = []
+    _write_block(lines, obj, indent, "")
+    return '\n'.join(lines)
+
+
+# Kinds of model fields handled by ModelEncoder
+_SCALAR, _MODEL, _TABLE, _OTHER = range(4)
+
+
+def _format_str(value: str) -> str:
+    """Format a str field value (needs_quoting inlined)."""
+    if not value or _SPECIAL_CHARS.search(value) or _AMBIGUOUS.match(value):
+        return encode_basestring_ascii(value)
+    return value
+
+
+def _format_float(value: float) -> str:
+    """Format a float field value (ints are dumped as floats in JSON mode)."""
+    return str(float(value))
+
+
+def _format_int(value: int) -> str:
+    """Format an int field value."""
+    return str(int(value))
+
+
+def _format_bool(value: bool) -> str:
+    """Format a bool field value."""
+    return "true" if value else "false"
+
+
+_SCALAR_FORMATTERS: Dict[type, Callable[[Any], str]] = {
+    str: _format_str,
+    float: _format_float,
+    int: _format_int,
+    bool: _format_bool,
+}
+
+
+def _nullable(formatter: Callable[[Any], str]) -> Callable[[Any], str]:
+    """Wrap a formatter for an Optional field."""
+    def format_optional(value: Any) -> str:
+        return "null" if value is None else formatter(value)
+    return format_optional
+
+
+def _field_kind(annotation: Any) -> Tuple[int, Any]:
+    """
+    Classify a field annotation.
     
-    for key, value in obj.items():
-        value_str = to_toon(value, indent + 1)
+    Returns:
+        (kind, detail): a cell formatter for scalars, the model class for
+        nested models and for lists of models, None otherwise
+    """
+    optional = False
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        optional = len(args) < len(get_args(annotation))
+        if len(args) != 1:
+            return _OTHER, None
+        annotation = args[0]
+    if annotation in _SCALAR_FORMATTERS:
+        formatter = _SCALAR_FORMATTERS[annotation]
+        return _SCALAR, _nullable(formatter) if optional else formatter
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _MODEL, annotation
+    if get_origin(annotation) in (list, List):
+        (item,) = get_args(annotation) or (Any,)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return _TABLE, item
+    return _OTHER, None
+
+
+def _split_exclude(exclude: Any, name: str) -> Tuple[bool, Any]:
+    """Resolve a model_dump ``exclude`` argument for one field: (excluded, nested exclude)."""
+    if not exclude:
+        return False, None
+    if isinstance(exclude, dict):
+        nested = exclude.get(name)
+        if nested is True or nested is Ellipsis:
+            return True, None
+        return False, nested
+    return name in exclude, None
+
+
+class ModelEncoder:
+    """
+    TOON encoder compiled from a Pydantic model schema.
+    
+    The field kinds are resolved once from the annotations: scalar fields
+    are formatted straight from the model attributes, nested models use
+    their own encoder, and lists of models are written as tables without
+    dumping the rows to dicts or checking that they are uniform (rows of a
+    ``List[Model]`` always share the model fields). Fields of any other
+    type are dumped and formatted by the generic encoder.
+    
+    The output is the same as ``to_toon(model.model_dump(mode="json"))``.
+    """
+    
+    def __init__(self, model_cls: Type[BaseModel]):
+        self.model_cls = model_cls
+        self.names = list(model_cls.model_fields)
+        self.fields = [
+            (name, *_field_kind(field.annotation))
+            for name, field in model_cls.model_fields.items()
+        ]
+        # Table rows: every field must have a cell formatter
+        self.row_formatters: Optional[List[Callable[[Any], str]]] = None
+        if self.names and all(kind == _SCALAR for _, kind, _ in self.fields):
+            self.row_formatters = [formatter for _, _, formatter in self.fields]
+            self.row_values = attrgetter(*self.names)
+        self.table_header = "{" + ", ".join([format_key(name) for name in self.names]) + "}"
+    
+    def encode(self, model: BaseModel, exclude: Any = None) -> str:
+        """Encode a model instance as a TOON document."""
+        if self._included_count(exclude) < 2:
+            return to_toon(model.model_dump(mode="json", exclude=exclude))
+        lines: List[str] = []
+        self.write(lines, model, 0, "", exclude)
+        return '\n'.join(lines)
+    
+    def _included_count(self, exclude: Any) -> int:
+        """Number of fields left after ``exclude``."""
+        if not exclude:
+            return len(self.names)
+        return sum(not _split_exclude(exclude, name)[0] for name in self.names)
+    
+    def write(self, lines: List[str], model: BaseModel, indent: int, prefix: str, exclude: Any = None) -> None:
+        """
+        Append the lines of a model with at least two fields left after ``exclude``.
         
-        # Check if value is multi-line
-        if '\n' in value_str:
-            lines.append(f"{ind}{key}:")
-            # Add indented value lines
-            for value_line in value_str.split('\n'):
-                lines.append(f"{ind}  {value_line}")
-        else:
-            lines.append(f"{ind}{key}: {value_str}")
+        Args:
+            lines: Output buffer
+            model: Model instance
+            indent: Indentation level of the model
+            prefix: Indentation inherited from the enclosing values
+            exclude: model_dump ``exclude`` argument
+        """
+        ind = "  " * indent
+        line_prefix = prefix + ind
+        child_prefix = line_prefix + "  "
+        for name, kind, detail in self.fields:
+            nested_exclude = None
+            if exclude:
+                excluded, nested_exclude = _split_exclude(exclude, name)
+                if excluded:
+                    continue
+            value = getattr(model, name)
+            if value is None:
+                lines.append(f"{line_prefix}{name}: null")
+            elif kind == _SCALAR:
+                lines.append(f"{line_prefix}{name}: {detail(value)}")
+            elif kind == _TABLE and not nested_exclude and get_encoder(detail).row_formatters is not None:
+                if value:
+                    lines.append(f"{line_prefix}{name}:")
+                    get_encoder(detail).write_table(lines, value, indent + 1, child_prefix)
+                else:
+                    lines.append(f"{line_prefix}{name}: []")
+            elif kind == _MODEL and get_encoder(detail)._included_count(nested_exclude) >= 2:
+                lines.append(f"{line_prefix}{name}:")
+                get_encoder(detail).write(lines, value, indent + 1, child_prefix, nested_exclude)
+            else:
+                dumped = model.model_dump(mode="json", include={name}, exclude=exclude)[name]
+                _write_entry(lines, name, dumped, indent, prefix)
     
-    return '\n'.join(lines)
+    def write_table(self, lines: List[str], items: Sequence[BaseModel], indent: int, prefix: str) -> None:
+        """Append a non-empty list of model instances as a TOON table."""
+        lines.append(f"{prefix}[{len(items)}] {self.table_header}")
+        lines.extend(self.format_rows(items, prefix + ("  " * (indent + 1) if indent > 0 else "")))
+    
+    def format_rows(self, items: Iterable[Any], row_prefix: str = "") -> List[str]:
+        """
+        Format table rows.
+        
+        Items only need the model fields as attributes: model instances, or
+        records holding the same validated values.
+        """
+        formatters = self.row_formatters
+        values = self.row_values
+        if len(formatters) == 1:
+            (formatter,) = formatters
+            return [row_prefix + formatter(values(item)) for item in items]
+        return [
+            row_prefix + ", ".join([formatter(value) for formatter, value in zip(formatters, values(item))])
+            for item in items
+        ]
+
+
+_ENCODERS: Dict[Type[BaseModel], ModelEncoder] = {}
+
+
+def get_encoder(model_cls: Type[BaseModel]) -> ModelEncoder:
+    """Return the compiled TOON encoder of a model class (built once)."""
+    encoder = _ENCODERS.get(model_cls)
+    if encoder is None:
+        encoder = _ENCODERS[model_cls] = ModelEncoder(model_cls)
+    return encoder
+
+
+def model_to_toon(model: BaseModel, exclude: Any = None) -> str:
+    """
+    Encode a Pydantic model as TOON without dumping it to dicts first.
+    
+    Args:
+        model: Model instance
+        exclude: model_dump ``exclude`` argument (fields left out)
+        
+    Returns:
+        TOON-formatted string, identical to
+        ``to_toon(model.model_dump(mode="json", exclude=exclude))``
+    """
+    return get_encoder(type(model)).encode(model, exclude)
+
+
+def iter_toon_table(items: Sequence[Any], model_cls: Type[BaseModel], chunk_rows: int = 1000) -> Iterator[str]:
+    """
+    Stream a collection as a TOON table, ``chunk_rows`` rows at a time.
+    
+    The concatenated chunks are the same text as ``to_toon`` on the dumped
+    rows, without holding the whole table in memory.
+    
+    Args:
+        items: Model instances, or records with the same fields (must support len())
+        model_cls: Model describing the rows
+        chunk_rows: Rows per chunk
+        
+    Yields:
+        TOON text chunks
+    """
+    encoder = get_encoder(model_cls)
+    if encoder.row_formatters is None:
+        raise TypeError(f"{model_cls.__name__} has fields that cannot be written as table cells")
+    count = len(items)
+    if not count:
+        yield "[]"
+        return
+    yield f"[{count}] {encoder.table_header}"
+    iterator = iter(items)
+    rows = encoder.format_rows(islice(iterator, chunk_rows))
+    while rows:
+        yield "\n" + "\n".join(rows)
+        rows = encoder.format_rows(islice(iterator, chunk_rows))
 
 
 def format_response_as_toon(data: Any) -> str:
@@ -224,12 +562,11 @@ def format_response_as_toon(data: Any) -> str:
     This is the main entry point for converting API responses.
     
     Args:
-        data: Response data (list, dict, or primitive)
+        data: Response data (Pydantic model, list, dict, or primitive)
         
     Returns:
         TOON-formatted string
     """
+    if isinstance(data, BaseModel):
+        return model_to_toon(data)
     return to_toon(data)
-
-
-
@@ -0,0 +1,317 @@
+"""
+TOON parser: decode text produced by ``to_toon`` back to Python data.
+
+For JSON-compatible data (dicts with str keys, lists, str, int, float,
+bool, None) the round trip is exact: ``parse_toon(to_toon(data)) == data``,
+with the same value types. Tabular rows take the key order of the header.
+
+The parser mirrors the encoder: every value is read at the indentation
+level and inherited prefix the encoder wrote it with, so each line is
+looked at once and quoted strings are decoded by json's C scanner.
+"""
+
+from json import JSONDecodeError, JSONDecoder
+from json.decoder import scanstring
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.utils.toon_formatter import ITEM_MARKER, NUMBER_PATTERN
+
+# Array header: [N] or [N] {key1, key2}
+_HEADER = re.compile(r'\[(\d+)\](?: \{(.*)\})?\Z')
+# Unquoted cell values stop at the next separator
+_CELL_END = re.compile(r'[,\]}]')
+_LITERALS = {"null": None, "true": True, "false": False}
+_json_decoder = JSONDecoder()
+
+
+class TOONDecodeError(ValueError):
+    """Raised when a text is not valid TOON."""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"{message} (line {line})")
+        self.line = line
+
+
+def parse_toon(text: str) -> Any:
+    """
+    Parse a TOON document.
+
+    Args:
+        text: TOON text, as returned by ``to_toon`` / ``format_response_as_toon``
+
+    Returns:
+        The decoded value
+
+    Raises:
+        TOONDecodeError: If the text is not valid TOON
+
+    Examples:
+        >>> parse_toon('name: John\\nage: 30')
+        {'name': 'John', 'age': 30}
+
+        >>> parse_toon('[2] {id, name}\\n1, Alice\\n2, Bob')
+        [{'id': 1, 'name': 'Alice'}, {'id': 2, 'name': 'Bob'}]
+    """
+    return _Parser(text).parse_document()
+
+
+def parse_scalar(token: str) -> Any:
+    """Decode an unquoted scalar: null, true, false, a number, or a string."""
+    if token in _LITERALS:
+        return _LITERALS[token]
+    if NUMBER_PATTERN.fullmatch(token):
+        if token.lstrip('-').isdigit():
+            return int(token)
+        return float(token)
+    return token
+
+
+def _split_key(content: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Split an object entry line (without its indentation).
+
+    Returns:
+        (key, inline value text, or None when the value is a block on the
+        next lines), or None if the line is not an object entry
+    """
+    if not content or content[0] == ' ':
+        return None
+    if content[0] == '"':
+        try:
+            key, end = scanstring(content, 1)
+        except (JSONDecodeError, ValueError):
+            return None
+    else:
+        end = content.find(':')
+        if end <= 0:
+            return None
+        key = content[:end]
+    if content.startswith(': ', end):
+        return key, content[end + 2:]
+    if end + 1 == len(content) and content[end] == ':':
+        return key, None
+    return None
+
+
+class _Parser:
+    """Line-oriented TOON parser (see ``to_toon`` for the layout)."""
+
+    def __init__(self, text: str):
+        self.lines = text.split('\n')
+        self.pos = 0
+
+    def error(self, message: str) -> TOONDecodeError:
+        """Build a decode error at the current line."""
+        return TOONDecodeError(message, self.pos + 1)
+
+    def parse_document(self) -> Any:
+        """Parse a whole document (value written at level 0)."""
+        first = self.lines[0]
+        if _HEADER.match(first):
+            value = self.parse_array(0, 0)
+        elif _split_key(first) is not None:
+            value = self.parse_object(0, 0)
+        else:
+            value = self.parse_inline(first, 0)
+            self.pos = 1
+        if self.pos != len(self.lines):
+            raise self.error("Unexpected content after the document")
+        return value
+
+    def content_at(self, width: int) -> str:
+        """Current line without its indentation of `width` spaces."""
+        if self.pos >= len(self.lines):
+            raise self.error("Unexpected end of document")
+        line = self.lines[self.pos]
+        if len(line) < width or line[:width].strip(' '):
+            raise self.error(f"Expected an indentation of {width} spaces")
+        return line[width:]
+
+    def parse_block(self, level: int, width: int) -> Any:
+        """Parse a multi-line value written at `level` after a prefix of `width` spaces."""
+        if _HEADER.match(self.content_at(width)):
+            return self.parse_array(level, width)
+        return self.parse_object(level, width + 2 * level)
+
+    def parse_object(self, level: int, width: int) -> Dict[str, Any]:
+        """Parse the entries of an object whose key lines are indented by `width` spaces."""
+        lines = self.lines
+        obj: Dict[str, Any] = {}
+        indent = ' ' * width
+        while self.pos < len(lines):
+            line = lines[self.pos]
+            if not line.startswith(indent):
+                break
+            entry = _split_key(line[width:])
+            if entry is None:
+                break
+            key, value_text = entry
+            self.pos += 1
+            if value_text is None:
+                obj[key] = self.parse_block(level + 1, width + 2)
+            else:
+                obj[key] = self.parse_inline(value_text, level + 1)
+        if not obj:
+            raise self.error("Expected an object entry")
+        return obj
+
+    def parse_array(self, level: int, width: int) -> List[Any]:
+        """Parse an array (header line, then rows or items) written at `level`."""
+        header = _HEADER.match(self.content_at(width))
+        self.pos += 1
+        count = int(header.group(1))
+        if header.group(2) is not None:
+            return self.parse_rows(header.group(2), count, width + (2 * (level + 1) if level > 0 else 0))
+
+        items = []
+        item_width = width + 2 * (level + 1)
+        for _ in range(count):
+            content = self.content_at(item_width)
+            if content == ITEM_MARKER:
+                self.pos += 1
+                items.append(self.parse_object(level + 1, item_width + 2 * (level + 1)))
+            elif _HEADER.match(content):
+                items.append(self.parse_array(level + 1, item_width))
+            else:
+                self.pos += 1
+                items.append(self.parse_inline(content, level + 1))
+        return items
+
+    def parse_rows(self, header_keys: str, count: int, width: int) -> List[Dict[str, Any]]:
+        """Parse the `count` rows of a table whose rows are indented by `width` spaces."""
+        keys = self.parse_keys(header_keys)
+        rows = []
+        for _ in range(count):
+            content = self.content_at(width)
+            if not keys:
+                if content:
+                    raise self.error("Expected an empty row")
+                values = []
+            elif '"' in content or '{' in content or '[' in content:
+                values = self.parse_cells(content)
+            else:
+                values = [parse_scalar(cell) for cell in content.split(', ')]
+            if len(values) != len(keys):
+                raise self.error(f"Expected {len(keys)} cells, got {len(values)}")
+            rows.append(dict(zip(keys, values)))
+            self.pos += 1
+        return rows
+
+    def parse_keys(self, text: str) -> List[str]:
+        """Parse the ", "-separated keys of a table header (plain or quoted)."""
+        if '"' not in text:
+            return text.split(', ') if text else []
+        keys = []
+        index = 0
+        while True:
+            if text.startswith('"', index):
+                try:
+                    key, index = scanstring(text, index + 1)
+                except (JSONDecodeError, ValueError) as e:
+                    raise self.error(f"Invalid quoted key: {e}")
+            else:
+                end = text.find(',', index)
+                end = len(text) if end < 0 else end
+                key, index = text[index:end], end
+            keys.append(key)
+            if index == len(text):
+                return keys
+            if not text.startswith(', ', index):
+                raise self.error(f"Expected ', ' at column {index + 1}")
+            index += 2
+
+    def parse_cells(self, text: str) -> List[Any]:
+        """Parse ", "-separated table cells (scalars, quoted strings, inline objects and arrays)."""
+        values = []
+        index = 0
+        while True:
+            value, index = self.parse_cell(text, index, top=True)
+            values.append(value)
+            if index == len(text):
+                return values
+            if not text.startswith(', ', index):
+                raise self.error(f"Expected ', ' at column {index + 1}")
+            index += 2
+
+    def parse_cell(self, text: str, index: int, top: bool = False) -> Tuple[Any, int]:
+        """Parse one cell value starting at `index`; returns (value, end index)."""
+        char = text[index:index + 1]
+        try:
+            if char == '"':
+                return scanstring(text, index + 1)
+            if char == '{':
+                if top:
+                    return self.parse_inline_object(text, index)
+                return _json_decoder.raw_decode(text, index)
+            if char == '[':
+                if top:
+                    return self.parse_inline_array(text, index)
+                return _json_decoder.raw_decode(text, index)
+        except (JSONDecodeError, ValueError) as e:
+            raise self.error(f"Invalid value at column {index + 1}: {e}")
+        match = _CELL_END.search(text, index)
+        end = match.start() if match else len(text)
+        return parse_scalar(text[index:end]), end
+
+    def parse_inline_object(self, text: str, index: int) -> Tuple[Dict[str, Any], int]:
+        """Parse a cell object ``{key: value, ...}`` (nested values are JSON)."""
+        obj: Dict[str, Any] = {}
+        index += 1
+        if text.startswith('}', index):
+            return obj, index + 1
+        while True:
+            if text.startswith('"', index):
+                key, index = scanstring(text, index + 1)
+            else:
+                end = text.find(':', index)
+                if end < 0:
+                    raise self.error(f"Expected a key at column {index + 1}")
+                key, index = text[index:end], end
+            if not text.startswith(': ', index):
+                raise self.error(f"Expected ': ' at column {index + 1}")
+            obj[key], index = self.parse_cell(text, index + 2)
+            if text.startswith('}', index):
+                return obj, index + 1
+            if not text.startswith(', ', index):
+                raise self.error(f"Expected ', ' or '}}' at column {index + 1}")
+            index += 2
+
+    def parse_inline_array(self, text: str, index: int) -> Tuple[List[Any], int]:
+        """Parse a cell array ``[value, ...]`` (nested values are JSON)."""
+        items: List[Any] = []
+        index += 1
+        if text.startswith(']', index):
+            return items, index + 1
+        while True:
+            item, index = self.parse_cell(text, index)
+            items.append(item)
+            if text.startswith(']', index):
+                return items, index + 1
+            if not text.startswith(', ', index):
+                raise self.error(f"Expected ', ' or ']' at column {index + 1}")
+            index += 2
+
+    def parse_inline(self, text: str, level: int) -> Any:
+        """Parse a single-line value written at `level` (scalar, [], {} or one-key object chain)."""
+        if not text:
+            raise self.error("Expected a value")
+        if text[0] == '"':
+            try:
+                value, end = scanstring(text, 1)
+            except (JSONDecodeError, ValueError) as e:
+                raise self.error(f"Invalid quoted string: {e}")
+            if end != len(text):
+                raise self.error("Unexpected content after a quoted string")
+            return value
+        if text == "[]":
+            return []
+        if text == "{}":
+            return {}
+        if text[0] == ' ':
+            # One-key object: "<2*level spaces>key: value"
+            width = 2 * level
+            entry = _split_key(text[width:]) if text[:width].strip(' ') == "" else None
+            if entry is not None and entry[1] is not None:
+                return {entry[0]: self.parse_inline(entry[1], level + 1)}
+        return parse_scalar(text)
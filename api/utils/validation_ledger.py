@@ -0,0 +1,154 @@
+"""
+Validated-once ledger for dataset files.
+
+The first load of a file version runs every row through its Pydantic model
+and records the outcome in ``<dataset>/.cache/validated.json``, keyed by the
+file's content digest and by the model schema. Later loads of the same
+content build records directly from the decoded rows (no UUID or ISO 8601
+parsing), except for the few rows that validation modified, which are
+always re-validated.
+
+This complements the dataset snapshot: the ledger is per file, so it still
+applies when the snapshot is missing, stale because another file changed,
+or invalidated by a snapshot format change.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from api.utils.dataset_snapshot import CACHE_DIR_NAME, atomic_write
+from api.utils.record_store import _Record
+
+logger = logging.getLogger(__name__)
+
+# Bump when a model validator changes behavior without changing the schema
+VALIDATION_VERSION = 1
+_LEDGER_FILE = "validated.json"
+
+
+def schema_key(record_cls: type) -> str:
+    """Return a key identifying the validation rules of a record's model."""
+    schema = json.dumps(record_cls._model.model_json_schema(), sort_keys=True)
+    digest = hashlib.blake2b(schema.encode('utf-8'), digest_size=8).hexdigest()
+    return f"v{VALIDATION_VERSION}-{record_cls._model.__name__}-{digest}"
+
+
+class ValidationLedger:
+    """Validation results of the files of one dataset folder."""
+
+    def __init__(self, dataset_dir: Path):
+        self._path = dataset_dir / CACHE_DIR_NAME / _LEDGER_FILE
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                self._entries: Dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def modified_rows(self, file_name: str, digest: str, record_cls: type) -> Optional[Set[int]]:
+        """
+        Return the rows that validation modified, if this file version was validated.
+
+        Args:
+            file_name: Source file name
+            digest: Content digest of the file
+            record_cls: Record class the rows are loaded into
+
+        Returns:
+            Row numbers to re-validate, or None if the file must be fully validated
+        """
+        entry = self._entries.get(file_name)
+        if not entry or entry.get("digest") != digest or entry.get("schema") != schema_key(record_cls):
+            return None
+        return set(entry.get("modified_rows", []))
+
+    def record(self, file_name: str, digest: str, record_cls: type, modified_rows: List[int]) -> None:
+        """
+        Record a successful validation pass and persist the ledger.
+
+        Failures to write are logged, never raised.
+        """
+        self._entries[file_name] = {
+            "digest": digest,
+            "schema": schema_key(record_cls),
+            "modified_rows": modified_rows,
+        }
+        try:
+            self._path.parent.mkdir(exist_ok=True)
+            atomic_write(self._path, json.dumps(self._entries, indent=2).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Could not store validation ledger {self._path}: {e}")
+
+
+def build_records(
+    rows,
+    record_cls: type,
+    modified: Optional[Set[int]],
+) -> Tuple[List[_Record], Optional[List[int]]]:
+    """
+    Turn decoded rows into records, trusting them if the file was validated.
+
+    Does not touch the ledger, so it can run in a worker process.
+
+    Args:
+        rows: Iterable of raw rows (dicts) decoded from the file
+        record_cls: Flat record class (TransactionRecord, LocationRecord...)
+        modified: Result of ``ValidationLedger.modified_rows`` (None: validate all)
+
+    Returns:
+        (records in file order, rows modified by validation or None if trusted)
+
+    Raises:
+        pydantic.ValidationError: If a row is invalid
+    """
+    model_cls = record_cls._model
+    defaults = record_cls.defaults()
+
+    if modified is not None:
+        records = [
+            record_cls.from_model(model_cls(**item)) if position in modified
+            else record_cls.from_trusted(item, defaults)
+            for position, item in enumerate(rows)
+        ]
+        return records, None
+
+    records = []
+    modified_rows = []
+    for position, item in enumerate(rows):
+        record = record_cls.from_model(model_cls(**item))
+        if not record.matches_raw(item, defaults):
+            modified_rows.append(position)
+        records.append(record)
+    return records, modified_rows
+
+
+def load_records(
+    rows,
+    record_cls: type,
+    ledger: ValidationLedger,
+    file_name: str,
+    digest: Optional[str],
+) -> List[_Record]:
+    """
+    Turn decoded rows into records, validating them only once per file version.
+
+    Args:
+        rows: Iterable of raw rows (dicts) decoded from the file
+        record_cls: Flat record class (TransactionRecord, LocationRecord...)
+        ledger: Validation ledger of the dataset folder
+        file_name: Source file name
+        digest: Content digest of the file (None disables the ledger)
+
+    Returns:
+        Records in file order
+
+    Raises:
+        pydantic.ValidationError: If a row is invalid
+    """
+    modified = ledger.modified_rows(file_name, digest, record_cls) if digest else None
+    records, modified_rows = build_records(rows, record_cls, modified)
+    if modified_rows is not None and digest:
+        ledger.record(file_name, digest, record_cls, modified_rows)
+    return records
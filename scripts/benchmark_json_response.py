@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark du rendu JSON des réponses AggregatedTransaction.
+
+Compare, sur les transactions agrégées d'un dataset, l'ancien chemin de
+format_response (json.dumps -> json.loads -> JSONResponse) au rendu en une
+passe de FastJSONResponse (orjson si installé, sinon pydantic-core), et
+vérifie que les octets produits sont identiques.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_json_response.py [--dataset "public 1"] [--limit 500] [--repeat 3]
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+import pydantic_core
+
+from api.models import AggregatedTransaction
+from api.utils import response_formatter
+from api.utils.aggregator import iter_aggregated
+from api.utils.data_loader import load_dataset
+from api.utils.response_formatter import FastJSONResponse
+
+
+def legacy_response(aggregated: AggregatedTransaction) -> bytes:
+    """Reproduit l'ancien chemin de format_response (référence de comparaison)."""
+    content = aggregated.model_dump(mode="json")
+    return JSONResponse(content=json.loads(json.dumps(content, default=lambda o: o.__dict__))).body
+
+
+def fast_response(aggregated: AggregatedTransaction) -> bytes:
+    """Rendu en une passe via FastJSONResponse."""
+    return FastJSONResponse(content=aggregated).body
+
+
+def pydantic_core_response(aggregated: AggregatedTransaction) -> bytes:
+    """Rendu en une passe sans orjson (encodeur de repli)."""
+    orjson = response_formatter.orjson
+    response_formatter.orjson = None
+    try:
+        return FastJSONResponse(content=aggregated).body
+    finally:
+        response_formatter.orjson = orjson
+
+
+def measure(name: str, render: Callable[[AggregatedTransaction], bytes], payloads: List[AggregatedTransaction], repeat: int) -> float:
+    """Temps moyen par réponse (ms), meilleur de `repeat` passes."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for aggregated in payloads:
+            render(aggregated)
+        best = min(best, time.perf_counter() - start)
+    per_response_ms = best / len(payloads) * 1000
+    print(f"{name:<28} | {per_response_ms:>10.3f}")
+    return per_response_ms
+
+
+def main() -> None:
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Benchmark du rendu JSON des transactions agrégées")
+    parser.add_argument('--dataset', type=str, default=None, help='Dossier dataset (défaut: dataset actif)')
+    parser.add_argument('--limit', type=int, default=500, help='Nombre de transactions agrégées mesurées')
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de passes (meilleur temps retenu)')
+    args = parser.parse_args()
+
+    data = load_dataset(args.dataset)
+    payloads = list(iter_aggregated(data.index, data.transactions[:args.limit]))
+    print(f"📂 {len(payloads)} transactions agrégées "
+          f"(encodeur rapide: {'orjson' if response_formatter.orjson else 'pydantic-core'})")
+
+    mismatches = sum(legacy_response(a) != fast_response(a) for a in payloads)
+    print(f"🔍 Réponses différentes de l'ancien chemin: {mismatches}")
+
+    print(f"{'path':<28} | {'ms/response':>10}")
+    print("-" * 41)
+    legacy_ms = measure("dumps -> loads -> JSON", legacy_response, payloads, args.repeat)
+    fast_ms = measure("FastJSONResponse", fast_response, payloads, args.repeat)
+    if response_formatter.orjson is not None:
+        measure("FastJSONResponse (no orjson)", pydantic_core_response, payloads, args.repeat)
+    print(f"✅ Gain: x{legacy_ms / fast_ms:.1f} (pydantic-core {pydantic_core.__version__})")
+
+
+if __name__ == "__main__":
+    main()
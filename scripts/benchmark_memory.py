@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark mémoire du stockage interne des transactions.
+
+Compare, sur des transactions synthétiques réalistes (IBAN, biotags, villes
+et moyens de paiement répétés), l'empreinte mémoire :
+- d'une liste de modèles Pydantic `Transaction` (ancien stockage)
+- d'une liste de `TransactionRecord` compacts (slots + chaînes internées)
+
+Les résultats sont extrapolés en Mo par million de transactions.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_memory.py [--count 200000]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List
+
+from api.models import Transaction
+from api.utils.record_store import TransactionRecord
+
+PAYMENT_METHODS = ["debit card", "credit card", "mobile device", "smartwatch", "PayPal", "GooglePay", ""]
+TRANSACTION_TYPES = ["transfer", "e-commerce", "in-person payment", "withdrawal", "direct debit"]
+CITIES = ["Modena", "Torino", "Milano", "Roma", "Napoli", "Bologna", "MarketNest Online", ""]
+
+
+def iter_raw_transactions(count: int, seed: int = 7) -> Iterator[Dict]:
+    """Génère des transactions brutes, comme lues depuis le JSON (chaînes neuves)."""
+    rng = random.Random(seed)
+    users = [(f"USR{i:05d}-X", f"IT{rng.randint(10, 99)}V{i:023d}") for i in range(max(2, count // 200))]
+    start = datetime(2025, 11, 1)
+    for _ in range(count):
+        sender_id, sender_iban = rng.choice(users)
+        recipient_id, recipient_iban = rng.choice(users)
+        # Reconstruire les chaînes comme le ferait le parseur JSON (objets distincts)
+        yield {
+            "transaction_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "sender_id": "".join(sender_id),
+            "recipient_id": "".join(recipient_id),
+            "transaction_type": "".join(rng.choice(TRANSACTION_TYPES)),
+            "amount": round(rng.uniform(1, 2000), 2),
+            "location": "".join(rng.choice(CITIES)),
+            "payment_method": "".join(rng.choice(PAYMENT_METHODS)),
+            "sender_iban": "".join(sender_iban),
+            "recipient_iban": "".join(recipient_iban),
+            "balance_after": round(rng.uniform(0, 5000), 2),
+            "description": "",
+            "timestamp": (start + timedelta(seconds=rng.uniform(0, 5e6))).isoformat(),
+        }
+
+
+def measure(label: str, count: int, build: Callable[[Dict], object]) -> float:
+    """Mesure la mémoire retenue par `count` objets construits avec `build`."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rows: List[object] = [build(item) for item in iter_raw_transactions(count)]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    per_million_mb = retained / count * 1_000_000 / 1e6
+    print(f"{label:<28} {retained / 1e6:10.1f} MB  ({per_million_mb:,.0f} MB / million)")
+    del rows
+    return per_million_mb
+
+
+def main() -> None:
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Benchmark mémoire: Pydantic vs records compacts")
+    parser.add_argument('--count', type=int, default=200_000, help='Nombre de transactions générées')
+    args = parser.parse_args()
+
+    print(f"📊 {args.count:,} transactions synthétiques")
+    pydantic_mb = measure("Pydantic Transaction", args.count, lambda item: Transaction(**item))
+    record_mb = measure(
+        "TransactionRecord (slots)",
+        args.count,
+        lambda item: TransactionRecord.from_model(Transaction(**item)),
+    )
+    print(f"⚡ Réduction: x{pydantic_mb / record_mb:.1f}")
+
+
+if __name__ == "__main__":
+    main()
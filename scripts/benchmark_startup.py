@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark du temps de démarrage de l'API (chargement du dataset).
+
+Mesure, dans un processus Python neuf à chaque fois :
+- cold : sans snapshot (parse JSON + validation Pydantic + index)
+- warm : avec le snapshot binaire stocké dans API_SNAPSHOT_DIR/<dataset>/
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_startup.py [--dataset "public 1"] [--runs 3]
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from api.utils.dataset_snapshot import SNAPSHOT_DIR
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Code exécuté dans le processus enfant : imports exclus de la mesure
+_CHILD_CODE = """
+import json, sys, time
+from api.utils.data_loader import load_dataset, set_dataset_folder
+set_dataset_folder(sys.argv[1])
+start = time.perf_counter()
+snapshot = load_dataset()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "transactions": len(snapshot.transactions), "emails": len(snapshot.emails)}))
+"""
+
+
+def run_child(dataset: str) -> dict:
+    """Charge le dataset dans un processus neuf et retourne la mesure."""
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD_CODE, dataset],
+        cwd=PROJECT_ROOT,
+        env={"PYTHONPATH": str(PROJECT_ROOT), "PATH": "", "API_SNAPSHOT_DIR": str(SNAPSHOT_DIR)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def clear_snapshots(dataset_dir: Path) -> None:
+    """Supprime le cache du dataset et ses snapshots."""
+    shutil.rmtree(dataset_dir / ".cache", ignore_errors=True)
+    shutil.rmtree(SNAPSHOT_DIR / dataset_dir.name, ignore_errors=True)
+
+
+def main() -> None:
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage (snapshot cold/warm)")
+    parser.add_argument('--dataset', type=str, default="public 1", help='Dossier dataset à charger')
+    parser.add_argument('--runs', type=int, default=3, help='Nombre de mesures par mode')
+    args = parser.parse_args()
+
+    dataset_dir = PROJECT_ROOT / "dataset" / args.dataset
+    if not dataset_dir.exists():
+        print(f"❌ Dataset introuvable: {dataset_dir}")
+        exit(1)
+
+    cold = []
+    for _ in range(args.runs):
+        clear_snapshots(dataset_dir)
+        cold.append(run_child(args.dataset))
+
+    # Le dernier run cold a écrit le snapshot : les runs suivants sont warm
+    warm = [run_child(args.dataset) for _ in range(args.runs)]
+
+    cold_s = statistics.median(r["seconds"] for r in cold)
+    warm_s = statistics.median(r["seconds"] for r in warm)
+    print(f"📂 Dataset: {args.dataset} ({cold[0]['transactions']} transactions, {cold[0]['emails']} emails)")
+    print(f"🧊 Cold (sans snapshot): {cold_s * 1000:8.1f} ms")
+    print(f"🔥 Warm (snapshot):      {warm_s * 1000:8.1f} ms")
+    print(f"⚡ Speedup: x{cold_s / warm_s:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark des réponses en streaming pour les grandes collections.
+
+Compare, sur N transactions synthétiques (1M par défaut), le rendu complet
+en mémoire (ancien /api/transactions : liste de dicts -> JSONResponse ou
+TOONResponse) aux réponses en streaming (StreamingJSONResponse,
+StreamingTOONResponse) :
+- TTFB : délai avant le premier octet disponible pour l'envoi
+- total : délai avant le dernier octet
+- pic mémoire : pic RSS au-delà du dataset déjà chargé
+
+Chaque mode tourne dans un processus séparé pour isoler son pic RSS.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_streaming_response.py [--rows 1000000] [--modes json-buffered json-stream]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api.models import Transaction
+from api.utils.record_store import TransactionRecord
+from api.utils.response_formatter import TOONResponse, format_streaming_response
+
+MODES = ("json-buffered", "json-stream", "toon-buffered", "toon-stream")
+CITIES = ["Modena", "Torino", "Milano", "Roma", "Napoli", "Bologna", "MarketNest Online", ""]
+
+
+def generate_records(count: int, seed: int = 7) -> List[TransactionRecord]:
+    """Génère des transactions compactes, comme chargées par data_loader."""
+    rng = random.Random(seed)
+    ibans = [f"IT{rng.randint(10, 99)}V{i:023d}" for i in range(max(2, count // 200))]
+    start = datetime(2025, 11, 1)
+    defaults = TransactionRecord.defaults()
+    return [
+        TransactionRecord.from_trusted({
+            "transaction_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "transaction_type": "transfer",
+            "amount": round(rng.uniform(1, 2000), 2),
+            "location": rng.choice(CITIES),
+            "sender_iban": rng.choice(ibans),
+            "recipient_iban": rng.choice(ibans),
+            "balance_after": round(rng.uniform(0, 5000), 2),
+            "timestamp": (start + timedelta(seconds=rng.uniform(0, 5e6))).isoformat(),
+        }, defaults)
+        for _ in range(count)
+    ]
+
+
+def rss_mb(field: str) -> float:
+    """Lit VmRSS / VmHWM (Mo) dans /proc/self/status."""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reset_peak_rss() -> None:
+    """Remet le pic RSS (VmHWM) au niveau courant (Linux, sinon sans effet)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+async def consume(response) -> Dict[str, float]:
+    """Parcourt le corps d'une réponse en streaming : (TTFB, total, octets)."""
+    start = time.perf_counter()
+    first = None
+    size = 0
+    async for chunk in response.body_iterator:
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    return {"ttfb": first, "total": time.perf_counter() - start, "bytes": size}
+
+
+def run_mode(mode: str, rows: int) -> Dict[str, float]:
+    """Mesure un mode dans le processus courant."""
+    records = generate_records(rows)
+    baseline = rss_mb("VmRSS")
+    reset_peak_rss()
+
+    start = time.perf_counter()
+    if mode == "json-buffered":
+        # Ancien chemin FastAPI : liste de dicts, jsonable_encoder puis JSONResponse
+        body = JSONResponse(content=jsonable_encoder([t.to_dict() for t in records])).body
+        result = {"ttfb": time.perf_counter() - start, "bytes": len(body)}
+    elif mode == "toon-buffered":
+        body = TOONResponse(content=[t.to_dict() for t in records]).body
+        result = {"ttfb": time.perf_counter() - start, "bytes": len(body)}
+    else:
+        response = format_streaming_response(records, Transaction, mode.split("-")[0])
+        result = asyncio.run(consume(response))
+    result.setdefault("total", time.perf_counter() - start)
+    result["peak_mb"] = rss_mb("VmHWM") - baseline
+    return result
+
+
+def main() -> None:
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Benchmark des réponses en streaming")
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Nombre de transactions')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='Modes mesurés')
+    parser.add_argument('--worker', choices=MODES, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_mode(args.worker, args.rows)))
+        return
+
+    print(f"📊 {args.rows:,} transactions")
+    print(f"{'mode':<14} | {'TTFB (s)':>9} | {'total (s)':>9} | {'body (MB)':>9} | {'peak (MB)':>9}")
+    print("-" * 62)
+    for mode in args.modes:
+        output = subprocess.run(
+            [sys.executable, __file__, '--rows', str(args.rows), '--worker', mode],
+            capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONPATH": str(Path(__file__).parent.parent)},
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:<14} | {result['ttfb']:>9.3f} | {result['total']:>9.2f} | "
+            f"{result['bytes'] / 1024 / 1024:>9.1f} | {result['peak_mb']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
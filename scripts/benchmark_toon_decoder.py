@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests de propriété et benchmark du décodeur TOON.
+
+Vérifie l'aller-retour exact parse_toon(to_toon(x)) == x (mêmes types :
+bool/int/float, nan compris) :
+- sur des documents aléatoires de type JSON (objets imbriqués, tableaux
+  uniformes ou non, clés et chaînes ambiguës : "true", "-1", "a: b", ...)
+- sur les transactions agrégées d'un dataset (model_to_toon)
+
+Mesure ensuite le débit de parse_toon (MB/s, documents/s) face à
+json.loads sur les mêmes documents en JSON.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_toon_decoder.py [--dataset "public 1"] [--limit 500] [--cases 20000] [--seed 0]
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from typing import Any, Callable, List
+
+from api.utils.aggregator import iter_aggregated
+from api.utils.data_loader import load_dataset
+from api.utils.toon_formatter import model_to_toon, to_toon
+from api.utils.toon_parser import parse_toon
+
+# Chaînes et clés qui se liraient comme une autre valeur si elles n'étaient pas citées
+AMBIGUOUS = [
+    "", " ", "-", "-1", "1", "1.5", "1e+05", "inf", "-inf", "nan", "true", "false", "null",
+    "a: b", "a, b", "[1]", "[2] {a}", "{}", "[]", '"q"', " lead", "trail ", "\n", "a\nb", "é",
+]
+KEYS = ["id", "name", "amount", "location"]
+FLOATS = [0.0, -0.0, 1.5, 1e-7, 1e20, math.inf, -math.inf, math.nan]
+
+
+def random_scalar(rng: random.Random) -> Any:
+    """Scalaire JSON aléatoire."""
+    kind = rng.randrange(6)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.random() < 0.5
+    if kind == 2:
+        return rng.randint(-10**20, 10**20) if rng.random() < 0.1 else rng.randint(-5, 1000)
+    if kind == 3:
+        return rng.choice(FLOATS) if rng.random() < 0.5 else rng.uniform(-1e6, 1e6)
+    if kind == 4:
+        return rng.choice(AMBIGUOUS)
+    return "".join(rng.choice("ab :,-[]{}\"\n1e.") for _ in range(rng.randrange(6)))
+
+
+def random_key(rng: random.Random) -> str:
+    """Clé aléatoire, parfois ambiguë."""
+    return rng.choice(AMBIGUOUS) if rng.random() < 0.3 else rng.choice(KEYS)
+
+
+def random_value(rng: random.Random, depth: int = 0) -> Any:
+    """Valeur JSON aléatoire (objets, tableaux uniformes ou non, scalaires)."""
+    kind = rng.randrange(10)
+    if depth > 4 or kind < 4:
+        return random_scalar(rng)
+    if kind < 7:
+        return {random_key(rng): random_value(rng, depth + 1) for _ in range(rng.randrange(4))}
+    if kind < 9:
+        # Objets aux mêmes clés : tableau tabulaire
+        keys = list(dict.fromkeys(random_key(rng) for _ in range(rng.randrange(4))))
+        return [{key: random_value(rng, depth + 2) for key in keys} for _ in range(rng.randrange(1, 4))]
+    return [random_value(rng, depth + 1) for _ in range(rng.randrange(5))]
+
+
+def same(expected: Any, actual: Any) -> bool:
+    """Égalité stricte : mêmes types, même ordre des clés, nan égal à nan."""
+    if type(expected) is not type(actual):
+        return False
+    if isinstance(expected, float):
+        return repr(expected) == repr(actual)
+    if isinstance(expected, dict):
+        return list(expected) == list(actual) and all(same(expected[key], actual[key]) for key in expected)
+    if isinstance(expected, list):
+        return len(expected) == len(actual) and all(map(same, expected, actual))
+    return expected == actual
+
+
+def check_random(cases: int, seed: int) -> int:
+    """Aller-retour sur `cases` documents aléatoires ; renvoie le nombre d'échecs."""
+    rng = random.Random(seed)
+    failures = 0
+    for _ in range(cases):
+        value = random_value(rng)
+        text = to_toon(value)
+        try:
+            decoded = parse_toon(text)
+        except ValueError as e:
+            decoded = e
+        if not same(value, decoded):
+            failures += 1
+            if failures <= 3:
+                print(f"❌ {value!r}\n{text}\n-> {decoded!r}\n")
+    return failures
+
+
+def measure(name: str, parse: Callable[[Any], Any], texts: List[Any], repeat: int) -> float:
+    """Meilleur temps de `repeat` passes ; affiche le débit."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            parse(text)
+        best = min(best, time.perf_counter() - start)
+    size_mb = sum(len(text) for text in texts) / 1024 / 1024
+    print(f"{name:<10} | {size_mb / best:>8.1f} | {len(texts) / best:>8.0f}")
+    return best
+
+
+def main() -> None:
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Tests de propriété et benchmark du décodeur TOON")
+    parser.add_argument('--dataset', type=str, default=None, help='Dossier dataset (défaut: dataset actif)')
+    parser.add_argument('--limit', type=int, default=500, help='Nombre de transactions agrégées mesurées')
+    parser.add_argument('--cases', type=int, default=20000, help='Nombre de documents aléatoires')
+    parser.add_argument('--seed', type=int, default=0, help='Graine des documents aléatoires')
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de passes (meilleur temps retenu)')
+    args = parser.parse_args()
+
+    failures = check_random(args.cases, args.seed)
+    print(f"🎲 {args.cases} documents aléatoires, échecs d'aller-retour: {failures}")
+
+    data = load_dataset(args.dataset)
+    models = list(iter_aggregated(data.index, data.transactions[:args.limit]))
+    payloads = [aggregated.model_dump(mode="json") for aggregated in models]
+    toon_texts = [model_to_toon(aggregated) for aggregated in models]
+    json_texts = [json.dumps(payload) for payload in payloads]
+    mismatches = sum(not same(payload, parse_toon(text)) for payload, text in zip(payloads, toon_texts))
+    print(f"📂 {len(models)} transactions agrégées, échecs d'aller-retour: {mismatches}")
+
+    print(f"{'decoder':<10} | {'MB/s':>8} | {'docs/s':>8}")
+    print("-" * 32)
+    toon_s = measure("parse_toon", parse_toon, toon_texts, args.repeat)
+    json_s = measure("json.loads", json.loads, json_texts, args.repeat)
+    print(f"⏱️  parse_toon / json.loads: x{toon_s / json_s:.1f} (temps par document)")
+
+    if failures or mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'encodeur TOON sur les transactions agrégées d'un dataset.
+
+Compare l'encodeur historique (chaînes imbriquées re-découpées et
+ré-indentées à chaque niveau) à l'encodeur en une passe de
+api/utils/toon_formatter.py, et vérifie que les sorties sont identiques
+octet pour octet. Mesure aussi l'encodeur compilé depuis le schéma des
+modèles (model_to_toon, sans model_dump). Un document synthétique très
+imbriqué (--depth) montre le coût quadratique de la ré-indentation
+historique.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_toon_encoder.py [--dataset "public 1"] [--limit 500] [--repeat 3] [--depth 100]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from api.utils.aggregator import iter_aggregated
+from api.utils.data_loader import load_dataset
+from api.utils.toon_formatter import format_tabular_array, model_to_toon, needs_quoting, to_toon
+
+
+def legacy_to_toon(data: Any, indent: int = 0) -> str:
+    """Reproduit l'encodeur récursif historique (référence de comparaison)."""
+    if data is None:
+        return "null"
+    if isinstance(data, bool):
+        return "true" if data else "false"
+    if isinstance(data, (int, float)):
+        return str(data)
+    if isinstance(data, str):
+        return json.dumps(data) if needs_quoting(data) else data
+    if isinstance(data, list):
+        return legacy_array(data, indent)
+    if isinstance(data, dict):
+        return legacy_object(data, indent)
+    return json.dumps(data)
+
+
+def legacy_array(arr: List[Any], indent: int) -> str:
+    """Tableau : chaque élément est rendu puis re-découpé en lignes et ré-indenté."""
+    if not arr:
+        return "[]"
+    if all(isinstance(item, dict) for item in arr):
+        first_keys = set(arr[0].keys())
+        if all(set(item.keys()) == first_keys for item in arr):
+            # Rendu des tables inchangé : partagé avec le nouvel encodeur
+            return format_tabular_array(arr, indent)
+    lines = [f"[{len(arr)}]"]
+    ind = "  " * (indent + 1)
+    for item in arr:
+        lines.extend([ind + line for line in legacy_to_toon(item, indent + 1).split('\n')])
+    return '\n'.join(lines)
+
+
+def legacy_object(obj: Dict[str, Any], indent: int) -> str:
+    """Objet : chaque valeur multi-ligne est re-découpée et ré-indentée."""
+    if not obj:
+        return "{}"
+    lines = []
+    ind = "  " * indent
+    for key, value in obj.items():
+        value_str = legacy_to_toon(value, indent + 1)
+        if '\n' in value_str:
+            lines.append(f"{ind}{key}:")
+            for value_line in value_str.split('\n'):
+                lines.append(f"{ind}  {value_line}")
+        else:
+            lines.append(f"{ind}{key}: {value_str}")
+    return '\n'.join(lines)
+
+
+def nested_document(depth: int) -> Dict[str, Any]:
+    """Document synthétique imbriqué sur `depth` niveaux."""
+    document: Dict[str, Any] = {"amount": 1.5, "tags": ["a", "b"]}
+    for _ in range(depth):
+        document = {"child": document, "rows": [{"id": 1}, {"id": 2}], "label": "level"}
+    return document
+
+
+def measure(name: str, encode: Callable[[Any], str], payloads: List[Any], repeat: int) -> float:
+    """Temps moyen par document (ms), meilleur de `repeat` passes."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for payload in payloads:
+            encode(payload)
+        best = min(best, time.perf_counter() - start)
+    per_document_ms = best / len(payloads) * 1000
+    print(f"{name:<10} | {per_document_ms:>9.3f}")
+    return per_document_ms
+
+
+def main() -> None:
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Benchmark de l'encodeur TOON")
+    parser.add_argument('--dataset', type=str, default=None, help='Dossier dataset (défaut: dataset actif)')
+    parser.add_argument('--limit', type=int, default=500, help='Nombre de transactions agrégées mesurées')
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de passes (meilleur temps retenu)')
+    parser.add_argument('--depth', type=int, default=100, help="Profondeur du document synthétique (0: ignoré)")
+    args = parser.parse_args()
+
+    data = load_dataset(args.dataset)
+    models = list(iter_aggregated(data.index, data.transactions[:args.limit]))
+    payloads = [aggregated.model_dump(mode="json") for aggregated in models]
+    size_mb = sum(len(to_toon(payload)) for payload in payloads) / 1024 / 1024
+    print(f"📂 {len(payloads)} transactions agrégées ({size_mb:.1f} MB de TOON)")
+
+    mismatches = sum(legacy_to_toon(payload) != to_toon(payload) for payload in payloads)
+    mismatches += sum(model_to_toon(model) != to_toon(payload) for model, payload in zip(models, payloads))
+    print(f"🔍 Documents différents de l'encodeur historique: {mismatches}")
+
+    print(f"{'encoder':<10} | {'ms/doc':>9}")
+    print("-" * 22)
+    legacy_ms = measure("legacy", legacy_to_toon, payloads, args.repeat)
+    single_pass_ms = measure("one-pass", to_toon, payloads, args.repeat)
+    print(f"✅ Gain: x{legacy_ms / single_pass_ms:.2f}")
+
+    print("\n🧩 Depuis les modèles (model_dump inclus)")
+    dump_ms = measure("dump+toon", lambda model: to_toon(model.model_dump(mode="json")), models, args.repeat)
+    compiled_ms = measure("compiled", model_to_toon, models, args.repeat)
+    print(f"✅ Gain: x{dump_ms / compiled_ms:.2f}")
+
+    if args.depth:
+        nested = [nested_document(args.depth)]
+        assert legacy_to_toon(nested[0]) == to_toon(nested[0])
+        print(f"\n🌲 Document synthétique, {args.depth} niveaux d'imbrication")
+        legacy_ms = measure("legacy", legacy_to_toon, nested, args.repeat)
+        single_pass_ms = measure("one-pass", to_toon, nested, args.repeat)
+        print(f"✅ Gain: x{legacy_ms / single_pass_ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la fenêtre ±3h "other_transactions" de l'endpoint agrégé.
+
+Compare le scan linéaire historique (normalisation + fromisoformat sur chaque
+transaction) aux timelines triées par IBAN de DatasetIndex, sur des datasets
+synthétiques de taille croissante (jusqu'à 1M de transactions).
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_transaction_window.py [--sizes 1790 100000 1000000] [--queries 2000]
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from api.models import Transaction
+from api.utils.dataset_index import DatasetIndex
+
+# Au-delà, le scan linéaire devient trop lent pour être mesuré raisonnablement
+LEGACY_MAX_SIZE = 100_000
+# Nombre moyen de transactions par IBAN (densité constante quand le dataset grossit)
+TRANSACTIONS_PER_IBAN = 20
+
+
+def generate_transactions(count: int, seed: int = 42) -> List[Transaction]:
+    """Génère des transactions synthétiques réparties sur 60 jours."""
+    rng = random.Random(seed)
+    iban_count = max(2, count // TRANSACTIONS_PER_IBAN)
+    ibans = [f"IT{rng.randint(10, 99)}X{i:022d}" for i in range(iban_count)]
+    start = datetime(2025, 11, 1)
+    span_seconds = 60 * 24 * 3600
+
+    transactions = []
+    for _ in range(count):
+        timestamp = start + timedelta(seconds=rng.uniform(0, span_seconds))
+        transactions.append(Transaction.model_construct(
+            transaction_id=str(uuid.UUID(int=rng.getrandbits(128))),
+            sender_id="",
+            recipient_id="",
+            transaction_type="transfer",
+            amount=round(rng.uniform(1, 2000), 2),
+            location="",
+            payment_method="",
+            sender_iban=rng.choice(ibans),
+            recipient_iban=rng.choice(ibans),
+            balance_after=0.0,
+            description="",
+            timestamp=timestamp.isoformat(),
+            is_fake_recipient="",
+        ))
+    return transactions
+
+
+def legacy_window(transactions: List[Transaction], iban: str, reference: Transaction) -> List[Transaction]:
+    """Reproduit le scan linéaire de l'ancien routeur (référence de comparaison)."""
+    ref_time = datetime.fromisoformat(reference.timestamp + '+00:00')
+    window = timedelta(hours=3)
+    result = []
+    for tx in transactions:
+        if (tx.transaction_id != reference.transaction_id
+                and (tx.sender_iban == iban or tx.recipient_iban == iban)
+                and tx.timestamp):
+            tx_time = datetime.fromisoformat(tx.timestamp + '+00:00')
+            if abs(tx_time - ref_time) <= window:
+                result.append(tx)
+    return result
+
+
+def benchmark_size(size: int, queries: int) -> None:
+    """Mesure construction de l'index et coût par requête pour une taille donnée."""
+    transactions = generate_transactions(size)
+    rng = random.Random(size)
+    references = [rng.choice(transactions) for _ in range(queries)]
+
+    start = time.perf_counter()
+    index = DatasetIndex(users=[], transactions=transactions, locations=[])
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for reference in references:
+        index.transactions_near(reference.sender_iban, reference, time_window_hours=3)
+    indexed_us = (time.perf_counter() - start) / queries * 1e6
+
+    legacy = "n/a"
+    if size <= LEGACY_MAX_SIZE:
+        legacy_queries = references[:max(1, min(queries, 2_000_000 // size))]
+        start = time.perf_counter()
+        for reference in legacy_queries:
+            expected = legacy_window(transactions, reference.sender_iban, reference)
+            assert expected == index.transactions_near(reference.sender_iban, reference)
+        legacy = f"{(time.perf_counter() - start) / len(legacy_queries) * 1e6:,.0f}"
+
+    print(f"{size:>10,} | {build_s:>9.2f} | {indexed_us:>12.1f} | {legacy:>12}")
+
+
+def main() -> None:
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Benchmark de la fenêtre ±3h par IBAN")
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[1_790, 10_000, 100_000, 1_000_000],
+        help='Tailles de datasets à mesurer (défaut: public 1 -> 1M)'
+    )
+    parser.add_argument(
+        '--queries',
+        type=int,
+        default=2000,
+        help='Nombre de requêtes par taille'
+    )
+    args = parser.parse_args()
+
+    print(f"{'size':>10} | {'build (s)':>9} | {'indexed (µs)':>12} | {'legacy (µs)':>12}")
+    print("-" * 54)
+    for size in args.sizes:
+        benchmark_size(size, args.queries)
+
+
+if __name__ == "__main__":
+    main()
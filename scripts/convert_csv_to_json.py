@@ -2,6 +2,9 @@
 """
 Script pour convertir le fichier CSV transactions_dataset.csv en JSON.
 
+L'API lit désormais transactions_dataset.csv directement : cette conversion
+n'est plus nécessaire que pour d'autres outils qui attendent le JSON.
+
 Usage:
     python scripts/convert_csv_to_json.py [--input INPUT_FILE] [--output OUTPUT_FILE] [--pretty]
 """
@@ -10,45 +13,20 @@ import csv
 import json
 import argparse
 import os
+import sys
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 
+# Les règles de conversion sont partagées avec le loader de l'API,
+# qui lit aussi le CSV directement (sans passer par ce script)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from api.utils.csv_loader import convert_value  # noqa: E402
+
 # Charger les variables d'environnement depuis .env
 load_dotenv()
 
 
-def convert_value(value: str, field_name: str) -> Any:
-    """Convertit une valeur CSV en type Python approprié.
-    
-    Args:
-        value: La valeur brute du CSV
-        field_name: Le nom du champ pour déterminer le type
-        
-    Returns:
-        La valeur convertie au bon type
-    """
-    if not value or value.strip() == "":
-        # Pour les champs optionnels, retourner une chaîne vide
-        if field_name in ["recipient_id", "payment_method", "sender_iban", 
-                          "recipient_iban", "description", "location"]:
-            return ""
-        # Pour balance_after, retourner 0.0 si vide
-        if field_name == "balance_after":
-            return 0.0
-        return ""
-    
-    # Conversion des types numériques
-    if field_name in ["amount", "balance_after"]:
-        try:
-            return float(value)
-        except ValueError:
-            return 0.0
-    
-    # Les autres champs restent des chaînes
-    return value.strip()
-
-
 def csv_to_json(
     csv_path: Path,
     json_path: Path,
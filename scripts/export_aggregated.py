@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Export de toutes les transactions agrégées d'un dataset (NDJSON ou TOON).
+
+Produit, pour chaque transaction du dataset, le même document que
+GET /transactions/{id}, sans passer par l'API. Les transactions sont
+agrégées et écrites une par une : la mémoire reste constante quelle que
+soit la taille du dataset. Le débit (records/s) est affiché sur stderr.
+
+Usage:
+    PYTHONPATH=. python scripts/export_aggregated.py [--dataset "public 1"] [--format ndjson|toon]
+        [--fields transaction,sender] [--exclude sender_emails] [--output aggregated.ndjson]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from api.utils.aggregator import EXPORT_FORMATS, iter_export, resolve_projection  # noqa: E402
+from api.utils.data_loader import load_dataset  # noqa: E402
+
+
+def main() -> None:
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Export des transactions agrégées d'un dataset")
+    parser.add_argument('--dataset', type=str, default=None, help='Dossier dataset (défaut: dataset actif)')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default="ndjson", help='Format de sortie')
+    parser.add_argument('--fields', type=str, default=None, help='Sections à inclure (ex: transaction,sender)')
+    parser.add_argument('--exclude', type=str, default=None, help='Sections à retirer (ex: sender_emails,recipient_emails)')
+    parser.add_argument('--output', type=Path, default=None, help='Fichier de sortie (défaut: stdout)')
+    parser.add_argument('--progress-every', type=int, default=1000, help='Affiche le débit toutes les N transactions')
+    args = parser.parse_args()
+    try:
+        projection = resolve_projection(args.fields, args.exclude)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    data = load_dataset(args.dataset)
+    load_seconds = time.perf_counter() - start
+    print(f"📂 Dataset chargé en {load_seconds:.2f}s ({len(data.transactions)} transactions)", file=sys.stderr)
+
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    records = 0
+    written = 0
+    start = time.perf_counter()
+    try:
+        for chunk in iter_export(data.index, data.transactions, args.format, projection):
+            output.write(chunk)
+            records += 1
+            written += len(chunk)
+            if args.progress_every and records % args.progress_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"   {records} records, {records / elapsed:.0f} records/s", file=sys.stderr)
+    finally:
+        if args.output:
+            output.close()
+        else:
+            output.flush()
+
+    elapsed = time.perf_counter() - start
+    rate = records / elapsed if elapsed > 0 else 0.0
+    print(
+        f"✅ {records} transactions agrégées exportées en {elapsed:.2f}s "
+        f"({rate:.0f} records/s, {written / 1024 / 1024:.1f} MB)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()